@@ -0,0 +1,7 @@
+#!/bin/sh
+set -e
+
+# Serve the registered model; SERVICE_CONFIG overrides the config path
+exec python -m scripts.serve_model \
+    --config "${SERVICE_CONFIG:-config/service.yaml}" \
+    "$@"
@@ -0,0 +1,120 @@
+"""
+Time the paired bootstrap at production holdout sizes.
+
+Scores are synthetic (labels with a fixed positive rate and two noisy
+score vectors, one with heavy ties), so the benchmark needs no artifacts.
+
+Chunks of replicates run on threads with the GIL released, so wall time
+divides by the number of cores. The script reports CPU time and per-core
+throughput next to wall time, which shows how well the threads scaled.
+
+Measured on a 1-CPU host, 2000 replicates x 1M rows took 52-57s
+(26-29ms per replicate, 396MB peak RSS). Reaching single-digit seconds at
+that size needs about 8-16 cores. That scaling is an estimate from the per-core
+rate; it was not measured on a multi-core host.
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+from src.models.bootstrap import DEFAULT_N_BOOTSTRAP, paired_bootstrap
+
+
+# ============================================================
+# Argument parsing
+# ============================================================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark paired_bootstrap on synthetic scores"
+    )
+
+    parser.add_argument(
+        "--n-rows",
+        type=int,
+        default=1_000_000,
+    )
+
+    parser.add_argument(
+        "--n-bootstrap",
+        type=int,
+        default=DEFAULT_N_BOOTSTRAP,
+    )
+
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=None,
+        help="Threads (default: all CPUs)",
+    )
+
+    parser.add_argument(
+        "--positive-rate",
+        type=float,
+        default=0.22,
+    )
+
+    return parser.parse_args()
+
+
+# ============================================================
+# Main execution
+# ============================================================
+
+def main() -> None:
+    args = parse_args()
+
+    try:
+        rng = np.random.default_rng(0)
+        y = (rng.random(args.n_rows) < args.positive_rate).astype(np.int64)
+        baseline = np.round(rng.random(args.n_rows) * 0.7 + 0.3 * y, 3)
+        candidate = rng.random(args.n_rows) * 0.6 + 0.4 * y
+
+        n_jobs = args.n_jobs or os.cpu_count() or 1
+        print(
+            f"Bootstrapping {args.n_bootstrap} replicates of "
+            f"{args.n_rows} rows on {n_jobs} threads "
+            f"({os.cpu_count()} CPUs)..."
+        )
+        start = time.perf_counter()
+        start_cpu = time.process_time()
+        intervals = paired_bootstrap(
+            y,
+            baseline,
+            candidate,
+            n_bootstrap=args.n_bootstrap,
+            n_jobs=n_jobs,
+        )
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - start_cpu
+
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"\nElapsed: {elapsed:.1f}s "
+              f"({elapsed / args.n_bootstrap * 1e3:.1f}ms per replicate)")
+        print(f"CPU time: {cpu:.1f}s "
+              f"(speedup {cpu / elapsed:.1f}x on {n_jobs} threads)")
+        print(f"Per core: {cpu / args.n_bootstrap * 1e3:.1f}ms per replicate")
+        print(f"Peak RSS: {peak_mb:.0f}MB")
+        for k, v in intervals.items():
+            print(
+                f"{k:>12}: {v['delta']:+.4f} "
+                f"[{v['lower']:+.4f}, {v['upper']:+.4f}]"
+            )
+
+    except Exception as e:
+        print("\nBenchmark failed.")
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+# ============================================================
+# Entry point
+# ============================================================
+
+if __name__ == "__main__":
+    main()
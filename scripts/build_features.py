@@ -3,11 +3,16 @@ import sys
 import json
 
 import joblib
-import pandas as pd
 import numpy as np
 
+from src.data.split import load_split
+from src.features.contracts import ALL_FEATURES
 from src.features.preprocess import build_preprocessing_pipeline
 from src.features.introspection import build_feature_metadata
+from src.monitoring.profile import (
+    build_reference_profile,
+    save_reference_profile,
+)
 
 
 # ============================================================
@@ -20,6 +25,7 @@ ARTIFACTS_DIR = Path("artifacts/features")
 
 PREPROCESSOR_PATH = ARTIFACTS_DIR / "preprocessor.joblib"
 METADATA_PATH = ARTIFACTS_DIR / "feature_metadata.json"
+REFERENCE_PROFILE_PATH = ARTIFACTS_DIR / "reference_profile.json"
 
 X_TRAIN_PATH = ARTIFACTS_DIR / "X_train.npy"
 X_VAL_PATH = ARTIFACTS_DIR / "X_val.npy"
@@ -33,9 +39,9 @@ X_TEST_PATH = ARTIFACTS_DIR / "X_test.npy"
 def main() -> None:
     try:
         print("Loading data splits...")
-        train_df = pd.read_csv(SPLITS_DIR / "train.csv")
-        val_df = pd.read_csv(SPLITS_DIR / "validation.csv")
-        test_df = pd.read_csv(SPLITS_DIR / "test.csv")
+        train_df = load_split(SPLITS_DIR, "train", ALL_FEATURES)
+        val_df = load_split(SPLITS_DIR, "validation", ALL_FEATURES)
+        test_df = load_split(SPLITS_DIR, "test", ALL_FEATURES)
 
         print("Building preprocessing pipeline...")
         preprocessor = build_preprocessing_pipeline()
@@ -50,6 +56,12 @@ def main() -> None:
         print("Extracting feature metadata...")
         metadata = build_feature_metadata(preprocessor)
 
+        print("Profiling training reference...")
+        reference_profile = build_reference_profile(
+            train_df[ALL_FEATURES].to_numpy(),
+            feature_version=metadata.version,
+        )
+
         print("Persisting feature artifacts...")
         ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -71,6 +83,8 @@ def main() -> None:
                 indent=2,
             )
 
+        save_reference_profile(reference_profile, REFERENCE_PROFILE_PATH)
+
         print("\nFeature build completed successfully.")
         print(f"Feature version: {metadata.version}")
         print(f"Number of features: {metadata.n_features}")
@@ -1,6 +1,18 @@
 from pathlib import Path
+from typing import Optional
+import argparse
 import json
 
+import numpy as np
+
+from src.models.bootstrap import paired_bootstrap
+from src.models.predictions import (
+    cached_scores,
+    dataset_hash,
+    evaluate_artifact,
+)
+from src.models.promotion import should_promote
+
 
 # ============================================================
 # Paths
@@ -12,6 +24,9 @@ BASELINE_DIR = ARTIFACTS_DIR / "baseline"
 LGBM_DIR = ARTIFACTS_DIR / "lightgbm"
 XGB_DIR = ARTIFACTS_DIR / "xgboost"
 
+FEATURES_DIR = Path("artifacts/features")
+LABELS_DIR = Path("artifacts/labels")
+
 
 # ============================================================
 # Utilities
@@ -25,6 +40,43 @@ def load_metrics(path: Path) -> dict:
         return json.load(f)
 
 
+def recompute_metrics(
+    path: Path,
+    X: np.ndarray,
+    y: np.ndarray,
+    *,
+    data_hash: str,
+) -> dict:
+    """Metrics derived from the cached scores of path/model.joblib."""
+
+    model_path = path / "model.joblib"
+    if not model_path.exists():
+        raise FileNotFoundError(f"Missing model file: {model_path}")
+
+    return evaluate_artifact(model_path, X, y, data_hash=data_hash).metrics
+
+
+def bootstrap_deltas(
+    baseline_path: Path,
+    candidate_path: Path,
+    X: np.ndarray,
+    y: np.ndarray,
+    *,
+    data_hash: str,
+    n_bootstrap: int,
+    confidence: float,
+) -> dict:
+    """Paired bootstrap intervals of candidate - baseline metrics."""
+
+    return paired_bootstrap(
+        y,
+        cached_scores(baseline_path / "model.joblib", X, data_hash=data_hash),
+        cached_scores(candidate_path / "model.joblib", X, data_hash=data_hash),
+        n_bootstrap=n_bootstrap,
+        confidence=confidence,
+    )
+
+
 def print_metrics(name: str, metrics: dict) -> None:
     print(f"\n{name}")
     print("-" * len(name))
@@ -32,32 +84,52 @@ def print_metrics(name: str, metrics: dict) -> None:
         print(f"{k:>12}: {v:.4f}")
 
 
+def print_intervals(intervals: dict, confidence: float) -> None:
+    print(f"  Delta vs baseline ({confidence:.0%} paired bootstrap CI):")
+    for k, v in intervals.items():
+        print(
+            f"{k:>12}: {v['delta']:+.4f} "
+            f"[{v['lower']:+.4f}, {v['upper']:+.4f}]"
+        )
+
+
 # ============================================================
-# Promotion logic
+# Argument parsing
 # ============================================================
 
-def should_promote(
-    baseline: dict,
-    candidate: dict,
-    *,
-    min_auc_gain: float = 0.005,
-    max_brier_regression: float = 0.005,
-) -> bool:
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare candidate models against the baseline"
+    )
 
-    auc_gain = candidate["roc_auc"] - baseline["roc_auc"]
-    pr_gain = candidate["pr_auc"] - baseline["pr_auc"]
-    brier_change = candidate["brier_score"] - baseline["brier_score"]
+    parser.add_argument(
+        "--recompute",
+        action="store_true",
+        help="Derive metrics from cached predictions instead of metrics.json",
+    )
 
-    if auc_gain < min_auc_gain:
-        return False
+    parser.add_argument(
+        "--split",
+        choices=["val", "test"],
+        default="val",
+        help="Evaluation split used with --recompute",
+    )
 
-    if pr_gain <= 0:
-        return False
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        help="Paired bootstrap resamples for the promotion gate "
+        "(implies --recompute)",
+    )
 
-    if brier_change > max_brier_regression:
-        return False
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+    )
 
-    return True
+    return parser.parse_args()
 
 
 # ============================================================
@@ -65,10 +137,41 @@ def should_promote(
 # ============================================================
 
 def main() -> None:
-    print("Loading model metrics...")
+    args = parse_args()
+
+    if args.recompute or args.bootstrap:
+        print(f"Evaluating models on the {args.split} split...")
+        X = np.load(FEATURES_DIR / f"X_{args.split}.npy")
+        y = np.load(
+            LABELS_DIR / f"y_{args.split}.npy", allow_pickle=True
+        ).astype(int)
+        data_hash = dataset_hash(X)
+
+        def get_metrics(path: Path) -> dict:
+            return recompute_metrics(path, X, y, data_hash=data_hash)
+    else:
+        print("Loading model metrics...")
+        get_metrics = load_metrics
+
+    def get_intervals(path: Path) -> Optional[dict]:
+        if not args.bootstrap:
+            return None
+
+        intervals = bootstrap_deltas(
+            BASELINE_DIR,
+            path,
+            X,
+            y,
+            data_hash=data_hash,
+            n_bootstrap=args.bootstrap,
+            confidence=args.confidence,
+        )
+        print_intervals(intervals, args.confidence)
+
+        return intervals
 
-    baseline_metrics = load_metrics(BASELINE_DIR)
-    lgbm_metrics = load_metrics(LGBM_DIR)
+    baseline_metrics = get_metrics(BASELINE_DIR)
+    lgbm_metrics = get_metrics(LGBM_DIR)
 
     print_metrics("Baseline (Logistic Regression)", baseline_metrics)
     print_metrics("LightGBM (Tuned)", lgbm_metrics)
@@ -76,6 +179,7 @@ def main() -> None:
     promote_lgbm = should_promote(
         baseline_metrics,
         lgbm_metrics,
+        intervals=get_intervals(LGBM_DIR),
     )
 
     print("\nPromotion decision")
@@ -88,12 +192,13 @@ def main() -> None:
 
     if XGB_DIR.exists():
         try:
-            xgb_metrics = load_metrics(XGB_DIR)
+            xgb_metrics = get_metrics(XGB_DIR)
             print_metrics("XGBoost", xgb_metrics)
 
             promote_xgb = should_promote(
                 baseline_metrics,
                 xgb_metrics,
+                intervals=get_intervals(XGB_DIR),
             )
 
             if promote_xgb:
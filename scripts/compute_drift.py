@@ -0,0 +1,374 @@
+from pathlib import Path
+import argparse
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.data.split import SPLIT_NAMES, iter_split_chunks
+from src.features.contracts import ALL_FEATURES
+from src.monitoring.batch_drift import (
+    build_drift_reference,
+    compute_drift_windows,
+    load_drift_reference,
+    load_feature_layout,
+)
+from src.monitoring.drift import StreamingDriftMonitor
+from src.monitoring.profile import load_reference_profile
+from src.monitoring.sketches import (
+    DriftSketch,
+    binning_signature,
+    merge_sketches,
+)
+
+
+# ============================================================
+# Paths
+# ============================================================
+
+SPLITS_DIR = Path("data/interim/splits")
+
+REFERENCE_PROFILE_PATH = Path("artifacts/features/reference_profile.json")
+
+DRIFT_REPORT_PATH = Path("artifacts/monitoring/drift_report.json")
+
+
+# ============================================================
+# Argument parsing
+# ============================================================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compute per-feature drift of a dataset against the "
+        "training reference"
+    )
+
+    parser.add_argument(
+        "--reference",
+        type=Path,
+        default=REFERENCE_PROFILE_PATH,
+        help="Reference profile (.json) or raw reference split (.csv); "
+        "with a .npy current matrix, a feature matrix (.npy) or saved drift "
+        "reference (.npz)",
+    )
+
+    parser.add_argument(
+        "--current",
+        type=Path,
+        default=None,
+        help="Raw data (.csv) streamed through the monitor, or a "
+        "preprocessed feature matrix (.npy) scored in windows, instead of "
+        "--current-split",
+    )
+
+    parser.add_argument(
+        "--current-split",
+        choices=SPLIT_NAMES,
+        default="test",
+        help="Split streamed from the columnar snapshot written by "
+        "ingestion",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DRIFT_REPORT_PATH,
+    )
+
+    parser.add_argument(
+        "--n-bins",
+        type=int,
+        default=10,
+        help="Bins per continuous feature when building from a .csv",
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100_000,
+    )
+
+    parser.add_argument(
+        "--window-size",
+        type=int,
+        default=None,
+        help="Rows per window for a .npy current matrix (default: one "
+        "window)",
+    )
+
+    parser.add_argument(
+        "--write-sketch",
+        type=Path,
+        default=None,
+        help="Also save a mergeable drift sketch of the streamed data",
+    )
+
+    parser.add_argument(
+        "--partition-start",
+        default=None,
+        help="ISO timestamp of the first record in the streamed partition",
+    )
+
+    parser.add_argument(
+        "--partition-end",
+        default=None,
+        help="ISO timestamp of the last record in the streamed partition",
+    )
+
+    parser.add_argument(
+        "--sketch-dir",
+        type=Path,
+        default=None,
+        help="Merge saved drift sketches (*.npz) instead of reading data",
+    )
+
+    parser.add_argument(
+        "--since",
+        default=None,
+        help="Only merge sketches whose partition starts at or after this",
+    )
+
+    parser.add_argument(
+        "--until",
+        default=None,
+        help="Only merge sketches whose partition ends at or before this",
+    )
+
+    parser.add_argument(
+        "--rollup-output",
+        type=Path,
+        default=None,
+        help="Save the merged sketch (e.g. an hourly -> daily roll-up)",
+    )
+
+    return parser.parse_args()
+
+
+# ============================================================
+# Streaming drift over raw features
+# ============================================================
+
+def run_streaming_drift(args: argparse.Namespace) -> None:
+
+    if args.reference.suffix == ".json":
+        print("Loading reference profile...")
+        monitor = StreamingDriftMonitor.from_profile(
+            load_reference_profile(args.reference)
+        )
+    else:
+        print("Building reference histograms...")
+        reference = pd.read_csv(args.reference, usecols=ALL_FEATURES)
+        monitor = StreamingDriftMonitor.from_reference(
+            reference[ALL_FEATURES].to_numpy(),
+            n_bins=args.n_bins,
+        )
+        del reference
+
+    sketch = None
+    if args.write_sketch is not None:
+        sketch = DriftSketch.empty(
+            monitor.binning,
+            start=args.partition_start,
+            end=args.partition_end,
+        )
+
+    print("Streaming current data...")
+    if args.current is None:
+        chunks = iter_split_chunks(
+            SPLITS_DIR,
+            args.current_split,
+            ALL_FEATURES,
+            chunk_rows=args.chunk_size,
+        )
+    else:
+        chunks = (
+            chunk[ALL_FEATURES].to_numpy()
+            for chunk in pd.read_csv(
+                args.current,
+                usecols=ALL_FEATURES,
+                chunksize=args.chunk_size,
+            )
+        )
+
+    for X in chunks:
+        monitor.update_batch(X)
+        if sketch is not None:
+            sketch.update_batch(monitor.binning, X)
+
+    if sketch is not None:
+        sketch.save(args.write_sketch)
+        print(f"Drift sketch written to: {args.write_sketch}")
+
+    report = monitor.report()
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(
+            {"n_observed": monitor.n_observed, "features": report},
+            f,
+            indent=2,
+        )
+
+    print(f"\nDrift computed over {monitor.n_observed} records.")
+    print(f"{'feature':>12} {'psi':>8} {'js':>8} {'ks':>8}")
+    for name, stats in sorted(
+        report.items(), key=lambda item: -item[1]["psi"]
+    ):
+        print(
+            f"{name:>12} {stats['psi']:8.4f} "
+            f"{stats['js']:8.4f} {stats['ks']:8.4f}"
+        )
+
+
+# ============================================================
+# Drift from merged sketches
+# ============================================================
+
+def run_sketch_drift(args: argparse.Namespace) -> None:
+
+    if args.reference.suffix != ".json":
+        raise ValueError("Sketch reports need a reference profile (.json)")
+
+    profile = load_reference_profile(args.reference)
+
+    def in_range(sketch: DriftSketch) -> bool:
+        if args.since and (sketch.start or "") < args.since:
+            return False
+        if args.until and (sketch.end or "") > args.until:
+            return False
+        return True
+
+    paths = sorted(args.sketch_dir.glob("*.npz"))
+    print(f"Merging sketches from {len(paths)} partitions...")
+    merged = merge_sketches(
+        sketch
+        for sketch in map(DriftSketch.load, paths)
+        if in_range(sketch)
+    )
+
+    # Counts from another binning would be compared bin-by-bin with the
+    # wrong reference histograms
+    expected = binning_signature(profile.binning)
+    if merged.signature != expected:
+        raise ValueError(
+            f"Sketches were built with a different binning than the "
+            f"reference profile ({merged.signature} vs {expected})"
+        )
+
+    if args.rollup_output is not None:
+        merged.save(args.rollup_output)
+        print(f"Merged sketch written to: {args.rollup_output}")
+
+    report = merged.report(profile.counts, profile.means, profile.variances)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(
+            {"start": merged.start, "end": merged.end, "features": report},
+            f,
+            indent=2,
+        )
+
+    print(f"\nDrift computed for {merged.start} .. {merged.end}.")
+    print(f"{'feature':>12} {'psi':>8} {'ks':>8} {'shift':>8}")
+    for name, stats in sorted(
+        report.items(), key=lambda item: -item[1]["psi"]
+    ):
+        print(
+            f"{name:>12} {stats['psi']:8.4f} "
+            f"{stats['ks']:8.4f} {stats['mean_shift_std']:8.4f}"
+        )
+
+
+# ============================================================
+# Windowed drift over preprocessed features
+# ============================================================
+
+def run_matrix_drift(args: argparse.Namespace) -> None:
+
+    if args.reference.suffix == ".npz":
+        print("Loading drift reference...")
+        reference = load_drift_reference(args.reference)
+    elif args.reference.suffix == ".npy":
+        print("Building drift reference...")
+        names, types = load_feature_layout()
+        reference = build_drift_reference(
+            np.load(args.reference), names, types
+        )
+    else:
+        raise ValueError(
+            "A .npy current matrix needs a .npy or .npz reference, "
+            f"got {args.reference}"
+        )
+
+    X_current = np.load(args.current, mmap_mode="r")
+    window_size = args.window_size or len(X_current)
+    windows = [
+        X_current[start:start + window_size]
+        for start in range(0, len(X_current), window_size)
+    ]
+
+    print(f"Scoring {len(windows)} windows...")
+    result = compute_drift_windows(reference, windows)
+
+    report = {
+        "feature_names": reference.feature_names,
+        "windows": [
+            {
+                "start": i * window_size,
+                "n": int(result["n"][i]),
+                **{
+                    metric: [
+                        None if np.isnan(v) else float(v)
+                        for v in result[metric][i]
+                    ]
+                    for metric in (
+                        "ks", "ks_pvalue", "psi", "chi2", "chi2_pvalue"
+                    )
+                },
+            }
+            for i in range(len(windows))
+        ],
+    }
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    worst = result["ks"].max(axis=0)
+    print(f"\nDrift computed over {len(windows)} windows.")
+    print(f"{'feature':>14} {'max ks':>8}")
+    for j in np.argsort(-worst)[:10]:
+        print(f"{reference.feature_names[j]:>14} {worst[j]:8.4f}")
+
+
+# ============================================================
+# Main execution
+# ============================================================
+
+def main() -> None:
+    args = parse_args()
+
+    try:
+        if args.sketch_dir is not None:
+            run_sketch_drift(args)
+        elif args.current is not None and args.current.suffix == ".npy":
+            run_matrix_drift(args)
+        else:
+            run_streaming_drift(args)
+
+        print(f"\nReport written to: {args.output}")
+
+    except Exception as e:
+        print("\nDrift computation failed.")
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+# ============================================================
+# Entry point
+# ============================================================
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+from pathlib import Path
+import argparse
+import json
+import sys
+
+from src.data.validate import CompiledValidator
+from src.features.contracts import ALL_FEATURES
+from src.inference.engine import (
+    InferenceEngine,
+    DEFAULT_BATCH_SIZE,
+    iter_batches,
+)
+from src.inference.shadow import (
+    DEFAULT_LATENCY_BUDGET_MS,
+    ShadowScorer,
+)
+from src.inference.streaming import iter_jsonl_chunks, open_prediction_writer
+from src.monitoring.score_drift import (
+    DEFAULT_SCORE_ERROR_BOUND,
+    ScoreDriftMonitor,
+)
+
+
+# ============================================================
+# Argument parsing
+# ============================================================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Score JSONL records with a registered model version"
+    )
+
+    parser.add_argument(
+        "--model-name",
+        required=True,
+    )
+
+    parser.add_argument(
+        "--version",
+        required=True,
+    )
+
+    parser.add_argument(
+        "--input",
+        required=True,
+        help="JSONL file with one record per line ('-' reads stdin)",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="Prediction file (.jsonl, or .npy for scores only)",
+    )
+
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Score the input chunk by chunk with bounded memory",
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=50_000,
+        help="Records read per chunk in streaming mode",
+    )
+
+    parser.add_argument(
+        "--score-profile",
+        type=Path,
+        default=None,
+        help="Validation score_profile.json to monitor score drift against",
+    )
+
+    parser.add_argument(
+        "--score-drift-output",
+        type=Path,
+        default=None,
+        help="Where to write the score drift report (JSON)",
+    )
+
+    parser.add_argument(
+        "--score-error-bound",
+        type=float,
+        default=DEFAULT_SCORE_ERROR_BOUND,
+        help="Rank error bound of the live score quantile sketch",
+    )
+
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Check every batch against the data constraints and report "
+        "violations",
+    )
+
+    parser.add_argument(
+        "--shadow",
+        nargs="+",
+        default=[],
+        metavar="NAME:VERSION",
+        help="Challenger versions scored alongside, off the response path",
+    )
+
+    parser.add_argument(
+        "--shadow-log",
+        type=Path,
+        default=Path("artifacts/shadow/predictions.jsonl"),
+        help="Where challenger predictions are appended (JSONL)",
+    )
+
+    parser.add_argument(
+        "--shadow-budget-ms",
+        type=float,
+        default=DEFAULT_LATENCY_BUDGET_MS,
+        help="Latency budget of a challenger batch",
+    )
+
+    return parser.parse_args()
+
+
+# ============================================================
+# Main execution
+# ============================================================
+
+def main() -> None:
+    args = parse_args()
+
+    try:
+        score_monitor = None
+        if args.score_profile is not None:
+            score_monitor = ScoreDriftMonitor.from_path(
+                args.score_profile,
+                error_bound=args.score_error_bound,
+            )
+
+        print("Loading registered model...")
+        engine_kwargs = {
+            "batch_size": args.batch_size,
+            "score_monitor": score_monitor,
+            "validator": (
+                CompiledValidator(ALL_FEATURES) if args.validate else None
+            ),
+        }
+        if args.shadow:
+            scorer = ShadowScorer.from_registry(
+                model_name=args.model_name,
+                version=args.version,
+                challengers=args.shadow,
+                log_path=args.shadow_log,
+                latency_budget_ms=args.shadow_budget_ms,
+                **engine_kwargs,
+            )
+            engine = scorer.champion
+            print(
+                f"Shadow scoring with {len(scorer.challengers)} challengers "
+                f"({len(scorer.shared_features)} sharing features)"
+            )
+        else:
+            engine = scorer = InferenceEngine.from_registry(
+                model_name=args.model_name,
+                version=args.version,
+                **engine_kwargs,
+            )
+
+        input_stream = (
+            sys.stdin if args.input == "-" else open(args.input, "r")
+        )
+
+        with input_stream, open_prediction_writer(args.output) as writer:
+            if args.stream:
+                print("Streaming records...")
+                for chunk in iter_jsonl_chunks(input_stream, args.chunk_size):
+                    for batch in iter_batches(chunk, args.batch_size):
+                        writer.write(batch, scorer.score_batch(batch))
+                    print(f"  scored {writer.n_written} records")
+            else:
+                print("Loading records...")
+                records = [
+                    json.loads(line) for line in input_stream if line.strip()
+                ]
+
+                print(f"Scoring {len(records)} records...")
+                for batch in iter_batches(records, args.batch_size):
+                    writer.write(batch, scorer.score_batch(batch))
+
+        print("\nInference completed.")
+        print(f"Records scored: {writer.n_written}")
+        print(f"Predictions written to: {args.output}")
+
+        if args.shadow:
+            scorer.close()
+            print(f"Shadow predictions logged to: {args.shadow_log}")
+            for label, counts in scorer.counts.items():
+                print(
+                    f"  {label}: " + ", ".join(
+                        f"{key}={value}" for key, value in counts.items()
+                    )
+                )
+
+        if engine.validator is not None:
+            errors = engine.validation_report.errors()
+            print(f"Input violations: {len(errors)} rules")
+            for error in errors:
+                print(f"  {error}")
+
+        if score_monitor is not None:
+            report = score_monitor.report()
+            print(
+                f"Score drift: psi={report['psi']:.4f} "
+                f"ks={report['ks']:.4f} "
+                f"max_quantile_shift={report['max_quantile_shift']:.4f}"
+            )
+            if args.score_drift_output is not None:
+                args.score_drift_output.parent.mkdir(
+                    parents=True, exist_ok=True
+                )
+                with open(args.score_drift_output, "w") as f:
+                    json.dump(report, f, indent=2)
+                print(f"Score drift written to: {args.score_drift_output}")
+
+    except Exception as e:
+        print("\nInference failed.")
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+# ============================================================
+# Entry point
+# ============================================================
+
+if __name__ == "__main__":
+    main()
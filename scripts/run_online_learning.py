@@ -0,0 +1,136 @@
+from pathlib import Path
+import argparse
+import sys
+
+from src.data.schema import TARGET_COLUMN
+from src.inference.engine import iter_batches
+from src.inference.streaming import iter_jsonl_chunks
+from src.retraining.online import (
+    DEFAULT_ALPHA,
+    DEFAULT_CHECKPOINT_EVERY,
+    DEFAULT_ETA0,
+    OnlineLearner,
+)
+
+
+# ============================================================
+# Argument parsing
+# ============================================================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Update an online SGD model from a labeled JSONL stream"
+    )
+
+    parser.add_argument(
+        "--model-name",
+        default="online_sgd",
+        help="Registry name the online checkpoints are registered under",
+    )
+
+    parser.add_argument(
+        "--base-model-name",
+        required=True,
+        help="Registered model whose preprocessor is reused",
+    )
+
+    parser.add_argument(
+        "--base-version",
+        required=True,
+        help="Version of the base model (an online checkpoint resumes)",
+    )
+
+    parser.add_argument(
+        "--input",
+        required=True,
+        help="JSONL file with one labeled record per line ('-' reads stdin)",
+    )
+
+    parser.add_argument(
+        "--label-key",
+        default=TARGET_COLUMN,
+    )
+
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1024,
+        help="Labeled records per partial_fit call",
+    )
+
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_CHECKPOINT_EVERY,
+        help="Labeled records between registry checkpoints",
+    )
+
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=DEFAULT_ALPHA,
+    )
+
+    parser.add_argument(
+        "--eta0",
+        type=float,
+        default=DEFAULT_ETA0,
+        help="Constant SGD learning rate",
+    )
+
+    return parser.parse_args()
+
+
+# ============================================================
+# Main execution
+# ============================================================
+
+def main() -> None:
+    args = parse_args()
+
+    try:
+        print("Loading base preprocessor from the registry...")
+        learner = OnlineLearner.from_registry(
+            model_name=args.model_name,
+            base_model_name=args.base_model_name,
+            base_version=args.base_version,
+            alpha=args.alpha,
+            eta0=args.eta0,
+            checkpoint_every=args.checkpoint_every,
+        )
+
+        input_stream = (
+            sys.stdin if args.input == "-" else open(args.input, "r")
+        )
+
+        print("Learning from labeled stream...")
+        with input_stream:
+            for chunk in iter_jsonl_chunks(input_stream, 50_000):
+                for batch in iter_batches(chunk, args.batch_size):
+                    path = learner.learn_records(
+                        batch, label_key=args.label_key
+                    )
+                    if path is not None:
+                        print(f"  checkpoint written to: {path}")
+
+        if learner.n_pending:
+            path = learner.checkpoint()
+            print(f"  checkpoint written to: {path}")
+
+        print("\nOnline learning completed.")
+        print(f"Labeled records seen: {learner.n_samples}")
+        for k, v in learner.metrics().items():
+            print(f"  {k}: {v:.4f}")
+
+    except Exception as e:
+        print("\nOnline learning failed.")
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+# ============================================================
+# Entry point
+# ============================================================
+
+if __name__ == "__main__":
+    main()
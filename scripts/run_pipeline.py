@@ -0,0 +1,234 @@
+"""
+Incremental ingest -> features -> train pipeline.
+
+Each stage is fingerprinted from the content of its inputs (raw file,
+split snapshot, feature matrices and metadata), its hyperparameters and
+the source files it runs. Stages whose fingerprint is already in the stage
+cache are skipped (or their outputs restored); the three model trainings
+run in parallel once the features are built.
+"""
+
+from pathlib import Path
+import argparse
+import os
+import sys
+from typing import Any, Dict, List
+
+from src.data.split import SNAPSHOT_DIRNAME, SPLITS_MANIFEST
+from src.utils.pipeline import STAGE_CACHE_DIR, Stage, StageCache
+from src.utils.pipeline import run_pipeline
+
+
+# ============================================================
+# Paths
+# ============================================================
+
+RAW_DATA_PATH = "data/raw/openml_credit_default/credit_default.arff"
+VALIDATED_PATH = "data/interim/validated/openml_credit_default.csv"
+SPLITS_DIR = "data/interim/splits"
+
+FEATURES_DIR = "artifacts/features"
+LABELS_DIR = "artifacts/labels"
+
+ARTIFACTS_BASE_DIR = "artifacts/models"
+
+MODEL_FILES = [
+    "model.joblib",
+    "metrics.json",
+    "calibration.npz",
+    "score_profile.json",
+]
+
+
+# ============================================================
+# Stage definitions
+# ============================================================
+
+# The tree-shape flags apply to LightGBM only; XGBoost trains with
+# train_xgboost's defaults, which the src/models code fingerprint covers
+TREE_PARAMS: Dict[str, Dict[str, Any]] = {
+    "lightgbm": {"num_leaves": 31, "max_depth": -1, "min_child_samples": 20},
+    "xgboost": {},
+}
+
+
+def _model_outputs(name: str) -> List[str]:
+    return [f"{ARTIFACTS_BASE_DIR}/{name}/{file}" for file in MODEL_FILES]
+
+
+def build_stages() -> List[Stage]:
+
+    training_inputs = [
+        f"{FEATURES_DIR}/X_train.npy",
+        f"{FEATURES_DIR}/X_val.npy",
+        f"{FEATURES_DIR}/feature_metadata.json",
+        f"{LABELS_DIR}/y_train.npy",
+        f"{LABELS_DIR}/y_val.npy",
+    ]
+    training_code = [
+        "src/models/*.py",
+        "src/retraining/jobs.py",
+        "src/monitoring/profile.py",
+        "src/monitoring/binning.py",
+    ]
+
+    stages = [
+        Stage(
+            name="ingest",
+            command=["{python}", "-m", "scripts.ingest_data"],
+            inputs=[RAW_DATA_PATH],
+            outputs=[
+                VALIDATED_PATH,
+                f"{SPLITS_DIR}/{SPLITS_MANIFEST}",
+                f"{SPLITS_DIR}/{SNAPSHOT_DIRNAME}",
+                LABELS_DIR,
+            ],
+            code=["scripts/ingest_data.py", "src/data/*.py"],
+        ),
+        Stage(
+            name="features",
+            command=["{python}", "-m", "scripts.build_features"],
+            inputs=[
+                f"{SPLITS_DIR}/{SPLITS_MANIFEST}",
+                f"{SPLITS_DIR}/{SNAPSHOT_DIRNAME}",
+            ],
+            outputs=[FEATURES_DIR],
+            # The feature contract is part of the code fingerprint
+            code=[
+                "scripts/build_features.py",
+                "src/features/*.py",
+                "src/data/split.py",
+                "src/data/columnar.py",
+                "src/monitoring/profile.py",
+                "src/monitoring/binning.py",
+            ],
+            deps=["ingest"],
+        ),
+        Stage(
+            name="train_baseline",
+            command=["{python}", "-m", "scripts.train_baseline"],
+            inputs=training_inputs,
+            outputs=_model_outputs("baseline"),
+            code=["scripts/train_baseline.py", *training_code],
+            deps=["features"],
+        ),
+    ]
+
+    for model, params in TREE_PARAMS.items():
+        flags = [
+            part
+            for key, value in params.items()
+            for part in (f"--{key}", str(value))
+        ]
+        stages.append(
+            Stage(
+                name=f"train_{model}",
+                command=[
+                    "{python}", "-m", "scripts.train_tree_model",
+                    "--model", model, *flags,
+                ],
+                inputs=training_inputs,
+                outputs=_model_outputs(model),
+                code=["scripts/train_tree_model.py", *training_code],
+                params=params,
+                deps=["features"],
+            )
+        )
+
+    return stages
+
+
+def select_stages(stages: List[Stage], names: List[str]) -> List[Stage]:
+    """The named stages and everything upstream of them."""
+
+    by_name = {stage.name: stage for stage in stages}
+    selected = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(by_name[name].deps)
+
+    return [stage for stage in stages if stage.name in selected]
+
+
+# ============================================================
+# Argument parsing
+# ============================================================
+
+def parse_args(stage_names: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the pipeline, skipping stages already cached"
+    )
+
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=stage_names,
+        default=stage_names,
+        help="Stages to bring up to date (upstream stages included)",
+    )
+    parser.add_argument(
+        "--force",
+        nargs="*",
+        choices=stage_names,
+        default=None,
+        help="Stages to rerun even when cached (all selected if no names)",
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=None,
+        help="Stages run at once (default: all CPUs)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=STAGE_CACHE_DIR,
+    )
+
+    return parser.parse_args()
+
+
+# ============================================================
+# Main execution
+# ============================================================
+
+def main() -> None:
+    stages = build_stages()
+    args = parse_args([stage.name for stage in stages])
+
+    try:
+        selected = select_stages(stages, args.stages)
+        force = args.force or []
+        if args.force == []:
+            force = [stage.name for stage in selected]
+
+        print(f"Running stages: {', '.join(s.name for s in selected)}")
+        status = run_pipeline(
+            selected,
+            cache=StageCache(args.cache_dir),
+            max_parallel=args.max_parallel,
+            n_cpus=len(os.sched_getaffinity(0))
+            if hasattr(os, "sched_getaffinity")
+            else os.cpu_count(),
+            force=force,
+        )
+
+        print("\nPipeline completed.")
+        for stage in selected:
+            print(f"  {stage.name:<16} {status[stage.name]}")
+
+    except Exception as e:
+        print("\nPipeline failed.")
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+# ============================================================
+# Entry point
+# ============================================================
+
+if __name__ == "__main__":
+    main()
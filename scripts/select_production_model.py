@@ -0,0 +1,70 @@
+import argparse
+import sys
+
+from src.models.registry import (
+    get_production_version,
+    list_versions,
+    promote_version,
+)
+
+
+# ============================================================
+# Argument parsing
+# ============================================================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Promote a registered model version to production"
+    )
+
+    parser.add_argument(
+        "--model-name",
+        required=True,
+    )
+
+    parser.add_argument(
+        "--version",
+        required=True,
+    )
+
+    return parser.parse_args()
+
+
+# ============================================================
+# Main execution
+# ============================================================
+
+def main() -> None:
+    args = parse_args()
+
+    try:
+        if args.version not in list_versions(args.model_name):
+            raise ValueError(
+                f"Unknown version '{args.version}' for {args.model_name}"
+            )
+
+        previous = get_production_version(args.model_name)
+
+        print("Updating production pointer...")
+        path = promote_version(
+            model_name=args.model_name,
+            version=args.version,
+        )
+
+        print("\nPromotion completed.")
+        print(f"Previous version: {previous}")
+        print(f"Production version: {args.version}")
+        print(f"Pointer: {path}")
+
+    except Exception as e:
+        print("\nPromotion failed.")
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+# ============================================================
+# Entry point
+# ============================================================
+
+if __name__ == "__main__":
+    main()
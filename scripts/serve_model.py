@@ -0,0 +1,118 @@
+from dataclasses import replace
+from pathlib import Path
+import argparse
+import asyncio
+import logging
+import sys
+
+from src.inference.prefork import PreforkServer
+from src.inference.service import (
+    DEFAULT_CONFIG_PATH,
+    ScoringService,
+    ServiceConfig,
+)
+
+
+# ============================================================
+# Argument parsing
+# ============================================================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Serve a registered model over HTTP with micro-batching"
+    )
+
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=DEFAULT_CONFIG_PATH,
+    )
+
+    parser.add_argument(
+        "--host",
+        default=None,
+        help="Override the configured host",
+    )
+
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="Override the configured port",
+    )
+
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Override the configured worker processes (more than one "
+        "serves pre-forked workers sharing the loaded model)",
+    )
+
+    return parser.parse_args()
+
+
+# ============================================================
+# Main execution
+# ============================================================
+
+async def serve(config: ServiceConfig) -> None:
+
+    print("Loading registered model...")
+    service = ScoringService.from_config(config)
+
+    host, port = await service.start()
+    print(
+        f"Serving {config.model_name} {config.version} on {host}:{port} "
+        f"(max batch {config.max_batch_size}, "
+        f"max wait {config.max_wait_us}us)"
+    )
+
+    try:
+        await service.serve_forever()
+    finally:
+        await service.close()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        config = ServiceConfig.from_yaml(args.config)
+        overrides = {
+            key: value
+            for key, value in (
+                ("host", args.host),
+                ("port", args.port),
+                ("processes", args.processes),
+            )
+            if value is not None
+        }
+        config = replace(config, **overrides)
+
+        if config.processes > 1:
+            print(
+                f"Serving {config.model_name} from {config.processes} "
+                f"pre-forked workers on {config.host}:{config.port}"
+            )
+            PreforkServer(config).serve_forever()
+            print("\nService stopped.")
+        else:
+            asyncio.run(serve(config))
+
+    except KeyboardInterrupt:
+        print("\nService stopped.")
+
+    except Exception as e:
+        print("\nService failed.")
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+# ============================================================
+# Entry point
+# ============================================================
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from pathlib import Path
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from src.models.promotion import should_promote
+from src.retraining.jobs import (
+    MODEL_TYPES,
+    TrainingSpec,
+    save_training_artifacts,
+    split_threads,
+    train_candidates,
+)
+
+
+# ============================================================
+# Paths
+# ============================================================
+
+FEATURES_DIR = Path("artifacts/features")
+LABELS_DIR = Path("artifacts/labels")
+
+ARTIFACTS_BASE_DIR = Path("artifacts/models")
+
+
+# ============================================================
+# Argument parsing
+# ============================================================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Train every candidate model concurrently and compare"
+    )
+
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        choices=MODEL_TYPES,
+        default=list(MODEL_TYPES),
+    )
+
+    parser.add_argument(
+        "--n-cpus",
+        type=int,
+        default=len(os.sched_getaffinity(0))
+        if hasattr(os, "sched_getaffinity")
+        else os.cpu_count(),
+        help="CPUs to split between the models (default: all available)",
+    )
+
+    return parser.parse_args()
+
+
+# ============================================================
+# Main execution
+# ============================================================
+
+def main() -> None:
+    args = parse_args()
+
+    try:
+        print("Loading feature matrices...")
+        X_train = np.load(FEATURES_DIR / "X_train.npy")
+        X_val = np.load(FEATURES_DIR / "X_val.npy")
+
+        print("Loading labels...")
+        y_train = np.load(LABELS_DIR / "y_train.npy", allow_pickle=True)
+        y_val = np.load(LABELS_DIR / "y_val.npy", allow_pickle=True)
+
+        threads = split_threads(args.models, args.n_cpus)
+        specs = [
+            TrainingSpec(model_type=model_type, n_jobs=threads[model_type])
+            for model_type in args.models
+        ]
+
+        print("Training candidates concurrently:")
+        for spec in specs:
+            print(f"  {spec.model_type} ({spec.n_jobs} threads)")
+        results = train_candidates(specs, X_train, y_train, X_val, y_val)
+
+        print("Persisting model artifacts...")
+        for model_type, result in results.items():
+            save_training_artifacts(result, ARTIFACTS_BASE_DIR / model_type)
+
+        print("\nValidation metrics:")
+        for model_type, result in results.items():
+            print(f"  {model_type}")
+            for k, v in result.metrics.items():
+                print(f"    {k}: {v:.4f}")
+
+        if "baseline" not in results:
+            print("\nNo baseline trained; skipping promotion decision.")
+            return
+
+        print("\nPromotion decision")
+        print("------------------")
+        baseline_metrics = results["baseline"].metrics
+        for model_type, result in results.items():
+            if model_type == "baseline":
+                continue
+            if should_promote(baseline_metrics, result.metrics):
+                print(f"{model_type} SHOULD be promoted to production.")
+            else:
+                print(f"{model_type} should NOT be promoted.")
+
+    except Exception as e:
+        print("\nCandidate training failed.")
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+# ============================================================
+# Entry point
+# ============================================================
+
+if __name__ == "__main__":
+    main()
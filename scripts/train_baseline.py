@@ -1,14 +1,13 @@
 from pathlib import Path
 import sys
 
-import numpy as np
-
-from src.models.baseline import train_logistic_regression
-from src.models.evaluation import (
-    evaluate_binary_classifier,
-    compute_calibration_data,
+from src.retraining.jobs import (
+    TrainingSpec,
+    evaluate_model,
+    fit_model,
+    load_training_data,
+    save_training_artifacts,
 )
-from src.models.artifacts import save_model, save_metrics
 
 
 # ============================================================
@@ -20,10 +19,6 @@ LABELS_DIR = Path("artifacts/labels")
 
 ARTIFACTS_DIR = Path("artifacts/models/baseline")
 
-MODEL_PATH = ARTIFACTS_DIR / "model.joblib"
-METRICS_PATH = ARTIFACTS_DIR / "metrics.json"
-CALIBRATION_PATH = ARTIFACTS_DIR / "calibration.npz"
-
 
 # ============================================================
 # Main execution
@@ -31,41 +26,27 @@ CALIBRATION_PATH = ARTIFACTS_DIR / "calibration.npz"
 
 def main() -> None:
     try:
-        print("Loading feature matrices...")
-        X_train = np.load(FEATURES_DIR / "X_train.npy")
-        X_val = np.load(FEATURES_DIR / "X_val.npy")
+        spec = TrainingSpec(
+            model_type="baseline",
+            features_dir=FEATURES_DIR,
+            labels_dir=LABELS_DIR,
+        )
 
-        print("Loading labels...")
-        y_train = np.load(LABELS_DIR / "y_train.npy", allow_pickle=True)
-        y_val = np.load(LABELS_DIR / "y_val.npy", allow_pickle=True)
-        y_train = y_train.astype(int)
-        y_val = y_val.astype(int)
+        print("Loading feature matrices and labels...")
+        X_train, y_train, X_val, y_val = load_training_data(spec)
 
         print("Training logistic regression baseline...")
-        model = train_logistic_regression(X_train, y_train)
+        model = fit_model(spec, X_train, y_train)
 
         print("Evaluating on validation set...")
-        metrics = evaluate_binary_classifier(model, X_val, y_val)
-
-        mean_pred, frac_pos = compute_calibration_data(
-            model, X_val, y_val
-        )
+        result = evaluate_model(model, X_val, y_val, n_train=len(X_train))
 
         print("Persisting model artifacts...")
-        ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
-
-        save_model(model, MODEL_PATH)
-        save_metrics(metrics, METRICS_PATH)
-
-        np.savez(
-            CALIBRATION_PATH,
-            mean_predicted_value=mean_pred,
-            fraction_of_positives=frac_pos,
-        )
+        save_training_artifacts(result, ARTIFACTS_DIR)
 
         print("\nBaseline training completed.")
         print("Validation metrics:")
-        for k, v in metrics.items():
+        for k, v in result.metrics.items():
             print(f"  {k}: {v:.4f}")
 
     except Exception as e:
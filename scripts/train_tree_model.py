@@ -1,15 +1,28 @@
 from pathlib import Path
 import argparse
+import json
 import sys
 
 import numpy as np
 
-from src.models.tree_models import train_xgboost, train_lightgbm
-from src.models.evaluation import (
-    evaluate_binary_classifier,
-    compute_calibration_data,
+from src.models.tree_models import continue_training, n_trees
+from src.models.predictions import evaluate_scores
+from src.models.lgb_dataset import train_lightgbm_cached
+from src.models.registry import load_metadata, load_model
+from src.models.search import (
+    SEARCH_SPACES,
+    run_search,
+    sample_configurations,
+    save_leaderboard,
+)
+from src.retraining.jobs import (
+    TrainingSpec,
+    evaluate_model,
+    fit_model,
+    load_training_data,
+    register_training_result,
+    save_training_artifacts,
 )
-from src.models.artifacts import save_model, save_metrics
 
 
 # ============================================================
@@ -50,7 +63,221 @@ def parse_args() -> argparse.Namespace:
         type=int,
         default=20
     )
-    return parser.parse_args()
+
+    # Continuation mode
+    parser.add_argument(
+        "--continue-from",
+        default=None,
+        help="Registered version to warm-start from (e.g. v1.1.0)",
+    )
+    parser.add_argument(
+        "--version",
+        default=None,
+        help="Version to register the continued model under",
+    )
+    parser.add_argument(
+        "--n-new-trees",
+        type=int,
+        default=50,
+    )
+    parser.add_argument(
+        "--new-features",
+        type=Path,
+        default=None,
+        help="Preprocessed matrix (.npy) of newly arrived rows only",
+    )
+    parser.add_argument(
+        "--new-labels",
+        type=Path,
+        default=None,
+    )
+    parser.add_argument(
+        "--training-end-index",
+        type=int,
+        default=None,
+        help="End index of the history after the new rows "
+             "(default: parent end index + new rows)",
+    )
+
+    # Search mode
+    parser.add_argument(
+        "--search",
+        type=int,
+        default=None,
+        metavar="N_TRIALS",
+        help="Run a parallel random search of N_TRIALS configurations",
+    )
+    parser.add_argument(
+        "--n-workers",
+        type=int,
+        default=None,
+        help="Search worker processes (default: all CPUs)",
+    )
+    parser.add_argument(
+        "--leaderboard",
+        type=Path,
+        default=None,
+        help="Leaderboard path (default: <model dir>/leaderboard.json)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+    )
+
+    # LightGBM dataset cache and early stopping
+    parser.add_argument(
+        "--dataset-cache",
+        action="store_true",
+        help="Reuse the binned LightGBM training dataset across runs",
+    )
+    parser.add_argument(
+        "--early-stopping-rounds",
+        type=int,
+        default=None,
+        help="Stop when validation logloss has not improved for N rounds",
+    )
+
+    args = parser.parse_args()
+    if args.search is not None and args.search < 1:
+        parser.error("--search needs at least 1 trial")
+
+    return args
+
+
+def load_feature_version() -> str:
+    with open(FEATURES_DIR / "feature_metadata.json", "r") as f:
+        return json.load(f)["version"]
+
+
+# ============================================================
+# Hyperparameter search
+# ============================================================
+
+def run_search_mode(args: argparse.Namespace) -> None:
+
+    print("Loading feature matrices...")
+    X_train = np.load(FEATURES_DIR / "X_train.npy")
+    X_val = np.load(FEATURES_DIR / "X_val.npy")
+    y_train = np.load(LABELS_DIR / "y_train.npy", allow_pickle=True)
+    y_val = np.load(LABELS_DIR / "y_val.npy", allow_pickle=True)
+
+    configurations = sample_configurations(
+        SEARCH_SPACES[args.model],
+        args.search,
+        seed=args.seed,
+    )
+
+    print(f"Searching {len(configurations)} {args.model} configurations...")
+    leaderboard = run_search(
+        X_train,
+        y_train,
+        X_val,
+        y_val,
+        model_type=args.model,
+        configurations=configurations,
+        n_workers=args.n_workers,
+        feature_version=(
+            load_feature_version() if args.dataset_cache else None
+        ),
+        early_stopping_rounds=args.early_stopping_rounds,
+    )
+
+    path = args.leaderboard
+    if path is None:
+        path = ARTIFACTS_BASE_DIR / args.model / "leaderboard.json"
+    save_leaderboard(leaderboard, path)
+
+    print(f"\n{'rank':>4} {'roc_auc':>8} {'pr_auc':>8}  params")
+    for rank, entry in enumerate(leaderboard[:10], start=1):
+        print(
+            f"{rank:>4} {entry['roc_auc']:8.4f} {entry['pr_auc']:8.4f}  "
+            f"{entry['params']}"
+        )
+    print(f"\nLeaderboard written to: {path}")
+
+
+# ============================================================
+# Continuation
+# ============================================================
+
+def run_continuation(args: argparse.Namespace) -> None:
+
+    if args.version is None:
+        raise ValueError("--version is required with --continue-from")
+    if args.new_features is None or args.new_labels is None:
+        raise ValueError(
+            "--new-features and --new-labels are required "
+            "with --continue-from"
+        )
+
+    print(f"Loading parent version {args.continue_from}...")
+    base_model, preprocessor = load_model(
+        model_name=args.model,
+        version=args.continue_from,
+    )
+    parent_metadata = load_metadata(
+        model_name=args.model,
+        version=args.continue_from,
+    )
+
+    X_new = np.load(args.new_features)
+    y_new = np.load(args.new_labels, allow_pickle=True).astype(int)
+    X_val = np.load(FEATURES_DIR / "X_val.npy")
+    y_val = np.load(LABELS_DIR / "y_val.npy", allow_pickle=True).astype(int)
+
+    print(f"Adding {args.n_new_trees} trees on {len(X_new)} new rows...")
+    model = continue_training(
+        base_model,
+        X_new,
+        y_new,
+        n_estimators=args.n_new_trees,
+    )
+
+    print("Evaluating on validation set...")
+    result = evaluate_model(model, X_val, y_val, n_train=len(X_new))
+    metrics = result.metrics
+    parent_metrics = evaluate_scores(
+        y_val, base_model.predict_proba(X_val)[:, 1]
+    ).metrics
+
+    parent_training = parent_metadata.get("training_data", {})
+    parent_end = parent_training.get("end_index")
+    end_index = args.training_end_index
+    if end_index is None and parent_end is not None:
+        end_index = parent_end + len(X_new)
+
+    metadata = {
+        "training_data": {
+            **parent_training,
+            "continued_from_index": parent_end,
+            "end_index": end_index,
+            "n_new_rows": int(len(X_new)),
+        },
+        "feature_contract": parent_metadata.get("feature_contract"),
+        "hyperparameters": model.get_params(),
+        "lineage": {
+            "parent_version": args.continue_from,
+            "parent_n_trees": n_trees(base_model),
+            "n_trees": n_trees(model),
+            "parent_roc_auc": parent_metrics["roc_auc"],
+        },
+    }
+
+    print("Registering continued model...")
+    path = register_training_result(
+        result,
+        model_name=args.model,
+        version=args.version,
+        preprocessor=preprocessor,
+        metadata=metadata,
+    )
+
+    print(f"\n{args.model.upper()} continuation completed.")
+    print(f"Location: {path}")
+    print("Validation metrics (parent -> continued):")
+    for k, v in metrics.items():
+        print(f"  {k}: {parent_metrics[k]:.4f} -> {v:.4f}")
 
 
 # ============================================================
@@ -61,64 +288,63 @@ def main() -> None:
     args = parse_args()
 
     try:
-        print("Loading feature matrices...")
-        X_train = np.load(FEATURES_DIR / "X_train.npy")
-        X_val = np.load(FEATURES_DIR / "X_val.npy")
+        if args.continue_from is not None:
+            run_continuation(args)
+            return
+        if args.search is not None:
+            run_search_mode(args)
+            return
 
-        print("Loading labels...")
-        y_train = np.load(LABELS_DIR / "y_train.npy", allow_pickle=True).astype(int)
-        y_val = np.load(LABELS_DIR / "y_val.npy", allow_pickle=True).astype(int)
+        # XGBoost trains with train_xgboost's defaults; the tree-shape
+        # flags only apply to LightGBM
+        params = {}
+        if args.model == "lightgbm":
+            params = {
+                "num_leaves": args.num_leaves,
+                "max_depth": args.max_depth,
+                "min_child_samples": args.min_child_samples,
+            }
+        spec = TrainingSpec(
+            model_type=args.model,
+            params=params,
+            n_jobs=-1,
+            features_dir=FEATURES_DIR,
+            labels_dir=LABELS_DIR,
+        )
 
-        print(f"Training {args.model} model...")
+        print("Loading feature matrices and labels...")
+        X_train, y_train, X_val, y_val = load_training_data(spec)
 
-        if args.model == "xgboost":
-            model = train_xgboost(
-                X_train,
-                y_train,
-                n_estimators=300,
-                max_depth=5,
-                learning_rate=0.05,
-                subsample=0.8,
-                colsample_bytree=0.8,
-            )
-        elif args.model == "lightgbm":
-            model = train_lightgbm(
+        print(f"Training {args.model} model...")
+        if args.model == "lightgbm" and (
+            args.dataset_cache or args.early_stopping_rounds is not None
+        ):
+            model = train_lightgbm_cached(
                 X_train,
                 y_train,
+                feature_version=load_feature_version(),
+                X_val=X_val,
+                y_val=y_val,
+                early_stopping_rounds=args.early_stopping_rounds,
                 n_estimators=300,
-                num_leaves=args.num_leaves,
-                max_depth=args.max_depth,
-                min_child_samples=args.min_child_samples,
                 learning_rate=0.05,
                 subsample=0.8,
                 colsample_bytree=0.8,
+                **params,
             )
+            print(f"Trees kept: {model.best_iteration_}")
         else:
-            raise ValueError(f"Unsupported model type: {args.model}")
+            model = fit_model(spec, X_train, y_train)
 
         print("Evaluating on validation set...")
-        metrics = evaluate_binary_classifier(model, X_val, y_val)
-
-        mean_pred, frac_pos = compute_calibration_data(
-            model, X_val, y_val
-        )
-
-        model_dir = ARTIFACTS_BASE_DIR / args.model
-        model_dir.mkdir(parents=True, exist_ok=True)
+        result = evaluate_model(model, X_val, y_val, n_train=len(X_train))
 
         print("Persisting model artifacts...")
-        save_model(model, model_dir / "model.joblib")
-        save_metrics(metrics, model_dir / "metrics.json")
-
-        np.savez(
-            model_dir / "calibration.npz",
-            mean_predicted_value=mean_pred,
-            fraction_of_positives=frac_pos,
-        )
+        save_training_artifacts(result, ARTIFACTS_BASE_DIR / args.model)
 
         print(f"\n{args.model.upper()} training completed.")
         print("Validation metrics:")
-        for k, v in metrics.items():
+        for k, v in result.metrics.items():
             print(f"  {k}: {v:.4f}")
 
     except Exception as e:
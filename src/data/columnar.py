@@ -0,0 +1,527 @@
+"""
+Typed columnar cache for raw ARFF/CSV sources.
+
+A raw file is streamed once in chunks and written as one little-endian
+binary file per column plus a manifest.json holding the row count, each
+column's explicit dtype (int64/float64, nominal levels as int64 values or
+int32 codes) and the size/mtime of the source it was built from. Later
+reads memory-map only the requested columns, so nothing is parsed again
+and unused columns are never touched.
+
+The schema check runs on the header alone, before any row is read.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+)
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# Defaults
+# -----------------------------
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+MANIFEST_NAME = "manifest.json"
+
+_ARFF_NUMERIC = {"real": "float64", "numeric": "float64", "integer": "int64"}
+
+
+# -----------------------------
+# Header
+# -----------------------------
+
+@dataclass(frozen=True)
+class RawHeader:
+
+    format: str
+    columns: List[str]
+    dtypes: Dict[str, str]
+
+    # Nominal columns: levels in declaration (or discovery) order
+    categories: Dict[str, List[str]] = field(default_factory=dict)
+
+    # Byte offset of the first data line
+    data_offset: int = 0
+
+
+def _unquote(token: str) -> str:
+
+    if len(token) >= 2 and token[0] == token[-1] and token[0] in "'\"":
+        return token[1:-1]
+    return token
+
+
+def _nominal_dtype(levels: Sequence[str]) -> str:
+    """Integer-valued levels are stored as their values, others as codes."""
+
+    try:
+        [int(level) for level in levels]
+    except ValueError:
+        return "int32"
+    return "int64"
+
+
+def _read_arff_header(path: Path) -> RawHeader:
+
+    columns, dtypes, categories = [], {}, {}
+
+    with open(path, "rb") as f:
+        for raw_line in iter(f.readline, b""):
+            line = raw_line.decode("utf-8").strip()
+            if not line or line.startswith("%"):
+                continue
+
+            keyword = line.split(None, 1)[0].lower()
+            if keyword == "@data":
+                return RawHeader(
+                    format="arff",
+                    columns=columns,
+                    dtypes=dtypes,
+                    categories=categories,
+                    data_offset=f.tell(),
+                )
+            if keyword != "@attribute":
+                continue
+
+            rest = line.split(None, 1)[1]
+            if rest[0] in "'\"":
+                end = rest.index(rest[0], 1)
+                name, kind = rest[1:end], rest[end + 1:].strip()
+            else:
+                name, kind = rest.split(None, 1)
+
+            if kind.startswith("{"):
+                levels = [
+                    _unquote(level.strip())
+                    for level in kind.strip("{}").split(",")
+                ]
+                categories[name] = levels
+                dtypes[name] = _nominal_dtype(levels)
+            elif kind.lower() in _ARFF_NUMERIC:
+                dtypes[name] = _ARFF_NUMERIC[kind.lower()]
+            else:
+                raise ValueError(
+                    f"Unsupported ARFF attribute type for {name}: {kind}"
+                )
+            columns.append(name)
+
+    raise ValueError(f"No @DATA section in ARFF file: {path}")
+
+
+def _read_csv_header(path: Path) -> RawHeader:
+
+    # Dtypes come from the first chunk and may widen later; see
+    # iter_raw_chunks
+    with open(path, "rb") as f:
+        header = f.readline().decode("utf-8").strip()
+
+    columns = [_unquote(name.strip()) for name in header.split(",")]
+
+    return RawHeader(format="csv", columns=columns, dtypes={})
+
+
+def read_raw_header(path: Path) -> RawHeader:
+
+    if not path.exists():
+        raise FileNotFoundError(f"Raw data file not found: {path}")
+
+    if path.suffix.lower() == ".arff":
+        return _read_arff_header(path)
+    if path.suffix.lower() == ".csv":
+        return _read_csv_header(path)
+
+    raise ValueError(f"Unsupported raw data format: {path.suffix}")
+
+
+# -----------------------------
+# Chunked reading
+# -----------------------------
+
+def _encode_nominal(
+    name: str,
+    values: pd.Series,
+    levels: List[str],
+    dtype: str,
+) -> np.ndarray:
+
+    codes = pd.Categorical(values, categories=levels).codes
+    unknown = (codes < 0) & values.notna().to_numpy()
+    if unknown.any():
+        raise ValueError(
+            f"{name}: undeclared nominal values "
+            f"{sorted(set(values[unknown]))}"
+        )
+    if (codes < 0).any():
+        raise ValueError(f"{name}: missing values in a nominal column")
+
+    if dtype == "int64":
+        return np.array([int(level) for level in levels])[codes]
+    return codes.astype(np.int32)
+
+
+def _infer_csv_dtypes(chunk: pd.DataFrame, header: RawHeader) -> None:
+
+    for name in header.columns:
+        kind = chunk[name].dtype.kind
+        if kind in "iub":
+            header.dtypes[name] = "int64"
+        elif kind == "f":
+            header.dtypes[name] = "float64"
+        else:
+            header.categories[name] = []
+            header.dtypes[name] = "int32"
+
+
+def _non_numeric_error(
+    name: str,
+    values: pd.Series,
+    start: int,
+) -> ValueError:
+
+    bad = values[pd.to_numeric(values, errors="coerce").isna()]
+    bad = bad[bad.notna()]
+
+    return ValueError(
+        f"{name}: non-numeric values in a numeric column in rows "
+        f"{start}-{start + len(values) - 1} "
+        f"(e.g. {bad.head(3).tolist()})"
+    )
+
+
+def _typed_chunk(
+    chunk: pd.DataFrame,
+    header: RawHeader,
+    *,
+    start: int = 0,
+) -> Dict[str, np.ndarray]:
+
+    typed = {}
+    for name in header.columns:
+        dtype = header.dtypes[name]
+        values = chunk[name]
+
+        if name in header.categories:
+            levels = header.categories[name]
+            if header.format == "csv":
+                # CSV levels are discovered as they appear
+                seen = set(levels)
+                levels.extend(
+                    level for level in pd.unique(values.dropna())
+                    if level not in seen
+                )
+            typed[name] = _encode_nominal(name, values, levels, dtype)
+            continue
+
+        array = values.to_numpy()
+        if array.dtype.kind not in "iubf":
+            # Typed from an earlier chunk; strings here cannot be stored
+            raise _non_numeric_error(name, values, start)
+
+        if dtype == "int64":
+            if values.isna().any():
+                problem = "missing values in an int column"
+            else:
+                converted = array.astype(np.int64)
+                problem = (
+                    None if np.array_equal(converted, array)
+                    else "non-integer values in int column"
+                )
+
+            if problem is None:
+                array = converted
+            elif header.format == "csv":
+                # Inferred from an earlier chunk: widen rather than fail
+                header.dtypes[name] = dtype = "float64"
+            else:
+                raise ValueError(f"{name}: {problem}")
+
+        typed[name] = np.ascontiguousarray(array, dtype=dtype)
+
+    return typed
+
+
+def iter_raw_chunks(
+    path: Path,
+    *,
+    header: Optional[RawHeader] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Typed column arrays of a raw file, chunk_rows rows at a time. CSV
+    dtypes are inferred from the first chunk; an int column that later
+    holds a missing or fractional value is widened to float64 in
+    header.dtypes from that chunk on.
+    """
+
+    header = header or read_raw_header(path)
+
+    if header.format == "arff":
+        options = {
+            "header": None,
+            "names": header.columns,
+            "comment": "%",
+            "quotechar": "'",
+            "skipinitialspace": True,
+            "na_values": ["?"],
+            "keep_default_na": False,
+            "dtype": {
+                name: str if name in header.categories else np.float64
+                for name in header.columns
+            },
+        }
+    else:
+        options = {}
+
+    with open(path, "rb") as f:
+        f.seek(header.data_offset)
+        reader = pd.read_csv(f, chunksize=chunk_rows, **options)
+
+        start = 0
+        for chunk in reader:
+            if not header.dtypes:
+                _infer_csv_dtypes(chunk, header)
+            yield _typed_chunk(chunk, header, start=start)
+            start += len(chunk)
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+
+def _source_stamp(path: Path) -> Dict[str, int]:
+
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_manifest(cache_dir: Path) -> Dict:
+
+    manifest_path = cache_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"No columnar cache at: {cache_dir}")
+
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def cache_is_fresh(source_path: Path, cache_dir: Path) -> bool:
+
+    try:
+        manifest = load_manifest(cache_dir)
+    except FileNotFoundError:
+        return False
+
+    return manifest["source"]["stamp"] == _source_stamp(source_path)
+
+
+def _widen_file(path: Path, old: np.dtype, new: np.dtype):
+    """Rewrite a column file as the new dtype; returns it open to append."""
+
+    values = np.fromfile(path, dtype=old.newbyteorder("<"))
+    values.astype(new.newbyteorder("<")).tofile(path)
+
+    return open(path, "ab")
+
+
+def _write_store(
+    chunks: Iterable[Dict[str, np.ndarray]],
+    cache_dir: Path,
+    *,
+    header: RawHeader,
+    source: Dict[str, Any],
+) -> Path:
+
+    # Build next to the target, then swap in one rename
+    tmp_dir = cache_dir.with_name(f"{cache_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    n_rows = 0
+    files = {}
+    written = {}
+    try:
+        for chunk in chunks:
+            for name, values in chunk.items():
+                if name not in files:
+                    files[name] = open(tmp_dir / f"{name}.bin", "wb")
+                    written[name] = values.dtype
+                elif values.dtype != written[name]:
+                    files[name].close()
+                    files[name] = _widen_file(
+                        tmp_dir / f"{name}.bin",
+                        written[name],
+                        values.dtype,
+                    )
+                    written[name] = values.dtype
+                values.astype(values.dtype.newbyteorder("<")).tofile(
+                    files[name]
+                )
+            n_rows += len(next(iter(chunk.values())))
+    finally:
+        for f in files.values():
+            f.close()
+
+    manifest = {
+        "source": source,
+        "n_rows": n_rows,
+        "columns": [
+            {
+                "name": name,
+                "dtype": header.dtypes.get(name, "float64"),
+                **(
+                    {"categories": header.categories[name]}
+                    if header.dtypes.get(name) == "int32"
+                    else {}
+                ),
+            }
+            for name in header.columns
+        ],
+    }
+    with open(tmp_dir / MANIFEST_NAME, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+    return cache_dir
+
+
+def build_column_cache(
+    source_path: Path,
+    cache_dir: Path,
+    *,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    validate_header: Optional[Callable[[pd.DataFrame], None]] = None,
+) -> Path:
+    """
+    Stream source_path into a columnar cache at cache_dir. validate_header
+    (e.g. validate_schema) gets an empty frame with the raw columns.
+    """
+
+    header = read_raw_header(source_path)
+    if validate_header is not None:
+        validate_header(pd.DataFrame(columns=header.columns))
+
+    chunks = iter_raw_chunks(
+        source_path,
+        header=header,
+        chunk_rows=chunk_rows,
+    )
+
+    return _write_store(
+        chunks,
+        cache_dir,
+        header=header,
+        source={
+            "path": str(source_path),
+            "format": header.format,
+            "stamp": _source_stamp(source_path),
+        },
+    )
+
+
+def write_columns(
+    columns: Mapping[str, np.ndarray],
+    cache_dir: Path,
+    *,
+    source: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """Store in-memory numeric columns in the same columnar layout."""
+
+    dtypes = {}
+    for name, values in columns.items():
+        kind = values.dtype.kind
+        if kind in "iub":
+            dtypes[name] = "int64"
+        elif kind == "f":
+            dtypes[name] = "float64"
+        else:
+            raise ValueError(
+                f"{name}: only numeric columns can be stored, "
+                f"got dtype {values.dtype}"
+            )
+
+    header = RawHeader(format="arrays", columns=list(columns), dtypes=dtypes)
+    chunk = {
+        name: np.ascontiguousarray(values, dtype=dtypes[name])
+        for name, values in columns.items()
+    }
+
+    return _write_store(
+        [chunk] if len(chunk) else [],
+        cache_dir,
+        header=header,
+        source=source or {"format": "arrays"},
+    )
+
+
+def open_columns(
+    cache_dir: Path,
+    columns: Optional[Sequence[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """Read-only memory maps of the requested columns (all by default)."""
+
+    manifest = load_manifest(cache_dir)
+    specs = {spec["name"]: spec for spec in manifest["columns"]}
+
+    names = list(specs) if columns is None else list(columns)
+    missing = [name for name in names if name not in specs]
+    if missing:
+        raise KeyError(f"Columns not in cache {cache_dir}: {missing}")
+
+    n_rows = manifest["n_rows"]
+    arrays = {}
+    for name in names:
+        dtype = np.dtype(specs[name]["dtype"]).newbyteorder("<")
+        if n_rows == 0:
+            arrays[name] = np.empty(0, dtype=dtype)
+            continue
+        arrays[name] = np.memmap(
+            cache_dir / f"{name}.bin",
+            dtype=dtype,
+            mode="r",
+            shape=(n_rows,),
+        )
+
+    return arrays
+
+
+def load_column_cache(
+    cache_dir: Path,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Projected DataFrame; code-stored nominal columns become strings."""
+
+    manifest = load_manifest(cache_dir)
+    categories = {
+        spec["name"]: spec["categories"]
+        for spec in manifest["columns"]
+        if "categories" in spec
+    }
+
+    data = {}
+    for name, values in open_columns(cache_dir, columns).items():
+        if name in categories:
+            data[name] = np.asarray(categories[name], dtype=object)[values]
+        else:
+            data[name] = np.array(values)
+
+    return pd.DataFrame(data)
@@ -1,9 +1,14 @@
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence
 
 import pandas as pd
-from scipy.io import arff
 
+from src.data.columnar import (
+    DEFAULT_CHUNK_ROWS,
+    build_column_cache,
+    cache_is_fresh,
+    load_column_cache,
+)
 from src.data.schema import validate_schema
 
 
@@ -43,27 +48,48 @@ RAW_TO_SEMANTIC_COLUMN_MAP: Dict[str, str] = {
 # -----------------------------
 
 
+RAW_CACHE_DIR = Path("data/interim/columnar")
+
+
 def load_openml_credit_default(
     arff_path: Path,
     apply_semantic_mapping: bool = True,
+    *,
+    cache_dir: Optional[Path] = None,
+    columns: Optional[Sequence[str]] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
 ) -> pd.DataFrame:
+    """
+    Load the raw dataset through its columnar cache (by default
+    RAW_CACHE_DIR/<file stem>), converting the ARFF in chunks only when
+    the cache is missing or older than the file. columns projects the
+    read; names follow apply_semantic_mapping.
+    """
 
     if not arff_path.exists():
         raise FileNotFoundError(f"ARFF file not found: {arff_path}")
 
-    # Load ARFF
-    raw_data, _ = arff.loadarff(arff_path)
-    df = pd.DataFrame(raw_data)
+    cache_dir = cache_dir or RAW_CACHE_DIR / arff_path.stem
+
+    # 🔒 VALIDATE RAW SCHEMA HERE (on the header, before any row is read)
+    if not cache_is_fresh(arff_path, cache_dir):
+        build_column_cache(
+            arff_path,
+            cache_dir,
+            chunk_rows=chunk_rows,
+            validate_header=validate_schema,
+        )
 
-    # Decode byte strings
-    for col in df.select_dtypes(include=["object"]).columns:
-        df[col] = df[col].str.decode("utf-8")
+    semantic_to_raw = {
+        semantic: raw for raw, semantic in RAW_TO_SEMANTIC_COLUMN_MAP.items()
+    }
+    if columns is not None and apply_semantic_mapping:
+        columns = [semantic_to_raw.get(name, name) for name in columns]
 
-    # 🔒 VALIDATE RAW SCHEMA HERE (before renaming)
-    validate_schema(df)
+    df = load_column_cache(cache_dir, columns)
 
     # Apply semantic feature mapping
     if apply_semantic_mapping:
         df = df.rename(columns=RAW_TO_SEMANTIC_COLUMN_MAP)
 
-    return df
\ No newline at end of file
+    return df
@@ -1,9 +1,13 @@
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import json
 
 import pandas as pd
 import numpy as np
 
+from src.data.columnar import open_columns, write_columns
+
 
 # -----------------------------
 # Split configuration
@@ -15,6 +19,12 @@ TEST_FRACTION = 0.15
 
 LABELS_OUTPUT_DIR = Path("artifacts/labels")
 
+SPLIT_NAMES = ("train", "validation", "test")
+
+# Splits are row ranges into one time-sorted columnar snapshot
+SNAPSHOT_DIRNAME = "snapshot"
+SPLITS_MANIFEST = "splits.json"
+
 assert abs(TRAIN_FRACTION + VALIDATION_FRACTION + TEST_FRACTION - 1.0) < 1e-6
 
 
@@ -57,10 +67,26 @@ def temporal_split(
     y_val = y[train_end:val_end]
     y_test = y[val_end:]
 
-    # Persist immutable snapshots
-    train_df.to_csv(output_dir / "train.csv", index=False)
-    val_df.to_csv(output_dir / "validation.csv", index=False)
-    test_df.to_csv(output_dir / "test.csv", index=False)
+    # Persist one immutable snapshot; each split is a row range into it
+    write_columns(
+        {name: X[name].to_numpy() for name in X.columns},
+        output_dir / SNAPSHOT_DIRNAME,
+        source={"format": "temporal_split", "time_column": time_column},
+    )
+    with open(output_dir / SPLITS_MANIFEST, "w") as f:
+        json.dump(
+            {
+                "time_column": time_column,
+                "n_rows": n,
+                "ranges": {
+                    "train": [0, train_end],
+                    "validation": [train_end, val_end],
+                    "test": [val_end, n],
+                },
+            },
+            f,
+            indent=2,
+        )
 
     LABELS_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -68,4 +94,110 @@ def temporal_split(
     np.save(LABELS_OUTPUT_DIR / "y_val.npy", y_val)
     np.save(LABELS_OUTPUT_DIR / "y_test.npy", y_test)
 
-    return train_df, val_df, test_df
\ No newline at end of file
+    return train_df, val_df, test_df
+
+
+# -----------------------------
+# Split readers
+# -----------------------------
+
+def split_range(split_dir: Path, name: str) -> Tuple[int, int]:
+
+    manifest_path = split_dir / SPLITS_MANIFEST
+    if not manifest_path.exists():
+        raise FileNotFoundError(
+            f"No split manifest at: {manifest_path} "
+            "(run scripts/ingest_data.py first)"
+        )
+
+    with open(manifest_path, "r") as f:
+        ranges = json.load(f)["ranges"]
+
+    if name not in ranges:
+        raise KeyError(
+            f"Unknown split '{name}' (expected one of {SPLIT_NAMES})"
+        )
+
+    start, end = ranges[name]
+    return start, end
+
+
+def open_split(
+    split_dir: Path,
+    name: str,
+    columns: Optional[Sequence[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """Memory-mapped views of the requested columns of one split."""
+
+    start, end = split_range(split_dir, name)
+    arrays = open_columns(split_dir / SNAPSHOT_DIRNAME, columns)
+
+    return {column: values[start:end] for column, values in arrays.items()}
+
+
+def load_split(
+    split_dir: Path,
+    name: str,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+
+    return pd.DataFrame(
+        {
+            column: np.array(values)
+            for column, values in open_split(split_dir, name, columns).items()
+        }
+    )
+
+
+def _stack_rows(
+    arrays: Dict[str, np.ndarray],
+    columns: Sequence[str],
+    *,
+    start: int,
+    stop: Optional[int],
+) -> np.ndarray:
+
+    X = np.empty((len(arrays[columns[0]][start:stop]), len(columns)))
+    for j, column in enumerate(columns):
+        X[:, j] = arrays[column][start:stop]
+
+    return X
+
+
+def load_split_matrix(
+    split_dir: Path,
+    name: str,
+    columns: Sequence[str],
+    *,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> np.ndarray:
+    """Float matrix of columns (in order) for rows [start, stop) of a split."""
+
+    return _stack_rows(
+        open_split(split_dir, name, columns),
+        columns,
+        start=start,
+        stop=stop,
+    )
+
+
+def iter_split_chunks(
+    split_dir: Path,
+    name: str,
+    columns: Sequence[str],
+    *,
+    chunk_rows: int,
+) -> Iterator[np.ndarray]:
+
+    # One manifest read and one set of memory maps for every chunk
+    arrays = open_split(split_dir, name, columns)
+    n_rows = len(arrays[columns[0]])
+
+    for offset in range(0, n_rows, chunk_rows):
+        yield _stack_rows(
+            arrays,
+            columns,
+            start=offset,
+            stop=offset + chunk_rows,
+        )
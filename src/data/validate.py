@@ -1,4 +1,7 @@
-from typing import Dict, Iterable
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
 
 
@@ -26,78 +29,311 @@ ORDINAL_MIN_MAX: Dict[str, tuple] = {
     "PAY_6": (-2, 9),
 }
 
+DEFAULT_MAX_SAMPLES = 5
+DEFAULT_CHUNK_ROWS = 100_000
+
 
 # -----------------------------
-# Validation entry point
+# Reports
 # -----------------------------
 
-def validate_data(df: pd.DataFrame) -> None:
+@dataclass(frozen=True)
+class RuleViolation:
+
+    rule: str
+    column: str
+    message: str
+    count: int
+    sample_rows: List[int] = field(default_factory=list)
+    sample_values: List[float] = field(default_factory=list)
+
+    def describe(self) -> str:
+        return (
+            f"{self.message} ({self.count} rows, e.g. rows "
+            f"{self.sample_rows} with values {self.sample_values})"
+        )
+
+
+@dataclass(frozen=True)
+class ValidationReport:
 
-    errors = []
+    n_rows: int = 0
+    violations: Dict[str, RuleViolation] = field(default_factory=dict)
 
-    # -------------------------
-    # Missing value check
-    # -------------------------
-    missing = df.isnull().sum()
-    missing_cols = missing[missing > 0]
+    @property
+    def ok(self) -> bool:
+        return not self.violations
 
-    if not missing_cols.empty:
-        errors.append(
-            "Missing values detected:\n"
-            + missing_cols.to_string()
+    def merge(
+        self,
+        other: "ValidationReport",
+        *,
+        max_samples: int = DEFAULT_MAX_SAMPLES,
+    ) -> "ValidationReport":
+
+        violations = dict(self.violations)
+        for key, violation in other.violations.items():
+            mine = violations.get(key)
+            if mine is None:
+                violations[key] = violation
+                continue
+
+            violations[key] = replace(
+                mine,
+                count=mine.count + violation.count,
+                sample_rows=(
+                    mine.sample_rows + violation.sample_rows
+                )[:max_samples],
+                sample_values=(
+                    mine.sample_values + violation.sample_values
+                )[:max_samples],
+            )
+
+        return ValidationReport(
+            n_rows=self.n_rows + other.n_rows,
+            violations=violations,
         )
 
-    # -------------------------
-    # Numeric range checks
-    # -------------------------
-    for col, (min_val, max_val) in RANGE_CONSTRAINTS.items():
-        if col not in df.columns:
-            continue
-
-        if min_val is not None:
-            invalid = df[df[col] < min_val]
-            if not invalid.empty:
-                errors.append(
-                    f"{col}: values below {min_val} detected"
-                )
+    def errors(self) -> List[str]:
+        return [v.describe() for v in self.violations.values()]
+
+
+# -----------------------------
+# Compiled validator
+# -----------------------------
+
+class CompiledValidator:
+    """
+    All constraints on a fixed column layout, checked in one vectorized
+    pass over a float matrix: a missing-value mask over every column,
+    interval tests for range and ordinal rules, and a lookup table for
+    categorical code sets. Cheap enough for every inference batch.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        *,
+        range_constraints: Mapping[str, tuple] = RANGE_CONSTRAINTS,
+        code_sets: Mapping[str, Iterable[int]] = CATEGORICAL_CODE_SETS,
+        ordinal_min_max: Mapping[str, tuple] = ORDINAL_MIN_MAX,
+        max_samples: int = DEFAULT_MAX_SAMPLES,
+    ) -> None:
+
+        self.columns = list(columns)
+        self.max_samples = max_samples
+        index = {name: j for j, name in enumerate(self.columns)}
 
-        if max_val is not None:
-            invalid = df[df[col] > max_val]
-            if not invalid.empty:
-                errors.append(
-                    f"{col}: values above {max_val} detected"
+        # (rule, column, message) per output column of the rule mask
+        self.rules: List[Tuple[str, str, str]] = [
+            ("missing", name, f"{name}: missing values detected")
+            for name in self.columns
+        ]
+
+        # Interval rules: violated when x < lower or x > upper
+        bounds = []
+        for name, (min_val, max_val) in range_constraints.items():
+            if name not in index:
+                continue
+            if min_val is not None:
+                bounds.append((name, min_val, np.inf))
+                self.rules.append(
+                    ("min", name, f"{name}: values below {min_val} detected")
+                )
+            if max_val is not None:
+                bounds.append((name, -np.inf, max_val))
+                self.rules.append(
+                    ("max", name, f"{name}: values above {max_val} detected")
                 )
+        for name, (min_val, max_val) in ordinal_min_max.items():
+            if name not in index:
+                continue
+            bounds.append((name, min_val, max_val))
+            self.rules.append(
+                (
+                    "ordinal",
+                    name,
+                    f"{name}: values outside [{min_val}, {max_val}] detected",
+                )
+            )
 
-    # -------------------------
-    # Categorical code checks
-    # -------------------------
-    for col, valid_codes in CATEGORICAL_CODE_SETS.items():
-        if col not in df.columns:
-            continue
-
-        invalid_codes = set(df[col].unique()) - valid_codes
-        if invalid_codes:
-            errors.append(
-                f"{col}: invalid codes detected {invalid_codes}"
+        self._bound_cols = np.array(
+            [index[name] for name, _, _ in bounds], dtype=np.intp
+        )
+        self._lower = np.array([lo for _, lo, _ in bounds], dtype=np.float64)
+        self._upper = np.array([hi for _, _, hi in bounds], dtype=np.float64)
+
+        # Code sets: one boolean table, a [base, base + span) slice per rule
+        code_cols, bases, spans, offsets, table = [], [], [], [], []
+        for name, codes in code_sets.items():
+            if name not in index:
+                continue
+            codes = sorted(int(code) for code in codes)
+            base, span = codes[0], codes[-1] - codes[0] + 1
+
+            segment = np.zeros(span, dtype=bool)
+            segment[np.array(codes) - base] = True
+
+            code_cols.append(index[name])
+            bases.append(base)
+            spans.append(span)
+            offsets.append(sum(len(t) for t in table))
+            table.append(segment)
+            self.rules.append(
+                ("codes", name, f"{name}: invalid codes detected")
             )
 
-    # -------------------------
-    # Ordinal range checks
-    # -------------------------
-    for col, (min_val, max_val) in ORDINAL_MIN_MAX.items():
-        if col not in df.columns:
-            continue
-
-        invalid = df[(df[col] < min_val) | (df[col] > max_val)]
-        if not invalid.empty:
-            errors.append(
-                f"{col}: values outside [{min_val}, {max_val}] detected"
+        self._code_cols = np.array(code_cols, dtype=np.intp)
+        self._bases = np.array(bases, dtype=np.float64)
+        self._spans = np.array(spans, dtype=np.float64)
+        self._offsets = np.array(offsets, dtype=np.intp)
+        self._table = (
+            np.concatenate(table) if table else np.zeros(0, dtype=bool)
+        )
+
+        # Column whose value is sampled for each rule
+        self._rule_cols = np.array(
+            [index[name] for _, name, _ in self.rules], dtype=np.intp
+        )
+
+    def _violation_mask(self, X: np.ndarray) -> np.ndarray:
+
+        missing = np.isnan(X)
+
+        B = X[:, self._bound_cols]
+        out_of_bounds = (B < self._lower) | (B > self._upper)
+
+        C = X[:, self._code_cols] - self._bases
+        inside = (C >= 0) & (C < self._spans) & (C == np.floor(C))
+        lookup = np.where(inside, C, 0).astype(np.intp) + self._offsets
+        invalid_code = ~(inside & self._table[lookup]) & ~np.isnan(C)
+
+        return np.hstack([missing, out_of_bounds, invalid_code])
+
+    def validate(
+        self,
+        X: np.ndarray,
+        *,
+        row_offset: int = 0,
+    ) -> ValidationReport:
+        """Check a (n, len(columns)) matrix; row ids start at row_offset."""
+
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.columns):
+            raise ValueError(
+                f"Expected a (n, {len(self.columns)}) matrix, "
+                f"got shape {X.shape}"
+            )
+
+        mask = self._violation_mask(X)
+        counts = mask.sum(axis=0)
+
+        violations = {}
+        for j in np.flatnonzero(counts):
+            rule, column, message = self.rules[j]
+            rows = np.flatnonzero(mask[:, j])[:self.max_samples]
+            violations[f"{column}:{rule}"] = RuleViolation(
+                rule=rule,
+                column=column,
+                message=message,
+                count=int(counts[j]),
+                sample_rows=(rows + row_offset).tolist(),
+                sample_values=X[rows, self._rule_cols[j]].tolist(),
+            )
+
+        return ValidationReport(n_rows=len(X), violations=violations)
+
+    def validate_chunks(
+        self,
+        chunks: Iterable[np.ndarray],
+    ) -> ValidationReport:
+
+        report = ValidationReport()
+        for X in chunks:
+            report = report.merge(
+                self.validate(X, row_offset=report.n_rows),
+                max_samples=self.max_samples,
             )
 
-    # -------------------------
-    # Final decision
-    # -------------------------
+        return report
+
+    def validate_columns(
+        self,
+        arrays: Mapping[str, np.ndarray],
+        *,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> ValidationReport:
+        """
+        Validate column arrays (e.g. memory maps from the columnar cache)
+        chunk by chunk, so only chunk_rows rows are ever materialized.
+        """
+
+        n_rows = len(arrays[self.columns[0]]) if self.columns else 0
+
+        def chunks():
+            for start in range(0, n_rows, chunk_rows):
+                stop = min(start + chunk_rows, n_rows)
+                X = np.empty((stop - start, len(self.columns)))
+                for j, name in enumerate(self.columns):
+                    X[:, j] = arrays[name][start:stop]
+                yield X
+
+        return self.validate_chunks(chunks())
+
+
+# -----------------------------
+# Validation entry point
+# -----------------------------
+
+def validate_data(
+    df: pd.DataFrame,
+    *,
+    chunk_rows: Optional[int] = None,
+) -> ValidationReport:
+
+    constrained = (
+        set(RANGE_CONSTRAINTS)
+        | set(CATEGORICAL_CODE_SETS)
+        | set(ORDINAL_MIN_MAX)
+    )
+    numeric = [
+        col for col in df.columns
+        if col in constrained
+        or pd.api.types.is_numeric_dtype(df[col].dtype)
+    ]
+    validator = CompiledValidator(numeric)
+
+    # Constrained columns are checked whatever their dtype; values that do
+    # not parse as numbers become NaN and count as missing
+    arrays, unparsed = {}, {}
+    for col in numeric:
+        values = df[col]
+        if not pd.api.types.is_numeric_dtype(values.dtype):
+            coerced = pd.to_numeric(values, errors="coerce")
+            bad = coerced.isna() & values.notna()
+            if bad.any():
+                unparsed[col] = sorted(set(map(str, values[bad])))
+            values = coerced
+        arrays[col] = values.to_numpy(dtype=np.float64)
+
+    report = validator.validate_columns(
+        arrays,
+        chunk_rows=chunk_rows or max(len(df), 1),
+    )
+
+    errors = report.errors()
+    for col, values in unparsed.items():
+        errors.append(f"{col}: non-numeric values detected {values}")
+
+    # Non-numeric columns only get the missing value check
+    for col in df.columns.difference(numeric, sort=False):
+        n_missing = int(df[col].isna().sum())
+        if n_missing:
+            errors.append(f"{col}: missing values detected ({n_missing} rows)")
+
     if errors:
         raise ValueError(
             "Data validation failed:\n" + "\n".join(errors)
-        )
\ No newline at end of file
+        )
+
+    return report
@@ -0,0 +1,243 @@
+"""
+Compiled NumPy fast path for the fitted preprocessing pipeline.
+
+The fitted ColumnTransformer from build_preprocessing_pipeline is flattened
+into plain arrays (scaler mean/scale, one-hot and ordinal lookup tables) so
+a raw float matrix in ALL_FEATURES order can be transformed in a single
+vectorized pass, without pandas or per-transformer overhead.
+
+The output is identical, bit for bit, to preprocessor.transform.
+"""
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+
+from src.features.contracts import (
+    ALL_FEATURES,
+    CONTINUOUS_FEATURES,
+    CATEGORICAL_FEATURES,
+    ORDINAL_FEATURES,
+)
+
+
+# ============================================================
+# Compiled representation
+# ============================================================
+
+@dataclass(frozen=True)
+class CompiledPreprocessor:
+
+    feature_names: List[str]
+
+    # Continuous block: (X[:, num_idx] - mean) / scale
+    num_idx: np.ndarray
+    mean: np.ndarray
+    scale: np.ndarray
+
+    # One-hot block: integer code -> output column (or -1 if unknown)
+    cat_idx: np.ndarray
+    cat_lo: np.ndarray
+    cat_hi: np.ndarray
+    cat_offset: np.ndarray
+    cat_lut: np.ndarray
+
+    # Ordinal block: integer code -> encoded value (or unknown_value)
+    ord_idx: np.ndarray
+    ord_lo: np.ndarray
+    ord_hi: np.ndarray
+    ord_offset: np.ndarray
+    ord_lut: np.ndarray
+    ord_unknown: float
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(ALL_FEATURES):
+            raise ValueError(
+                f"Expected a (n, {len(ALL_FEATURES)}) matrix in ALL_FEATURES "
+                f"order, got shape {X.shape}"
+            )
+
+        n = X.shape[0]
+        n_num = len(self.num_idx)
+        n_cat = self.n_features - n_num - len(self.ord_idx)
+
+        out = np.zeros((n, self.n_features), dtype=np.float64)
+
+        # Continuous: same operations (and order) as StandardScaler
+        num = out[:, :n_num]
+        np.subtract(X[:, self.num_idx], self.mean, out=num)
+        np.divide(num, self.scale, out=num)
+
+        # One-hot: scatter a 1.0 into the looked-up output column
+        cols, known = _lookup(
+            X[:, self.cat_idx],
+            self.cat_lo,
+            self.cat_hi,
+            self.cat_offset,
+            self.cat_lut,
+            unknown=-1,
+        )
+        rows = np.broadcast_to(np.arange(n)[:, None], cols.shape)
+        known &= cols >= 0
+        out[rows[known], n_num + cols[known].astype(np.intp)] = 1.0
+
+        # Ordinal: gather the encoded value
+        codes, _ = _lookup(
+            X[:, self.ord_idx],
+            self.ord_lo,
+            self.ord_hi,
+            self.ord_offset,
+            self.ord_lut,
+            unknown=self.ord_unknown,
+        )
+        out[:, n_num + n_cat:] = codes
+
+        return out
+
+
+def _lookup(
+    values: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray,
+    offset: np.ndarray,
+    lut: np.ndarray,
+    *,
+    unknown: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+
+    # Non-integral, out-of-range and NaN values are all "unknown"
+    known = (values == np.floor(values)) & (values >= lo) & (values <= hi)
+
+    idx = np.where(known, values - lo, 0).astype(np.intp) + offset
+    result = np.where(known, lut[idx], unknown)
+
+    return result, known
+
+
+# ============================================================
+# Compilation
+# ============================================================
+
+def _build_lut(
+    categories: List[np.ndarray],
+    targets: List[np.ndarray],
+    *,
+    fill: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+
+    lo, hi, offset, tables = [], [], [], []
+    position = 0
+
+    for cats, target in zip(categories, targets):
+        cats = np.asarray(cats, dtype=np.float64)
+        if not np.array_equal(cats, np.floor(cats)):
+            raise ValueError(
+                f"Only integer category codes can be compiled, got {cats}"
+            )
+
+        low, high = int(cats.min()), int(cats.max())
+        table = np.full(high - low + 1, fill, dtype=np.float64)
+        table[cats.astype(np.intp) - low] = target
+
+        lo.append(low)
+        hi.append(high)
+        offset.append(position)
+        tables.append(table)
+        position += len(table)
+
+    return (
+        np.array(lo, dtype=np.float64),
+        np.array(hi, dtype=np.float64),
+        np.array(offset, dtype=np.intp),
+        np.concatenate(tables),
+    )
+
+
+def compile_preprocessor(
+    preprocessor: ColumnTransformer,
+) -> CompiledPreprocessor:
+
+    transformers = {
+        name: (pipeline, list(columns))
+        for name, pipeline, columns in preprocessor.transformers_
+    }
+
+    expected = {
+        "num": CONTINUOUS_FEATURES,
+        "cat": CATEGORICAL_FEATURES,
+        "ord": ORDINAL_FEATURES,
+    }
+    for name, columns in expected.items():
+        if name not in transformers or transformers[name][1] != columns:
+            raise ValueError(
+                f"Preprocessor transformer '{name}' does not match the "
+                "feature contract"
+            )
+
+    scaler = transformers["num"][0].named_steps["scaler"]
+    onehot = transformers["cat"][0].named_steps["onehot"]
+    ordinal = transformers["ord"][0].named_steps["ordinal"]
+
+    if not (scaler.with_mean and scaler.with_std):
+        raise ValueError(
+            "Only StandardScaler(with_mean=True, with_std=True) is supported"
+        )
+    if onehot.drop is not None or onehot.handle_unknown != "ignore":
+        raise ValueError(
+            "Only OneHotEncoder(drop=None, handle_unknown='ignore') "
+            "is supported"
+        )
+    if ordinal.handle_unknown != "use_encoded_value":
+        raise ValueError(
+            "Only OrdinalEncoder(handle_unknown='use_encoded_value') "
+            "is supported"
+        )
+
+    column_index = {name: i for i, name in enumerate(ALL_FEATURES)}
+
+    # One-hot output columns are laid out feature by feature, category order
+    onehot_targets, start = [], 0
+    for cats in onehot.categories_:
+        onehot_targets.append(np.arange(start, start + len(cats)))
+        start += len(cats)
+
+    cat_lo, cat_hi, cat_offset, cat_lut = _build_lut(
+        onehot.categories_, onehot_targets, fill=-1
+    )
+    ord_lo, ord_hi, ord_offset, ord_lut = _build_lut(
+        ordinal.categories_,
+        [np.arange(len(cats)) for cats in ordinal.categories_],
+        fill=ordinal.unknown_value,
+    )
+
+    return CompiledPreprocessor(
+        feature_names=preprocessor.get_feature_names_out().tolist(),
+        num_idx=np.array(
+            [column_index[c] for c in CONTINUOUS_FEATURES], dtype=np.intp
+        ),
+        mean=scaler.mean_.astype(np.float64),
+        scale=scaler.scale_.astype(np.float64),
+        cat_idx=np.array(
+            [column_index[c] for c in CATEGORICAL_FEATURES], dtype=np.intp
+        ),
+        cat_lo=cat_lo,
+        cat_hi=cat_hi,
+        cat_offset=cat_offset,
+        cat_lut=cat_lut,
+        ord_idx=np.array(
+            [column_index[c] for c in ORDINAL_FEATURES], dtype=np.intp
+        ),
+        ord_lo=ord_lo,
+        ord_hi=ord_hi,
+        ord_offset=ord_offset,
+        ord_lut=ord_lut,
+        ord_unknown=float(ordinal.unknown_value),
+    )
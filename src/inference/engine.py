@@ -0,0 +1,254 @@
+"""
+Batched inference engine.
+
+Loads a registered model version once and scores incoming records in
+micro-batches: one preprocessor transform and one predict_proba call per
+batch instead of per record.
+
+A record is a JSON object keyed by the raw feature names of the feature
+contract (extra keys such as "id" are carried through untouched).
+
+By default the fitted preprocessor is compiled into its NumPy fast path
+(src.features.compiled), which produces identical features without going
+through pandas.
+
+An optional ScoreDriftMonitor sees every scored batch, so score drift is
+tracked at full request volume. An optional CompiledValidator checks every
+raw batch against the data constraints; violations are logged and
+accumulated in validation_report rather than failing the batch.
+"""
+
+from operator import itemgetter
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.data.validate import CompiledValidator, ValidationReport
+from src.features.compiled import compile_preprocessor
+from src.features.contracts import ALL_FEATURES
+from src.models.registry import load_model_cached
+from src.monitoring.score_drift import ScoreDriftMonitor
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+DEFAULT_BATCH_SIZE = 512
+
+Record = Dict[str, Any]
+
+_get_features = itemgetter(*ALL_FEATURES)
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Helpers
+# ============================================================
+
+def iter_batches(
+    records: Iterable[Record],
+    batch_size: int,
+) -> Iterator[List[Record]]:
+
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+    batch: List[Record] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def records_to_frame(records: Sequence[Record]) -> pd.DataFrame:
+
+    try:
+        columns = {
+            feature: [record[feature] for record in records]
+            for feature in ALL_FEATURES
+        }
+    except KeyError as e:
+        raise ValueError(f"Record is missing feature column: {e}") from None
+
+    return pd.DataFrame(columns, columns=ALL_FEATURES, dtype=np.float64)
+
+
+def limit_threads(model, n_threads: int = 1) -> None:
+    """
+    Cap the prediction threads of a model exposing n_jobs (scikit-learn
+    style estimators) or num_threads (LightGBMBoosterModel).
+    """
+
+    get_params = getattr(model, "get_params", None)
+    if get_params is None:
+        return
+
+    params = get_params()
+    for key in ("n_jobs", "num_threads"):
+        if key in params:
+            model.set_params(**{key: n_threads})
+
+
+def records_to_matrix(records: Sequence[Record]) -> np.ndarray:
+
+    try:
+        rows = [_get_features(record) for record in records]
+    except KeyError as e:
+        raise ValueError(f"Record is missing feature column: {e}") from None
+
+    return np.array(rows, dtype=np.float64).reshape(-1, len(ALL_FEATURES))
+
+
+# ============================================================
+# Engine
+# ============================================================
+
+class InferenceEngine:
+
+    def __init__(
+        self,
+        model,
+        preprocessor,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        use_compiled_preprocessor: bool = True,
+        score_monitor: Optional[ScoreDriftMonitor] = None,
+        validator: Optional[CompiledValidator] = None,
+    ) -> None:
+
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+        self.model = model
+        self.preprocessor = preprocessor
+        self.batch_size = batch_size
+        self.compiled = (
+            compile_preprocessor(preprocessor)
+            if use_compiled_preprocessor
+            else None
+        )
+        self.score_monitor = score_monitor
+
+        if validator is not None and validator.columns != ALL_FEATURES:
+            raise ValueError("Validator must be compiled for ALL_FEATURES")
+        self.validator = validator
+        self.validation_report = ValidationReport()
+        self._validation_lock = threading.Lock()
+
+    @classmethod
+    def from_registry(
+        cls,
+        *,
+        model_name: str,
+        version: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        use_compiled_preprocessor: bool = True,
+        score_monitor: Optional[ScoreDriftMonitor] = None,
+        validator: Optional[CompiledValidator] = None,
+    ) -> "InferenceEngine":
+
+        model, preprocessor = load_model_cached(
+            model_name=model_name,
+            version=version,
+        )
+
+        return cls(
+            model,
+            preprocessor,
+            batch_size=batch_size,
+            use_compiled_preprocessor=use_compiled_preprocessor,
+            score_monitor=score_monitor,
+            validator=validator,
+        )
+
+    def transform(self, records: Sequence[Record]) -> np.ndarray:
+
+        if self.compiled is not None:
+            return self.compiled.transform(records_to_matrix(records))
+
+        return self.preprocessor.transform(records_to_frame(records))
+
+    def transform_matrix(self, X_raw: np.ndarray) -> np.ndarray:
+        """Features from a raw matrix in ALL_FEATURES order."""
+
+        if self.compiled is not None:
+            return self.compiled.transform(X_raw)
+
+        return self.preprocessor.transform(
+            pd.DataFrame(X_raw, columns=ALL_FEATURES)
+        )
+
+    def _validate(self, X_raw: np.ndarray) -> None:
+
+        with self._validation_lock:
+            row_offset = self.validation_report.n_rows
+            report = self.validator.validate(X_raw, row_offset=row_offset)
+            self.validation_report = self.validation_report.merge(
+                report,
+                max_samples=self.validator.max_samples,
+            )
+
+        for violation in report.violations.values():
+            logger.warning("Invalid input: %s", violation.describe())
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.model.predict_proba(X)[:, 1]
+
+    def prepare(self, X_raw: np.ndarray) -> np.ndarray:
+        """Validate (when configured) and transform a raw matrix."""
+
+        if self.validator is not None:
+            self._validate(X_raw)
+
+        return self.transform_matrix(X_raw)
+
+    def score_features(self, features: np.ndarray) -> np.ndarray:
+
+        scores = self.predict(features)
+        if self.score_monitor is not None:
+            self.score_monitor.update_batch(scores)
+
+        return scores
+
+    def score_matrix(self, X_raw: np.ndarray) -> np.ndarray:
+        """Scores of a raw matrix in ALL_FEATURES order."""
+
+        if len(X_raw) == 0:
+            return np.empty(0, dtype=np.float64)
+
+        return self.score_features(self.prepare(X_raw))
+
+    def score_batch(self, records: Sequence[Record]) -> np.ndarray:
+
+        if len(records) == 0:
+            return np.empty(0, dtype=np.float64)
+
+        return self.score_matrix(records_to_matrix(records))
+
+    def score_records(
+        self,
+        records: Iterable[Record],
+    ) -> Iterator[Tuple[Record, float]]:
+
+        for batch in iter_batches(records, self.batch_size):
+            scores = self.score_batch(batch)
+            yield from zip(batch, scores.tolist())
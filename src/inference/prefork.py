@@ -0,0 +1,413 @@
+"""
+Pre-fork multi-process serving.
+
+The parent loads a registered version once, warms it up and freezes the
+garbage collector's view of the loaded objects. Only then does it fork the
+workers. The workers inherit the model's pages copy-on-write and never
+write to them, so N workers cost about one model's worth of RAM. The
+compiled preprocessor's parameter arrays are moved into memory-mapped
+files in /dev/shm (src.utils.shared_arrays), so every worker reads the
+same physical pages. Every worker runs the asyncio ScoringService on the
+one listening socket bound by the parent, and the kernel spreads
+connections across them.
+
+The parent supervises the workers:
+
+- A worker that dies is respawned from the same loaded version.
+- With follow_production, a newly promoted version is loaded and warmed
+  in the parent, then rolled out one worker at a time. Each new worker
+  must be accepting connections before an old one is drained, so capacity
+  never drops.
+- SIGTERM/SIGINT drain every worker gracefully: a worker stops accepting,
+  finishes its queued batches, then exits.
+
+Scoring is pinned to one thread per worker, since the processes provide
+the parallelism and OpenMP pools do not survive a fork.
+"""
+
+from contextlib import ExitStack
+from dataclasses import dataclass, fields, replace
+from typing import Dict, List, Optional, Tuple
+
+import asyncio
+import gc
+import logging
+import os
+import select
+import signal
+import socket
+import time
+
+import numpy as np
+
+from src.data.validate import CompiledValidator
+from src.features.contracts import ALL_FEATURES
+from src.inference.engine import InferenceEngine, limit_threads
+from src.inference.service import ScoringService, ServiceConfig
+from src.models.registry import get_production_version, load_model
+from src.utils.shared_arrays import shared_array_dir
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+DEFAULT_READY_TIMEOUT_S = 60.0
+DEFAULT_DRAIN_TIMEOUT_S = 30.0
+
+# Minimum spacing between respawns, so a crash loop cannot spin
+_RESPAWN_BACKOFF_S = 1.0
+
+_SUPERVISE_TICK_S = 0.2
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Loaded versions
+# ============================================================
+
+@dataclass
+class Generation:
+    """One loaded, warmed version and the shared memory backing it."""
+
+    version: str
+    engine: InferenceEngine
+    resources: ExitStack
+
+    def close(self) -> None:
+        self.resources.close()
+
+
+def _share_compiled(engine: InferenceEngine, resources: ExitStack) -> None:
+    """Back the compiled preprocessor's arrays with shared memory."""
+
+    arrays = {
+        f.name: getattr(engine.compiled, f.name)
+        for f in fields(engine.compiled)
+        if isinstance(getattr(engine.compiled, f.name), np.ndarray)
+    }
+    scratch_dir = resources.enter_context(
+        shared_array_dir(arrays, prefix="prefork-")
+    )
+
+    engine.compiled = replace(
+        engine.compiled,
+        **{
+            name: np.asarray(
+                np.load(scratch_dir / f"{name}.npy", mmap_mode="r")
+            )
+            for name in arrays
+        },
+    )
+
+
+def load_generation(config: ServiceConfig, version: str) -> Generation:
+
+    model, preprocessor = load_model(
+        model_name=config.model_name,
+        version=version,
+    )
+    limit_threads(model)
+
+    engine = InferenceEngine(
+        model,
+        preprocessor,
+        batch_size=config.max_batch_size,
+        use_compiled_preprocessor=config.use_compiled_preprocessor,
+        validator=(
+            CompiledValidator(ALL_FEATURES) if config.validate else None
+        ),
+    )
+
+    resources = ExitStack()
+    if engine.compiled is not None:
+        _share_compiled(engine, resources)
+
+    # Warm up outside validation and monitoring, at full batch size
+    X_raw = np.zeros((config.max_batch_size, len(ALL_FEATURES)))
+    engine.predict(engine.transform_matrix(X_raw))
+
+    # Keep the collector off the loaded objects so workers never dirty
+    # their pages
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+
+    return Generation(version=version, engine=engine, resources=resources)
+
+
+# ============================================================
+# Worker
+# ============================================================
+
+def _worker_main(
+    generation: Generation,
+    config: ServiceConfig,
+    sock: socket.socket,
+    ready_fd: int,
+) -> None:
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop.set)
+
+        service = ScoringService(
+            generation.engine,
+            replace(config, version=generation.version),
+        )
+        await service.start(sock=sock)
+
+        os.write(ready_fd, b"1")
+        os.close(ready_fd)
+
+        await stop.wait()
+        await service.close()
+
+    code = 0
+    try:
+        asyncio.run(run())
+    except BaseException:
+        logger.exception("Worker %d failed", os.getpid())
+        code = 1
+    finally:
+        os._exit(code)
+
+
+# ============================================================
+# Supervisor
+# ============================================================
+
+class PreforkServer:
+
+    def __init__(
+        self,
+        config: ServiceConfig,
+        *,
+        ready_timeout_s: float = DEFAULT_READY_TIMEOUT_S,
+        drain_timeout_s: float = DEFAULT_DRAIN_TIMEOUT_S,
+    ) -> None:
+
+        # The shadow thread pool would not survive the fork
+        if config.shadow_models:
+            raise ValueError("Shadow scoring is not supported with prefork")
+
+        self.config = config
+        self.ready_timeout_s = ready_timeout_s
+        self.drain_timeout_s = drain_timeout_s
+
+        self.generation: Optional[Generation] = None
+        self.workers: Dict[int, str] = {}
+        self.sock: Optional[socket.socket] = None
+
+        self._stopping = False
+        self._last_respawn = 0.0
+        self._last_poll = 0.0
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.sock.getsockname()[:2]
+
+    # --------------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------------
+
+    def start(self) -> None:
+
+        version = self.config.version
+        if self.config.follow_production:
+            version = (
+                get_production_version(self.config.model_name) or version
+            )
+
+        self.sock = socket.create_server(
+            (self.config.host, self.config.port),
+            backlog=1024,
+        )
+        self.generation = load_generation(self.config, version)
+
+        for _ in range(self.config.processes):
+            self._spawn(self.generation)
+
+        logger.info(
+            "Serving %s %s from %d workers on %s:%d",
+            self.config.model_name,
+            version,
+            len(self.workers),
+            *self.address,
+        )
+
+    def serve_forever(self) -> None:
+
+        def request_stop(signum, frame) -> None:
+            self._stopping = True
+
+        previous = {
+            signum: signal.signal(signum, request_stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+
+        try:
+            self.start()
+            while not self._stopping:
+                self.supervise_once()
+                time.sleep(_SUPERVISE_TICK_S)
+        finally:
+            self.shutdown()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def shutdown(self) -> None:
+
+        self._stopping = True
+        self._drain(list(self.workers))
+
+        if self.generation is not None:
+            self.generation.close()
+            self.generation = None
+            gc.unfreeze()
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    # --------------------------------------------------------
+    # Supervision
+    # --------------------------------------------------------
+
+    def supervise_once(self) -> None:
+        """Respawn dead workers and roll onto a newly promoted version."""
+
+        for pid in self._reap():
+            logger.warning("Worker %d exited", pid)
+
+        while len(self.workers) < self.config.processes:
+            wait = self._last_respawn + _RESPAWN_BACKOFF_S - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_respawn = time.monotonic()
+            try:
+                pid = self._spawn(self.generation)
+            except Exception:
+                logger.exception("Respawning a worker failed")
+                break
+            logger.info("Started worker %d", pid)
+
+        now = time.monotonic()
+        if (
+            self.config.follow_production
+            and now - self._last_poll >= self.config.poll_interval_s
+        ):
+            self._last_poll = now
+            version = get_production_version(self.config.model_name)
+            if version is not None and version != self.generation.version:
+                try:
+                    self.rolling_swap(version)
+                except Exception:
+                    logger.exception(
+                        "Rolling swap to %s failed; keeping version %s",
+                        version,
+                        self.generation.version,
+                    )
+
+    def rolling_swap(self, version: str) -> None:
+        """Replace every worker, one at a time, with ones serving version."""
+
+        new = load_generation(self.config, version)
+        old = self.generation
+
+        old_pids = list(self.workers)
+        new_pids: List[int] = []
+        try:
+            for pid in old_pids:
+                new_pids.append(self._spawn(new))
+                self._drain([pid])
+        except Exception:
+            # Back to the old version only; supervise_once refills the
+            # worker count from it
+            self._drain(new_pids)
+            new.close()
+            raise
+
+        self.generation = new
+        old.close()
+        logger.info(
+            "Rolled %d workers onto %s %s",
+            len(self.workers),
+            self.config.model_name,
+            version,
+        )
+
+    # --------------------------------------------------------
+    # Processes
+    # --------------------------------------------------------
+
+    def _spawn(self, generation: Generation) -> int:
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, signal.SIG_DFL)
+            _worker_main(generation, self.config, self.sock, write_fd)
+
+        os.close(write_fd)
+        try:
+            ready, _, _ = select.select(
+                [read_fd], [], [], self.ready_timeout_s
+            )
+            ok = bool(ready) and os.read(read_fd, 1) == b"1"
+        finally:
+            os.close(read_fd)
+
+        if not ok:
+            self._drain([pid], force=True)
+            raise RuntimeError(f"Worker {pid} did not become ready")
+
+        self.workers[pid] = generation.version
+        return pid
+
+    def _reap(self) -> List[int]:
+
+        dead = []
+        for pid in list(self.workers):
+            done, _ = os.waitpid(pid, os.WNOHANG)
+            if done:
+                del self.workers[pid]
+                dead.append(pid)
+
+        return dead
+
+    def _drain(self, pids: List[int], *, force: bool = False) -> None:
+        """SIGTERM (or SIGKILL) pids and wait for them to exit."""
+
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGKILL if force else signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + self.drain_timeout_s
+        pending = set(pids)
+        while pending:
+            for pid in list(pending):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    pending.discard(pid)
+                    self.workers.pop(pid, None)
+
+            if pending and time.monotonic() > deadline:
+                logger.warning(
+                    "Killing workers that did not drain: %s",
+                    sorted(pending),
+                )
+                for pid in pending:
+                    os.kill(pid, signal.SIGKILL)
+                deadline = float("inf")
+            if pending:
+                time.sleep(0.01)
@@ -0,0 +1,656 @@
+"""
+Asyncio HTTP scoring service with adaptive micro-batching.
+
+Requests are parsed on the event loop and converted to raw feature rows
+right away, so a malformed request is rejected on its own instead of
+failing a whole batch. Valid rows go into a bounded queue. A single
+batcher task drains the queue, and each batch is scored once on an
+executor thread: one preprocess and one predict_proba call. The event
+loop never blocks on the model.
+
+Batching adapts to load. The batcher takes an executor slot before it
+collects a batch. While every slot is busy, requests accumulate and the
+next batch grows without any extra wait. With a slot free, it waits at
+most max_wait_us for more rows, and only when recent traffic suggests
+another request will arrive within that window. At low load, requests are
+scored immediately.
+
+Endpoints (HTTP/1.1 with keep-alive, JSON bodies):
+
+- POST /score   a record, a list of records or {"records": [...]}
+- GET  /stats   p50/p99 latency, batch sizes, queue depth, counters
+- GET  /health  model name, version and serving process id
+
+With shadow_models configured, batches go through a ShadowScorer: the
+challengers score each batch on their own thread pool and never delay the
+response.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import socket
+import time
+
+import numpy as np
+import yaml
+
+from src.data.validate import CompiledValidator
+from src.features.contracts import ALL_FEATURES
+from src.inference.engine import InferenceEngine, records_to_matrix
+from src.inference.shadow import DEFAULT_LATENCY_BUDGET_MS, ShadowScorer
+from src.monitoring.sketches import KLLSketch
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+DEFAULT_CONFIG_PATH = Path("config/service.yaml")
+
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_WAIT_US = 2000
+DEFAULT_MAX_QUEUE = 10_000
+DEFAULT_MAX_BODY_BYTES = 1 << 20
+
+# Weight of the newest gap in the inter-arrival average
+_ARRIVAL_SMOOTHING = 0.2
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceOverloaded(Exception):
+    """The request queue is full."""
+
+
+# ============================================================
+# Configuration
+# ============================================================
+
+@dataclass(frozen=True)
+class ServiceConfig:
+
+    model_name: str
+    version: str
+
+    host: str = "0.0.0.0"
+    port: int = 8080
+
+    # Pre-fork mode (src/inference/prefork.py)
+    processes: int = 1
+    follow_production: bool = False
+    poll_interval_s: float = 5.0
+
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    max_wait_us: int = DEFAULT_MAX_WAIT_US
+    max_queue: int = DEFAULT_MAX_QUEUE
+    n_workers: int = 1
+
+    use_compiled_preprocessor: bool = True
+    validate: bool = False
+
+    # Challengers as "name:version" (src/inference/shadow.py)
+    shadow_models: Tuple[str, ...] = ()
+    shadow_log: str = "artifacts/shadow/predictions.jsonl"
+    shadow_budget_ms: float = DEFAULT_LATENCY_BUDGET_MS
+
+    max_body_bytes: int = DEFAULT_MAX_BODY_BYTES
+
+    @classmethod
+    def from_yaml(cls, path: Path) -> "ServiceConfig":
+
+        with open(path, "r") as f:
+            raw = yaml.safe_load(f) or {}
+
+        sections = ("model", "server", "batching", "engine", "shadow")
+        unknown = set(raw) - set(sections)
+        if unknown:
+            raise ValueError(f"Unknown service config sections: {unknown}")
+
+        flat = {
+            key: value
+            for section in sections
+            for key, value in (raw.get(section) or {}).items()
+        }
+        model = raw.get("model") or {}
+        if "name" in model:
+            flat["model_name"] = flat.pop("name")
+        if "shadow_models" in flat:
+            flat["shadow_models"] = tuple(flat["shadow_models"] or ())
+
+        config = cls(**flat)
+        if min(config.max_batch_size, config.n_workers, config.processes) < 1:
+            raise ValueError(
+                "max_batch_size, n_workers and processes must be >= 1"
+            )
+
+        return config
+
+
+# ============================================================
+# Statistics
+# ============================================================
+
+class ServiceStats:
+    """
+    Latency and batch-size quantiles over the whole service lifetime,
+    held in KLL sketches so memory stays constant. Only updated from the
+    event loop thread.
+    """
+
+    def __init__(self) -> None:
+
+        self.started_at = time.time()
+        self.latency_ms = KLLSketch(seed=0)
+        self.batch_size = KLLSketch(seed=1)
+        self.n_requests = 0
+        self.n_rows = 0
+        self.n_batches = 0
+        self.n_rejected = 0
+        self.n_failed = 0
+
+    def record_batch(
+        self,
+        n_rows: int,
+        latencies_ms: np.ndarray,
+    ) -> None:
+
+        self.n_batches += 1
+        self.n_rows += n_rows
+        self.n_requests += len(latencies_ms)
+        self.batch_size.update(n_rows)
+        self.latency_ms.update_batch(latencies_ms)
+
+    def snapshot(self, *, queue_depth: int = 0) -> Dict[str, Any]:
+
+        latency = self.latency_ms.quantiles([0.5, 0.99])
+        batch = self.batch_size.quantiles([0.5, 0.99])
+
+        def value(x: float) -> Optional[float]:
+            return None if np.isnan(x) else round(float(x), 3)
+
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "requests": self.n_requests,
+            "rows": self.n_rows,
+            "batches": self.n_batches,
+            "rejected": self.n_rejected,
+            "failed": self.n_failed,
+            "queue_depth": queue_depth,
+            "latency_ms": {"p50": value(latency[0]), "p99": value(latency[1])},
+            "batch_size": {
+                "mean": value(self.n_rows / self.n_batches)
+                if self.n_batches else None,
+                "p50": value(batch[0]),
+                "p99": value(batch[1]),
+            },
+        }
+
+
+# ============================================================
+# Micro-batcher
+# ============================================================
+
+@dataclass
+class _Pending:
+
+    X_raw: np.ndarray
+    future: asyncio.Future
+    ids: Optional[List[Any]] = None
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+
+    def __init__(
+        self,
+        engine: Union[InferenceEngine, ShadowScorer],
+        *,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_us: int = DEFAULT_MAX_WAIT_US,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        n_workers: int = 1,
+        stats: Optional[ServiceStats] = None,
+    ) -> None:
+
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1e6
+        self.max_queue = max_queue
+        self.n_workers = n_workers
+        self.stats = stats or ServiceStats()
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: set = set()
+
+        self._last_arrival: Optional[float] = None
+        self._arrival_gap = float("inf")
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(self.n_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.n_workers,
+            thread_name_prefix="scoring",
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        while self._queue is not None and not self._queue.empty():
+            pending = self._queue.get_nowait()
+            pending.future.set_exception(
+                ServiceOverloaded("Service is shutting down")
+            )
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    async def submit(
+        self,
+        X_raw: np.ndarray,
+        *,
+        ids: Optional[List[Any]] = None,
+    ) -> np.ndarray:
+        """Scores of the rows of X_raw, once their batch has run."""
+
+        now = time.perf_counter()
+        if self._last_arrival is not None:
+            # Capped so one idle period does not mask a new burst for long
+            gap = min(now - self._last_arrival, 2 * self.max_wait)
+            self._arrival_gap = (
+                self._arrival_gap + _ARRIVAL_SMOOTHING * (
+                    gap - self._arrival_gap
+                )
+                if np.isfinite(self._arrival_gap)
+                else gap
+            )
+        self._last_arrival = now
+
+        pending = _Pending(
+            X_raw,
+            asyncio.get_running_loop().create_future(),
+            ids,
+        )
+        try:
+            self._queue.put_nowait(pending)
+        except asyncio.QueueFull:
+            self.stats.n_rejected += 1
+            raise ServiceOverloaded("Request queue is full") from None
+
+        return await pending.future
+
+    async def _collect(self) -> List[_Pending]:
+
+        batch = [await self._queue.get()]
+        n_rows = len(batch[0].X_raw)
+
+        # Waiting only pays off when another request is likely to arrive
+        wait = self.max_wait if self._arrival_gap < self.max_wait else 0.0
+        deadline = time.perf_counter() + wait
+
+        while n_rows < self.max_batch_size:
+            if self._queue.empty():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = await asyncio.wait_for(
+                        self._queue.get(), remaining
+                    )
+                except asyncio.TimeoutError:
+                    break
+            else:
+                pending = self._queue.get_nowait()
+
+            batch.append(pending)
+            n_rows += len(pending.X_raw)
+
+        return batch
+
+    async def _run(self) -> None:
+
+        while True:
+            # A free slot first: while all are busy, the queue keeps
+            # filling and the next batch grows
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+
+            task = asyncio.create_task(self._score(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _score(self, batch: List[_Pending]) -> None:
+
+        loop = asyncio.get_running_loop()
+        try:
+            X_raw = np.concatenate([pending.X_raw for pending in batch])
+            score = self.engine.score_matrix
+            if isinstance(self.engine, ShadowScorer):
+                # The shadow log keys challenger scores by record id
+                ids = [
+                    record_id
+                    for pending in batch
+                    for record_id in (
+                        pending.ids
+                        if pending.ids is not None
+                        else [None] * len(pending.X_raw)
+                    )
+                ]
+                score = functools.partial(score, ids=ids)
+            try:
+                scores = await loop.run_in_executor(
+                    self._executor, score, X_raw
+                )
+            except Exception as e:
+                logger.exception("Scoring batch of %d rows failed", len(X_raw))
+                self.stats.n_failed += len(batch)
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                return
+
+            done_at = time.perf_counter()
+            offsets = np.cumsum([len(pending.X_raw) for pending in batch])
+            for pending, part in zip(batch, np.split(scores, offsets[:-1])):
+                if not pending.future.done():
+                    pending.future.set_result(part)
+
+            self.stats.record_batch(
+                len(X_raw),
+                np.array(
+                    [(done_at - p.enqueued_at) * 1e3 for p in batch]
+                ),
+            )
+        finally:
+            self._slots.release()
+
+
+# ============================================================
+# HTTP service
+# ============================================================
+
+def parse_records(payload: Any) -> List[Dict[str, Any]]:
+
+    if isinstance(payload, dict) and "records" in payload:
+        payload = payload["records"]
+    if isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list) or not all(
+        isinstance(record, dict) for record in payload
+    ):
+        raise ValueError(
+            "Expected a record, a list of records or {\"records\": [...]}"
+        )
+
+    for record in payload:
+        for feature in ALL_FEATURES:
+            if isinstance(record.get(feature), (dict, list)):
+                raise ValueError(
+                    f"Feature {feature} must be a number, "
+                    f"got {type(record[feature]).__name__}"
+                )
+
+    return payload
+
+
+class ScoringService:
+
+    def __init__(
+        self,
+        engine: Union[InferenceEngine, ShadowScorer],
+        config: ServiceConfig,
+    ) -> None:
+
+        self.engine = engine
+        self.config = config
+        self.stats = ServiceStats()
+        self.batcher = MicroBatcher(
+            engine,
+            max_batch_size=config.max_batch_size,
+            max_wait_us=config.max_wait_us,
+            max_queue=config.max_queue,
+            n_workers=config.n_workers,
+            stats=self.stats,
+        )
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @classmethod
+    def from_config(cls, config: ServiceConfig) -> "ScoringService":
+
+        engine_kwargs = {
+            "batch_size": config.max_batch_size,
+            "use_compiled_preprocessor": config.use_compiled_preprocessor,
+            "validator": (
+                CompiledValidator(ALL_FEATURES) if config.validate else None
+            ),
+        }
+        if config.shadow_models:
+            engine = ShadowScorer.from_registry(
+                model_name=config.model_name,
+                version=config.version,
+                challengers=config.shadow_models,
+                log_path=Path(config.shadow_log),
+                latency_budget_ms=config.shadow_budget_ms,
+                **engine_kwargs,
+            )
+        else:
+            engine = InferenceEngine.from_registry(
+                model_name=config.model_name,
+                version=config.version,
+                **engine_kwargs,
+            )
+
+        return cls(engine, config)
+
+    # --------------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------------
+
+    async def start(
+        self,
+        *,
+        sock: Optional[socket.socket] = None,
+    ) -> Tuple[str, int]:
+        """Listen on host:port, or accept on an already bound sock."""
+
+        await self.batcher.start()
+        if sock is not None:
+            self._server = await asyncio.start_server(
+                self._handle_connection,
+                sock=sock,
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection,
+                self.config.host,
+                self.config.port,
+            )
+
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.close()
+
+        if isinstance(self.engine, ShadowScorer):
+            self.engine.close()
+
+    # --------------------------------------------------------
+    # Routing
+    # --------------------------------------------------------
+
+    async def handle(
+        self,
+        method: str,
+        path: str,
+        body: bytes,
+    ) -> Tuple[int, Dict[str, Any]]:
+
+        if path == "/score":
+            if method != "POST":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}
+            return await self._score(body)
+
+        if path in ("/stats", "/health") and method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use GET"}
+        if path == "/stats":
+            return HTTPStatus.OK, self.stats.snapshot(
+                queue_depth=self.batcher.queue_depth
+            )
+        if path == "/health":
+            return HTTPStatus.OK, {
+                "status": "ok",
+                "model_name": self.config.model_name,
+                "version": self.config.version,
+                "pid": os.getpid(),
+            }
+
+        return HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {path}"}
+
+    async def _score(self, body: bytes) -> Tuple[int, Dict[str, Any]]:
+
+        try:
+            payload = json.loads(body)
+            single = isinstance(payload, dict) and "records" not in payload
+            records = parse_records(payload)
+            X_raw = records_to_matrix(records)
+        except (ValueError, TypeError) as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+
+        if len(X_raw) == 0:
+            return HTTPStatus.OK, {"scores": []}
+
+        try:
+            scores = await self.batcher.submit(
+                X_raw,
+                ids=[record.get("id") for record in records],
+            )
+        except ServiceOverloaded as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+        if single:
+            return HTTPStatus.OK, {"score": float(scores[0])}
+        return HTTPStatus.OK, {"scores": scores.tolist()}
+
+    # --------------------------------------------------------
+    # HTTP/1.1
+    # --------------------------------------------------------
+
+    async def _read_request(
+        self,
+        reader: asyncio.StreamReader,
+    ) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+
+        lines = head.decode("latin1").split("\r\n")
+        method, target, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        if length > self.config.max_body_bytes:
+            raise ValueError(f"Body exceeds {self.config.max_body_bytes}B")
+        body = await reader.readexactly(length) if length else b""
+
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except (ValueError, asyncio.LimitOverrunError) as e:
+                    await self._respond(
+                        writer,
+                        HTTPStatus.BAD_REQUEST,
+                        {"error": str(e)},
+                        keep_alive=False,
+                    )
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                status, payload = await self.handle(method, path, body)
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(
+                    writer, status, payload, keep_alive=keep_alive
+                )
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Dict[str, Any],
+        *,
+        keep_alive: bool,
+    ) -> None:
+
+        body = json.dumps(payload).encode("utf-8")
+        status = HTTPStatus(status)
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin1") + body)
+        await writer.drain()
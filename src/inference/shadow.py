@@ -0,0 +1,390 @@
+"""
+Champion/challenger shadow scoring in a single batch pass.
+
+The champion scores every batch on the caller's thread, exactly as a
+plain InferenceEngine would. The batch is then handed to a separate shadow
+thread pool, and the champion's scores are returned without waiting for
+the challengers. Challengers can never add latency to the response.
+
+The raw batch is preprocessed once. Challengers reuse the champion's
+feature matrix when their features are the same: the same feature
+contract version and the same fitted preprocessor artifact. A version
+fitted on other data has its own scaler statistics, so a matching
+contract alone is not enough. Any other challengers get one transform per
+distinct preprocessor.
+
+Shadow work is bounded by a latency budget. A batch that waited longer
+than the budget before a shadow thread picked it up is dropped, and so is
+any batch submitted while max_pending batches are already waiting. A
+challenger that finishes but takes longer than the budget is counted as
+over budget. Scored batches are appended to a JSONL log, one line per
+challenger and batch, with the record ids and both score vectors for
+offline comparison.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import json
+import logging
+import threading
+import time
+
+import numpy as np
+
+from src.inference.engine import (
+    InferenceEngine,
+    Record,
+    limit_threads,
+    records_to_matrix,
+)
+from src.models.predictions import file_hash
+from src.models.registry import REGISTRY_BASE_DIR, load_metadata, load_model
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+DEFAULT_LATENCY_BUDGET_MS = 50.0
+DEFAULT_MAX_PENDING = 64
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Models
+# ============================================================
+
+def feature_key(*, model_name: str, version: str) -> str:
+    """
+    Identity of the features a registered version consumes: its feature
+    contract version and fitted preprocessor, or whichever of the two it
+    was registered with.
+    """
+
+    metadata = load_metadata(model_name=model_name, version=version)
+    contract = metadata.get("feature_contract") or {}
+    preprocessor_path = (
+        REGISTRY_BASE_DIR / model_name / version / "preprocessor.joblib"
+    )
+
+    parts = []
+    if contract.get("version"):
+        parts.append(contract["version"])
+    if preprocessor_path.exists():
+        parts.append(file_hash(preprocessor_path)[:16])
+
+    if not parts:
+        raise ValueError(
+            f"{model_name}:{version} has no feature contract and no "
+            "preprocessor; cannot tell which features it consumes"
+        )
+
+    return "-".join(parts)
+
+
+@dataclass(frozen=True)
+class ShadowModel:
+
+    model_name: str
+    version: str
+    engine: InferenceEngine
+    feature_key: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.model_name}:{self.version}"
+
+    @classmethod
+    def from_registry(
+        cls,
+        *,
+        model_name: str,
+        version: str,
+        use_compiled_preprocessor: bool = True,
+    ) -> "ShadowModel":
+
+        # Loaded privately: single-threaded challengers must not change
+        # a model instance the champion may share through the cache
+        model, preprocessor = load_model(
+            model_name=model_name,
+            version=version,
+        )
+        limit_threads(model)
+
+        return cls(
+            model_name=model_name,
+            version=version,
+            engine=InferenceEngine(
+                model,
+                preprocessor,
+                use_compiled_preprocessor=use_compiled_preprocessor,
+            ),
+            feature_key=feature_key(model_name=model_name, version=version),
+        )
+
+
+def parse_model_spec(spec: str) -> Tuple[str, str]:
+    """'name:version' -> (name, version)."""
+
+    name, sep, version = spec.partition(":")
+    if not sep or not name or not version:
+        raise ValueError(f"Expected MODEL_NAME:VERSION, got '{spec}'")
+
+    return name, version
+
+
+# ============================================================
+# Log
+# ============================================================
+
+class ShadowLog:
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+# ============================================================
+# Shadow scorer
+# ============================================================
+
+class ShadowScorer:
+    """
+    Drop-in for InferenceEngine.score_batch / score_matrix that also
+    scores every batch with the challengers, off the response path.
+    """
+
+    def __init__(
+        self,
+        champion: InferenceEngine,
+        challengers: Sequence[ShadowModel],
+        *,
+        champion_feature_key: str,
+        log: Optional[ShadowLog] = None,
+        latency_budget_ms: float = DEFAULT_LATENCY_BUDGET_MS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        n_threads: int = 1,
+    ) -> None:
+
+        self.champion = champion
+        self.challengers = list(challengers)
+        self.champion_feature_key = champion_feature_key
+        self.log = log
+        self.latency_budget = latency_budget_ms / 1e3
+        self.max_pending = max_pending
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=n_threads,
+            thread_name_prefix="shadow",
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._batch_id = 0
+
+        self.counts: Dict[str, Dict[str, int]] = {
+            model.label: {
+                "scored": 0,
+                "dropped": 0,
+                "expired": 0,
+                "over_budget": 0,
+                "failed": 0,
+            }
+            for model in self.challengers
+        }
+
+    @classmethod
+    def from_registry(
+        cls,
+        *,
+        model_name: str,
+        version: str,
+        challengers: Sequence[str],
+        log_path: Optional[Path] = None,
+        latency_budget_ms: float = DEFAULT_LATENCY_BUDGET_MS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        n_threads: int = 1,
+        **engine_kwargs,
+    ) -> "ShadowScorer":
+        """Champion model_name:version; challengers as name:version."""
+
+        champion = InferenceEngine.from_registry(
+            model_name=model_name,
+            version=version,
+            **engine_kwargs,
+        )
+        use_compiled = engine_kwargs.get("use_compiled_preprocessor", True)
+
+        return cls(
+            champion,
+            [
+                ShadowModel.from_registry(
+                    model_name=name,
+                    version=challenger_version,
+                    use_compiled_preprocessor=use_compiled,
+                )
+                for name, challenger_version in map(
+                    parse_model_spec, challengers
+                )
+            ],
+            champion_feature_key=feature_key(
+                model_name=model_name, version=version
+            ),
+            log=ShadowLog(log_path) if log_path is not None else None,
+            latency_budget_ms=latency_budget_ms,
+            max_pending=max_pending,
+            n_threads=n_threads,
+        )
+
+    @property
+    def shared_features(self) -> List[str]:
+        """Challengers that reuse the champion's feature matrix."""
+
+        return [
+            model.label for model in self.challengers
+            if model.feature_key == self.champion_feature_key
+        ]
+
+    # --------------------------------------------------------
+    # Champion path
+    # --------------------------------------------------------
+
+    def score_batch(self, records: Sequence[Record]) -> np.ndarray:
+
+        if len(records) == 0:
+            return np.empty(0, dtype=np.float64)
+
+        return self.score_matrix(
+            records_to_matrix(records),
+            ids=[record.get("id") for record in records],
+        )
+
+    def score_matrix(
+        self,
+        X_raw: np.ndarray,
+        *,
+        ids: Optional[List[Any]] = None,
+    ) -> np.ndarray:
+
+        if len(X_raw) == 0:
+            return np.empty(0, dtype=np.float64)
+
+        features = self.champion.prepare(X_raw)
+        scores = self.champion.score_features(features)
+
+        if self.challengers:
+            self._submit(X_raw, features, scores, ids)
+
+        return scores
+
+    def _submit(
+        self,
+        X_raw: np.ndarray,
+        features: np.ndarray,
+        scores: np.ndarray,
+        ids: Optional[List[Any]],
+    ) -> None:
+
+        with self._lock:
+            self._batch_id += 1
+            batch_id = self._batch_id
+            if self._pending >= self.max_pending:
+                for counts in self.counts.values():
+                    counts["dropped"] += 1
+                return
+            self._pending += 1
+
+        self._executor.submit(
+            self._shadow,
+            batch_id,
+            time.perf_counter(),
+            X_raw,
+            features,
+            scores,
+            ids,
+        )
+
+    # --------------------------------------------------------
+    # Shadow path
+    # --------------------------------------------------------
+
+    def _count(self, label: str, key: str) -> None:
+        with self._lock:
+            self.counts[label][key] += 1
+
+    def _shadow(
+        self,
+        batch_id: int,
+        submitted_at: float,
+        X_raw: np.ndarray,
+        features: np.ndarray,
+        champion_scores: np.ndarray,
+        ids: Optional[List[Any]],
+    ) -> None:
+
+        try:
+            if time.perf_counter() - submitted_at > self.latency_budget:
+                for model in self.challengers:
+                    self._count(model.label, "expired")
+                return
+
+            # One transform per distinct preprocessor
+            by_key = {self.champion_feature_key: features}
+
+            for model in self.challengers:
+                start = time.perf_counter()
+                try:
+                    if model.feature_key not in by_key:
+                        by_key[model.feature_key] = (
+                            model.engine.transform_matrix(X_raw)
+                        )
+                    scores = model.engine.predict(by_key[model.feature_key])
+                except Exception:
+                    logger.exception("Shadow model %s failed", model.label)
+                    self._count(model.label, "failed")
+                    continue
+
+                elapsed = time.perf_counter() - start
+                self._count(model.label, "scored")
+                if elapsed > self.latency_budget:
+                    self._count(model.label, "over_budget")
+
+                if self.log is not None:
+                    self.log.write({
+                        "batch_id": batch_id,
+                        "logged_at": datetime.utcnow().isoformat() + "Z",
+                        "model": model.label,
+                        "latency_ms": round(elapsed * 1e3, 3),
+                        "ids": ids,
+                        "champion_scores": champion_scores.tolist(),
+                        "scores": scores.tolist(),
+                    })
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    # --------------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------------
+
+    def close(self) -> None:
+        """Finish queued shadow batches, then release the log."""
+
+        self._executor.shutdown(wait=True)
+        if self.log is not None:
+            self.log.close()
@@ -0,0 +1,135 @@
+"""
+Bounded-memory streaming I/O for batch scoring.
+
+Records are read lazily from a JSONL file (or stdin) as fixed-size chunks
+and predictions are written incrementally, so memory use depends on the
+chunk size only, never on the size of the input.
+"""
+
+from pathlib import Path
+from typing import IO, Iterator, List, Sequence
+import json
+import struct
+
+import numpy as np
+
+from src.inference.engine import Record
+
+
+# ============================================================
+# Reading
+# ============================================================
+
+def iter_jsonl_chunks(
+    stream: IO[str],
+    chunk_size: int,
+) -> Iterator[List[Record]]:
+
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+
+    chunk: List[Record] = []
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            chunk.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise ValueError(
+                f"Invalid JSON on line {line_number}: {e}"
+            ) from None
+
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+# ============================================================
+# Writing
+# ============================================================
+
+class JsonlPredictionWriter:
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "w")
+        self.n_written = 0
+
+    def write(self, records: Sequence[Record], scores: np.ndarray) -> None:
+        self._file.writelines(
+            json.dumps({"id": record.get("id"), "score": score}) + "\n"
+            for record, score in zip(records, scores.tolist())
+        )
+        self.n_written += len(records)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "JsonlPredictionWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class NpyPredictionWriter:
+    """
+    Appends float64 scores to a .npy file whose length is unknown upfront.
+
+    A fixed-size version 1.0 header is reserved when the file is opened and
+    rewritten with the final shape on close, so the result is a regular
+    array readable with np.load (including mmap_mode).
+    """
+
+    _MAGIC = b"\x93NUMPY\x01\x00"
+    _HEADER_SIZE = 128
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "wb")
+        self.n_written = 0
+        self._write_header()
+
+    def _write_header(self) -> None:
+        header = repr({
+            "descr": np.dtype(np.float64).str,
+            "fortran_order": False,
+            "shape": (self.n_written,),
+        })
+        header_len = self._HEADER_SIZE - len(self._MAGIC) - 2
+        header = header.ljust(header_len - 1) + "\n"
+
+        self._file.seek(0)
+        self._file.write(self._MAGIC)
+        self._file.write(struct.pack("<H", header_len))
+        self._file.write(header.encode("latin1"))
+
+    def write(self, records: Sequence[Record], scores: np.ndarray) -> None:
+        self._file.write(np.ascontiguousarray(scores, dtype="<f8").tobytes())
+        self.n_written += len(scores)
+
+    def close(self) -> None:
+        self._write_header()
+        self._file.close()
+
+    def __enter__(self) -> "NpyPredictionWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_prediction_writer(path: Path):
+
+    if path.suffix == ".npy":
+        return NpyPredictionWriter(path)
+    if path.suffix in (".jsonl", ".json"):
+        return JsonlPredictionWriter(path)
+
+    raise ValueError(
+        f"Unsupported output format '{path.suffix}' (expected .jsonl or .npy)"
+    )
@@ -9,16 +9,15 @@ from sklearn.metrics import (
 from sklearn.calibration import calibration_curve
 
 
-def evaluate_binary_classifier(
-    model,
-    X: np.ndarray,
+# ============================================================
+# Score-based evaluation
+# ============================================================
+
+def score_metrics(
     y: np.ndarray,
-    *,
-    n_bins: int = 10,
+    y_proba: np.ndarray,
 ) -> Dict[str, float]:
 
-    y_proba = model.predict_proba(X)[:, 1]
-
     metrics = {
         "roc_auc": roc_auc_score(y, y_proba),
         "pr_auc": average_precision_score(y, y_proba),
@@ -28,15 +27,12 @@ def evaluate_binary_classifier(
     return metrics
 
 
-def compute_calibration_data(
-    model,
-    X: np.ndarray,
+def score_calibration(
     y: np.ndarray,
+    y_proba: np.ndarray,
     *,
     n_bins: int = 10,
 ) -> Tuple[np.ndarray, np.ndarray]:
-    
-    y_proba = model.predict_proba(X)[:, 1]
 
     frac_pos, mean_pred = calibration_curve(
         y,
@@ -45,4 +41,30 @@ def compute_calibration_data(
         strategy="uniform",
     )
 
-    return mean_pred, frac_pos
\ No newline at end of file
+    return mean_pred, frac_pos
+
+
+# ============================================================
+# Model-based evaluation
+# ============================================================
+
+def evaluate_binary_classifier(
+    model,
+    X: np.ndarray,
+    y: np.ndarray,
+    *,
+    n_bins: int = 10,
+) -> Dict[str, float]:
+
+    return score_metrics(y, model.predict_proba(X)[:, 1])
+
+
+def compute_calibration_data(
+    model,
+    X: np.ndarray,
+    y: np.ndarray,
+    *,
+    n_bins: int = 10,
+) -> Tuple[np.ndarray, np.ndarray]:
+
+    return score_calibration(y, model.predict_proba(X)[:, 1], n_bins=n_bins)
@@ -0,0 +1,290 @@
+"""
+On-disk cache of constructed LightGBM training datasets.
+
+Constructing an lgb.Dataset bins every column of X_train (quantile bin
+boundaries plus the binned matrix). That work depends only on the data and
+the binning parameters, so the constructed dataset is saved once as a
+LightGBM binary and reloaded by later trials and retraining runs. The
+cache key combines the feature contract version, a fingerprint of the
+training data and labels, the binning parameters and the LightGBM version.
+
+Training goes through lgb.train, with optional early stopping on the
+validation log loss. The resulting booster is wrapped in a small
+classifier with the predict_proba interface the rest of the code expects.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import hashlib
+import json
+import os
+
+import lightgbm as lgb
+import numpy as np
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+DATASET_CACHE_DIR = Path("artifacts/cache/lgb_datasets")
+
+# Dataset construction parameters, matching LGBMClassifier's defaults.
+# With feature_pre_filter, features that cannot be split given
+# min_data_in_leaf are dropped at construction time, so min_data_in_leaf
+# becomes part of the binning (LightGBM refuses to change it afterwards).
+DEFAULT_BINNING_PARAMS: Dict[str, Any] = {
+    "max_bin": 255,
+    "min_data_in_bin": 3,
+    "bin_construct_sample_cnt": 200_000,
+    "feature_pre_filter": True,
+}
+
+_FINGERPRINT_CHUNK_ROWS = 65_536
+
+
+# ============================================================
+# Model wrapper
+# ============================================================
+
+class LightGBMBoosterModel:
+    """A trained lgb.Booster exposed through the classifier interface."""
+
+    def __init__(self, booster: lgb.Booster, params: Dict[str, Any]) -> None:
+        self.booster_ = booster
+        self.params = params
+        self.classes_ = np.array([0, 1])
+
+    @property
+    def best_iteration_(self) -> int:
+        booster = self.booster_
+        return booster.best_iteration or booster.current_iteration()
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.booster_.num_feature()
+
+    def get_params(self) -> Dict[str, Any]:
+        return {**self.params, "best_iteration": self.best_iteration_}
+
+    def set_params(self, **params) -> "LightGBMBoosterModel":
+        """Update params; num_threads also caps the prediction threads."""
+
+        self.params = {**self.params, **params}
+        return self
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+
+        p = self.booster_.predict(
+            X,
+            num_iteration=self.best_iteration_,
+            num_threads=self.params.get("num_threads", 0),
+        )
+
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(np.int64)
+
+
+# ============================================================
+# Cache keys
+# ============================================================
+
+def data_fingerprint(X: np.ndarray, y: np.ndarray) -> str:
+
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+
+    digest = hashlib.sha256()
+    digest.update(repr((X.shape, y.shape)).encode("utf-8"))
+    for start in range(0, len(X), _FINGERPRINT_CHUNK_ROWS):
+        digest.update(X[start:start + _FINGERPRINT_CHUNK_ROWS].data)
+    digest.update(y.data)
+
+    return digest.hexdigest()[:16]
+
+
+def binning_params(
+    *,
+    min_child_samples: int = 20,
+    random_state: int = 42,
+    **overrides,
+) -> Dict[str, Any]:
+
+    params = {**DEFAULT_BINNING_PARAMS, **overrides, "seed": random_state}
+    if params["feature_pre_filter"]:
+        params["min_data_in_leaf"] = min_child_samples
+
+    return params
+
+
+def dataset_cache_key(
+    *,
+    feature_version: str,
+    fingerprint: str,
+    params: Dict[str, Any],
+) -> str:
+
+    serialized = json.dumps(
+        {
+            "feature_version": feature_version,
+            "fingerprint": fingerprint,
+            "params": params,
+            "lightgbm": lgb.__version__,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+
+
+# ============================================================
+# Cache
+# ============================================================
+
+def build_cached_dataset(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    *,
+    feature_version: str,
+    params: Optional[Dict[str, Any]] = None,
+    cache_dir: Path = DATASET_CACHE_DIR,
+) -> Path:
+    """Return the binary dataset path, constructing it on a cache miss."""
+
+    params = binning_params() if params is None else params
+    key = dataset_cache_key(
+        feature_version=feature_version,
+        fingerprint=data_fingerprint(X_train, y_train),
+        params=params,
+    )
+
+    path = cache_dir / f"{feature_version}-{key}.bin"
+    if path.exists():
+        return path
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    dataset = lgb.Dataset(
+        X_train,
+        label=np.asarray(y_train, dtype=np.float64),
+        params={**params, "verbose": -1},
+    )
+    dataset.construct()
+
+    # Concurrent builders race harmlessly: the last rename wins
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    dataset.save_binary(str(tmp_path))
+    os.replace(tmp_path, path)
+
+    return path
+
+
+# ============================================================
+# Training
+# ============================================================
+
+def train_lightgbm_from_dataset(
+    dataset_path: Path,
+    *,
+    params: Dict[str, Any],
+    X_val: Optional[np.ndarray] = None,
+    y_val: Optional[np.ndarray] = None,
+    early_stopping_rounds: Optional[int] = None,
+    n_estimators: int = 300,
+    num_leaves: int = 31,
+    max_depth: int = -1,
+    learning_rate: float = 0.05,
+    subsample: float = 0.8,
+    colsample_bytree: float = 0.8,
+    reg_lambda: float = 0.0,
+    min_child_samples: int = 20,
+    random_state: int = 42,
+    n_jobs: int = -1,
+) -> LightGBMBoosterModel:
+    """
+    Same model as train_lightgbm (bit-identical without early stopping),
+    trained on a cached binary dataset.
+    """
+
+    train_params = {
+        "objective": "binary",
+        "num_leaves": num_leaves,
+        "max_depth": max_depth,
+        "learning_rate": learning_rate,
+        "bagging_fraction": subsample,
+        "bagging_freq": 0,
+        "feature_fraction": colsample_bytree,
+        "lambda_l2": reg_lambda,
+        "min_data_in_leaf": min_child_samples,
+        "seed": random_state,
+        "num_threads": n_jobs,
+        "verbose": -1,
+    }
+
+    train_set = lgb.Dataset(
+        str(dataset_path),
+        params={**params, "verbose": -1},
+    )
+
+    valid_sets, callbacks = [], []
+    if X_val is not None:
+        valid_sets.append(
+            lgb.Dataset(
+                X_val,
+                label=np.asarray(y_val, dtype=np.float64),
+                reference=train_set,
+            )
+        )
+        if early_stopping_rounds is not None:
+            callbacks.append(
+                lgb.early_stopping(early_stopping_rounds, verbose=False)
+            )
+    elif early_stopping_rounds is not None:
+        raise ValueError("Early stopping needs a validation set")
+
+    booster = lgb.train(
+        {**train_params, "metric": "binary_logloss"},
+        train_set,
+        num_boost_round=n_estimators,
+        valid_sets=valid_sets,
+        callbacks=callbacks,
+    )
+
+    return LightGBMBoosterModel(
+        booster,
+        {**train_params, "n_estimators": n_estimators},
+    )
+
+
+def train_lightgbm_cached(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    *,
+    feature_version: str,
+    cache_dir: Path = DATASET_CACHE_DIR,
+    min_child_samples: int = 20,
+    random_state: int = 42,
+    **kwargs,
+) -> LightGBMBoosterModel:
+
+    params = binning_params(
+        min_child_samples=min_child_samples,
+        random_state=random_state,
+    )
+    dataset_path = build_cached_dataset(
+        X_train,
+        y_train,
+        feature_version=feature_version,
+        params=params,
+        cache_dir=cache_dir,
+    )
+
+    return train_lightgbm_from_dataset(
+        dataset_path,
+        params=params,
+        min_child_samples=min_child_samples,
+        random_state=random_state,
+        **kwargs,
+    )
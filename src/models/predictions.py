@@ -0,0 +1,167 @@
+"""
+Prediction cache for model evaluation.
+
+Scores (predict_proba[:, 1]) of a model artifact on a dataset are computed
+once and stored as .npy in artifacts/cache/predictions, keyed by a hash
+of the model file and a hash of the feature matrix. The cache lives outside
+artifacts/models so it never shows up as a registry version. Every metric,
+calibration curve and comparison is then derived from the cached
+score vector, so re-evaluating a registry only runs inference for models
+or datasets it has not seen before.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import hashlib
+import os
+
+import joblib
+import numpy as np
+
+from src.models.evaluation import score_calibration, score_metrics
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+PREDICTION_CACHE_DIR = Path("artifacts/cache/predictions")
+
+_HASH_CHUNK_BYTES = 1 << 20
+_HASH_CHUNK_ROWS = 65_536
+
+
+# ============================================================
+# Keys
+# ============================================================
+
+def file_hash(path: Path) -> str:
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()[:16]
+
+
+def dataset_hash(X: np.ndarray) -> str:
+
+    X = np.ascontiguousarray(X, dtype=np.float64)
+
+    digest = hashlib.sha256()
+    digest.update(repr(X.shape).encode("utf-8"))
+    for start in range(0, len(X), _HASH_CHUNK_ROWS):
+        digest.update(X[start:start + _HASH_CHUNK_ROWS].data)
+
+    return digest.hexdigest()[:16]
+
+
+def prediction_path(
+    model_path: Path,
+    *,
+    data_hash: str,
+    model_hash: Optional[str] = None,
+) -> Path:
+
+    model_hash = model_hash or file_hash(model_path)
+
+    return PREDICTION_CACHE_DIR / f"{model_hash}-{data_hash}.npy"
+
+
+# ============================================================
+# Cache
+# ============================================================
+
+def store_scores(
+    model_path: Path,
+    scores: np.ndarray,
+    *,
+    data_hash: str,
+) -> Path:
+    """Seed the cache with scores already computed (e.g. at training)."""
+
+    path = prediction_path(model_path, data_hash=data_hash)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write then rename so concurrent readers never see a partial file
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp.npy")
+    np.save(tmp_path, np.asarray(scores, dtype=np.float64))
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def cached_scores(
+    model_path: Path,
+    X: np.ndarray,
+    *,
+    data_hash: Optional[str] = None,
+    model: Any = None,
+) -> np.ndarray:
+    """
+    Scores of the model stored at model_path on X, from the cache when
+    present. The model is only loaded (or used, if passed in) on a miss.
+    """
+
+    data_hash = data_hash or dataset_hash(X)
+    path = prediction_path(model_path, data_hash=data_hash)
+
+    if path.exists():
+        return np.load(path)
+
+    if model is None:
+        model = joblib.load(model_path)
+    scores = model.predict_proba(X)[:, 1]
+
+    store_scores(model_path, scores, data_hash=data_hash)
+
+    return scores
+
+
+# ============================================================
+# Evaluation
+# ============================================================
+
+@dataclass(frozen=True)
+class ScoreEvaluation:
+
+    scores: np.ndarray
+    metrics: Dict[str, float]
+    calibration: Dict[str, np.ndarray]
+
+
+def evaluate_scores(
+    y: np.ndarray,
+    scores: np.ndarray,
+    *,
+    n_bins: int = 10,
+) -> ScoreEvaluation:
+    """Metrics and calibration curve from one score vector."""
+
+    mean_pred, frac_pos = score_calibration(y, scores, n_bins=n_bins)
+
+    return ScoreEvaluation(
+        scores=scores,
+        metrics=score_metrics(y, scores),
+        calibration={
+            "mean_predicted_value": mean_pred,
+            "fraction_of_positives": frac_pos,
+        },
+    )
+
+
+def evaluate_artifact(
+    model_path: Path,
+    X: np.ndarray,
+    y: np.ndarray,
+    *,
+    data_hash: Optional[str] = None,
+    n_bins: int = 10,
+) -> ScoreEvaluation:
+
+    scores = cached_scores(model_path, X, data_hash=data_hash)
+
+    return evaluate_scores(y, scores, n_bins=n_bins)
@@ -0,0 +1,62 @@
+"""
+Promotion gate: does a candidate beat the baseline by enough to replace it?
+
+Shared by scripts/compare_models.py (metrics from disk or recomputed from
+cached predictions) and scripts/train_all_models.py (freshly trained
+candidates).
+"""
+
+from typing import Optional
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+DEFAULT_MIN_AUC_GAIN = 0.005
+DEFAULT_MAX_BRIER_REGRESSION = 0.005
+
+
+# ============================================================
+# Promotion logic
+# ============================================================
+
+def should_promote(
+    baseline: dict,
+    candidate: dict,
+    *,
+    min_auc_gain: float = DEFAULT_MIN_AUC_GAIN,
+    max_brier_regression: float = DEFAULT_MAX_BRIER_REGRESSION,
+    intervals: Optional[dict] = None,
+) -> bool:
+    """
+    With bootstrap intervals (see src.models.bootstrap.paired_bootstrap),
+    the gains must also hold at the interval bounds: the AUC and PR-AUC
+    gains must be significantly positive and the Brier regression must
+    stay within max_brier_regression at its upper bound.
+    """
+
+    auc_gain = candidate["roc_auc"] - baseline["roc_auc"]
+    pr_gain = candidate["pr_auc"] - baseline["pr_auc"]
+    brier_change = candidate["brier_score"] - baseline["brier_score"]
+
+    if auc_gain < min_auc_gain:
+        return False
+
+    if pr_gain <= 0:
+        return False
+
+    if brier_change > max_brier_regression:
+        return False
+
+    if intervals is not None:
+        if intervals["roc_auc"]["lower"] <= 0:
+            return False
+
+        if intervals["pr_auc"]["lower"] <= 0:
+            return False
+
+        if intervals["brier_score"]["upper"] > max_brier_regression:
+            return False
+
+    return True
@@ -1,7 +1,13 @@
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 from datetime import datetime
 import json
+import logging
+import os
+import re
+import threading
 import joblib
 import numpy as np
 
@@ -12,6 +18,10 @@ import numpy as np
 
 REGISTRY_BASE_DIR = Path("artifacts/models")
 
+PRODUCTION_POINTER = "production.json"
+
+logger = logging.getLogger(__name__)
+
 
 # ============================================================
 # Helpers
@@ -21,6 +31,15 @@ def _version_dir(model_name: str, version: str) -> Path:
     return REGISTRY_BASE_DIR / model_name / version
 
 
+def staging_dir(model_name: str, version: str) -> Path:
+    """Hidden directory to write a version into before publish_version."""
+
+    return (
+        REGISTRY_BASE_DIR / model_name
+        / f".{version}.{os.getpid()}.{threading.get_ident()}.staging"
+    )
+
+
 def _ensure_not_exists(path: Path) -> None:
     if path.exists():
         raise FileExistsError(
@@ -45,9 +64,16 @@ def register_model(
     metrics: Dict[str, float],
     calibration: Dict[str, Any],
     metadata: Dict[str, Any],
+    path: Optional[Path] = None,
 ) -> Path:
-
-    version_path = _version_dir(model_name, version)
+    """
+    Write a version's artifacts to its registry directory, or to path
+    (e.g. a staging_dir) for a later publish_version.
+    """
+
+    version_path = path if path is not None else _version_dir(
+        model_name, version
+    )
     _ensure_not_exists(version_path)
 
     version_path.mkdir(parents=True, exist_ok=False)
@@ -87,6 +113,21 @@ def register_model(
     return version_path
 
 
+def publish_version(
+    staged_path: Path,
+    *,
+    model_name: str,
+    version: str,
+) -> Path:
+    """Move a staged version into place in one rename."""
+
+    version_path = _version_dir(model_name, version)
+    _ensure_not_exists(version_path)
+    os.rename(staged_path, version_path)
+
+    return version_path
+
+
 # ============================================================
 # Loading
 # ============================================================
@@ -134,6 +175,314 @@ def list_versions(model_name: str) -> list[str]:
     if not model_dir.exists():
         return []
 
+    # Only directories holding a registered model are versions; hidden
+    # ones are still being staged
     return sorted(
-        p.name for p in model_dir.iterdir() if p.is_dir()
-    )
\ No newline at end of file
+        p.name for p in model_dir.iterdir()
+        if not p.name.startswith(".")
+        and (p / "model.joblib").is_file()
+        and (p / "metadata.json").is_file()
+    )
+
+
+_SEMVER = re.compile(r"^v(\d+)\.(\d+)\.(\d+)$")
+
+
+def next_patch_version(
+    model_name: str,
+    *,
+    reserved: Iterable[str] = (),
+) -> str:
+    """
+    Bump the patch of the highest vMAJOR.MINOR.PATCH version, counting
+    reserved versions that are not registered yet.
+    """
+
+    versions = [*list_versions(model_name), *reserved]
+    parsed = [
+        tuple(int(part) for part in match.groups())
+        for match in map(_SEMVER.match, versions)
+        if match is not None
+    ]
+    if not parsed:
+        return "v1.0.0"
+
+    major, minor, patch = max(parsed)
+    return f"v{major}.{minor}.{patch + 1}"
+
+
+# ============================================================
+# Promotion
+# ============================================================
+
+def promote_version(
+    *,
+    model_name: str,
+    version: str,
+) -> Path:
+
+    version_path = _version_dir(model_name, version)
+    if not version_path.exists():
+        raise FileNotFoundError(
+            f"Cannot promote missing model version: {version_path}"
+        )
+
+    pointer_path = REGISTRY_BASE_DIR / model_name / PRODUCTION_POINTER
+    tmp_path = pointer_path.with_suffix(".tmp")
+
+    with open(tmp_path, "w") as f:
+        json.dump(
+            {"model_version": version, "promoted_at": _utc_now()},
+            f,
+            indent=2,
+        )
+
+    # Atomic on POSIX: readers see either the old or the new pointer
+    os.replace(tmp_path, pointer_path)
+
+    return pointer_path
+
+
+def get_production_version(model_name: str) -> Optional[str]:
+
+    pointer_path = REGISTRY_BASE_DIR / model_name / PRODUCTION_POINTER
+    if not pointer_path.exists():
+        return None
+
+    with open(pointer_path, "r") as f:
+        return json.load(f)["model_version"]
+
+
+# ============================================================
+# In-process cache
+# ============================================================
+
+DEFAULT_CACHE_MAX_BYTES = 1 << 30
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+
+    model_name: str
+    version: str
+    model: Any
+    preprocessor: Any
+    nbytes: int
+
+
+def _artifact_nbytes(version_path: Path) -> int:
+    # On-disk pickle size is a cheap, stable proxy for in-memory footprint
+    return sum(
+        (version_path / name).stat().st_size
+        for name in ("model.joblib", "preprocessor.joblib")
+    )
+
+
+class ModelCache:
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], LoadedModel]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(
+        self,
+        *,
+        model_name: str,
+        version: str,
+    ) -> LoadedModel:
+
+        key = (model_name, version)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Deserialize outside the cache lock so hits on other versions are
+        # never blocked; the per-key lock stops concurrent duplicate loads.
+        with key_lock:
+            try:
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self._entries.move_to_end(key)
+                        return entry
+
+                model, preprocessor = load_model(
+                    model_name=model_name,
+                    version=version,
+                )
+                entry = LoadedModel(
+                    model_name=model_name,
+                    version=version,
+                    model=model,
+                    preprocessor=preprocessor,
+                    nbytes=_artifact_nbytes(
+                        _version_dir(model_name, version)
+                    ),
+                )
+
+                with self._lock:
+                    self._entries[key] = entry
+                    self._evict_locked(keep=key)
+            finally:
+                # Also after a failed load, so bad keys do not pile up
+                with self._lock:
+                    if self._key_locks.get(key) is key_lock:
+                        del self._key_locks[key]
+
+        return entry
+
+    def evict(
+        self,
+        *,
+        model_name: str,
+        version: str,
+    ) -> None:
+
+        with self._lock:
+            self._entries.pop((model_name, version), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _evict_locked(self, *, keep: Tuple[str, str]) -> None:
+
+        total = sum(entry.nbytes for entry in self._entries.values())
+
+        # Least recently used first; the entry just loaded always stays
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._entries.pop(key).nbytes
+
+
+_default_cache = ModelCache()
+
+
+def get_model_cache() -> ModelCache:
+    return _default_cache
+
+
+def load_model_cached(
+    *,
+    model_name: str,
+    version: str,
+):
+
+    entry = _default_cache.get(model_name=model_name, version=version)
+
+    return entry.model, entry.preprocessor
+
+
+# ============================================================
+# Hot reload
+# ============================================================
+
+class HotReloader:
+    """
+    Serves the promoted version of a model and swaps in newly promoted
+    versions from a background thread.
+
+    Callers take a snapshot with current() per request; a swap only
+    rebinds the reference, so in-flight requests finish on the version
+    they started with.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_name: str,
+        version: Optional[str] = None,
+        cache: Optional[ModelCache] = None,
+        poll_interval: float = 5.0,
+        on_swap: Optional[Callable[[LoadedModel], None]] = None,
+    ) -> None:
+
+        self.model_name = model_name
+        self.cache = cache if cache is not None else _default_cache
+        self.poll_interval = poll_interval
+        self.on_swap = on_swap
+
+        version = version or get_production_version(model_name)
+        if version is None:
+            raise FileNotFoundError(
+                f"No production version promoted for model: {model_name}"
+            )
+
+        self._current = self.cache.get(model_name=model_name, version=version)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def current(self) -> LoadedModel:
+        return self._current
+
+    def check(self) -> bool:
+
+        version = get_production_version(self.model_name)
+        if version is None or version == self._current.version:
+            return False
+
+        # Load fully before swapping so serving never sees a partial model
+        entry = self.cache.get(model_name=self.model_name, version=version)
+        if self.on_swap is not None:
+            self.on_swap(entry)
+        self._current = entry
+
+        logger.info(
+            "Swapped %s to version %s", self.model_name, entry.version
+        )
+        return True
+
+    def start(self) -> None:
+
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"hot-reload-{self.model_name}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception(
+                    "Hot reload of %s failed; keeping version %s",
+                    self.model_name,
+                    self._current.version,
+                )
@@ -0,0 +1,250 @@
+"""
+Parallel hyperparameter search for the tree models.
+
+Training and validation matrices are shared with the workers through
+src.utils.shared_arrays: written once to a RAM-backed scratch directory and
+memory-mapped read-only by every worker, so the whole pool shares one copy
+of X_train and nothing is pickled per trial.
+
+Each worker trains single-threaded; parallelism comes from running trials
+side by side, which scales better than threading one small model.
+
+LightGBM trials can also share one cached binned dataset per distinct
+binning (src.models.lgb_dataset) and stop early on validation logloss.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from src.models.evaluation import evaluate_binary_classifier
+from src.models.lgb_dataset import (
+    DATASET_CACHE_DIR,
+    binning_params,
+    build_cached_dataset,
+    train_lightgbm_from_dataset,
+)
+from src.models.tree_models import train_lightgbm, train_xgboost
+from src.utils.shared_arrays import (
+    attach_arrays,
+    shared_array_dir,
+    worker_arrays,
+)
+
+
+# ============================================================
+# Search spaces
+# ============================================================
+
+SEARCH_SPACES: Dict[str, Dict[str, List[Any]]] = {
+    "lightgbm": {
+        "num_leaves": [15, 31, 63, 127],
+        "max_depth": [-1, 4, 6, 8],
+        "min_child_samples": [10, 20, 50, 100],
+        "learning_rate": [0.03, 0.05, 0.1],
+        "colsample_bytree": [0.6, 0.8, 1.0],
+    },
+    "xgboost": {
+        "max_depth": [3, 4, 5, 6, 8],
+        "min_child_weight": [1, 5, 10],
+        "learning_rate": [0.03, 0.05, 0.1],
+        "subsample": [0.6, 0.8, 1.0],
+        "colsample_bytree": [0.6, 0.8, 1.0],
+    },
+}
+
+_TRAINERS = {
+    "lightgbm": train_lightgbm,
+    "xgboost": train_xgboost,
+}
+
+
+def sample_configurations(
+    space: Mapping[str, Sequence[Any]],
+    n_trials: int,
+    *,
+    seed: int = 42,
+) -> List[Dict[str, Any]]:
+    """Distinct random configurations from a grid (all of it if smaller)."""
+
+    if n_trials < 1:
+        raise ValueError(f"n_trials must be at least 1, got {n_trials}")
+
+    names = list(space)
+    sizes = [len(space[name]) for name in names]
+    n_total = int(np.prod(sizes))
+
+    rng = np.random.default_rng(seed)
+    flat = rng.choice(n_total, size=min(n_trials, n_total), replace=False)
+
+    return [
+        {
+            name: space[name][i]
+            for name, i in zip(names, np.unravel_index(index, sizes))
+        }
+        for index in flat
+    ]
+
+
+# ============================================================
+# Workers
+# ============================================================
+
+def _run_trial(
+    trial: int,
+    model_type: str,
+    params: Dict[str, Any],
+    dataset: Optional[Tuple[Path, Dict[str, Any]]] = None,
+    early_stopping_rounds: Optional[int] = None,
+) -> Dict[str, Any]:
+
+    arrays = worker_arrays()
+    start = time.perf_counter()
+
+    if dataset is not None:
+        dataset_path, dataset_params = dataset
+        model = train_lightgbm_from_dataset(
+            dataset_path,
+            params=dataset_params,
+            X_val=arrays["X_val"],
+            y_val=arrays["y_val"],
+            early_stopping_rounds=early_stopping_rounds,
+            n_jobs=1,
+            **params,
+        )
+    else:
+        model = _TRAINERS[model_type](
+            arrays["X_train"],
+            arrays["y_train"],
+            n_jobs=1,
+            **params,
+        )
+    fit_seconds = time.perf_counter() - start
+
+    metrics = evaluate_binary_classifier(
+        model,
+        arrays["X_val"],
+        arrays["y_val"],
+    )
+
+    result = {
+        "trial": trial,
+        "params": params,
+        **metrics,
+        "fit_seconds": fit_seconds,
+    }
+    if hasattr(model, "best_iteration_"):
+        result["n_trees"] = model.best_iteration_
+
+    return result
+
+
+# ============================================================
+# Search
+# ============================================================
+
+def run_search(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_val: np.ndarray,
+    y_val: np.ndarray,
+    *,
+    model_type: str,
+    configurations: Sequence[Dict[str, Any]],
+    n_workers: Optional[int] = None,
+    rank_by: str = "roc_auc",
+    feature_version: Optional[str] = None,
+    early_stopping_rounds: Optional[int] = None,
+    dataset_cache_dir: Path = DATASET_CACHE_DIR,
+) -> List[Dict[str, Any]]:
+    """
+    Run every configuration and return the leaderboard, best first.
+
+    For LightGBM, a feature_version enables the binned dataset cache and
+    early_stopping_rounds stops trials on the validation logloss; both
+    train through the cached binary dataset.
+    """
+
+    if model_type not in _TRAINERS:
+        raise ValueError(f"Unsupported model type: {model_type}")
+
+    use_datasets = model_type == "lightgbm" and (
+        feature_version is not None or early_stopping_rounds is not None
+    )
+    if early_stopping_rounds is not None and not use_datasets:
+        raise ValueError("Early stopping is only supported for LightGBM")
+
+    n_workers = n_workers or os.cpu_count() or 1
+
+    arrays = {
+        "X_train": np.asarray(X_train, dtype=np.float64),
+        "y_train": np.asarray(y_train).astype(np.int64),
+        "X_val": np.asarray(X_val, dtype=np.float64),
+        "y_val": np.asarray(y_val).astype(np.int64),
+    }
+
+    with shared_array_dir(arrays, prefix="hpsearch-") as scratch_dir:
+
+        # One binned dataset per distinct binning, shared by its trials
+        datasets = [None] * len(configurations)
+        if use_datasets:
+            # Without a feature version the datasets live only for this search
+            cache_dir = (
+                dataset_cache_dir
+                if feature_version is not None
+                else scratch_dir
+            )
+            built: Dict[str, Path] = {}
+            for trial, params in enumerate(configurations):
+                dataset_params = binning_params(
+                    min_child_samples=params.get("min_child_samples", 20),
+                    random_state=params.get("random_state", 42),
+                )
+                key = json.dumps(dataset_params, sort_keys=True)
+                if key not in built:
+                    built[key] = build_cached_dataset(
+                        arrays["X_train"],
+                        arrays["y_train"],
+                        feature_version=feature_version or "scratch",
+                        params=dataset_params,
+                        cache_dir=cache_dir,
+                    )
+                datasets[trial] = (built[key], dataset_params)
+
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(n_workers, len(configurations))),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=attach_arrays,
+            initargs=(str(scratch_dir),),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _run_trial,
+                    trial,
+                    model_type,
+                    params,
+                    datasets[trial],
+                    early_stopping_rounds,
+                )
+                for trial, params in enumerate(configurations)
+            ]
+            for future in as_completed(futures):
+                results.append(future.result())
+
+    return sorted(results, key=lambda r: (-r[rank_by], r["trial"]))
+
+
+def save_leaderboard(leaderboard: List[Dict[str, Any]], path: Path) -> None:
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w") as f:
+        json.dump(leaderboard, f, indent=2, default=float)
@@ -4,6 +4,9 @@ import numpy as np
 
 from xgboost import XGBClassifier
 from lightgbm import LGBMClassifier
+import lightgbm as lgb
+
+from src.models.lgb_dataset import LightGBMBoosterModel
 
 
 # ============================================================
@@ -81,4 +84,99 @@ def train_lightgbm(
 
     model.fit(X_train, y_train)
 
-    return model
\ No newline at end of file
+    return model
+
+
+# ============================================================
+# Continuation (warm start)
+# ============================================================
+
+def n_trees(model) -> int:
+
+    if isinstance(model, (LGBMClassifier, LightGBMBoosterModel)):
+        return model.booster_.num_trees()
+    if isinstance(model, XGBClassifier):
+        return model.get_booster().num_boosted_rounds()
+
+    raise TypeError(f"Unsupported tree model: {type(model).__name__}")
+
+
+def continue_training(
+    base_model,
+    X_new: np.ndarray,
+    y_new: np.ndarray,
+    *,
+    n_estimators: int = 50,
+    learning_rate: Optional[float] = None,
+    n_jobs: Optional[int] = None,
+):
+    """
+    Add n_estimators trees to a fitted booster, fitting only the new data.
+
+    The base model is left untouched; the returned model holds the base
+    trees followed by the new ones.
+    """
+
+    if isinstance(base_model, LightGBMBoosterModel):
+        return _continue_booster(
+            base_model,
+            X_new,
+            y_new,
+            n_estimators=n_estimators,
+            learning_rate=learning_rate,
+            n_jobs=n_jobs,
+        )
+
+    params = base_model.get_params()
+    params["n_estimators"] = n_estimators
+    if learning_rate is not None:
+        params["learning_rate"] = learning_rate
+    if n_jobs is not None:
+        params["n_jobs"] = n_jobs
+
+    if isinstance(base_model, LGBMClassifier):
+        model = LGBMClassifier(**params)
+        model.fit(X_new, y_new, init_model=base_model.booster_)
+    elif isinstance(base_model, XGBClassifier):
+        model = XGBClassifier(**params)
+        model.fit(X_new, y_new, xgb_model=base_model.get_booster())
+    else:
+        raise TypeError(
+            f"Unsupported tree model: {type(base_model).__name__}"
+        )
+
+    return model
+
+
+def _continue_booster(
+    base_model: LightGBMBoosterModel,
+    X_new: np.ndarray,
+    y_new: np.ndarray,
+    *,
+    n_estimators: int,
+    learning_rate: Optional[float],
+    n_jobs: Optional[int],
+) -> LightGBMBoosterModel:
+
+    params = {**base_model.params, "n_estimators": n_estimators}
+    if learning_rate is not None:
+        params["learning_rate"] = learning_rate
+    if n_jobs is not None:
+        params["num_threads"] = n_jobs
+
+    # Continue from the early-stopped model, not the trees past it
+    init_model = lgb.Booster(
+        model_str=base_model.booster_.model_to_string(
+            num_iteration=base_model.best_iteration_
+        )
+    )
+
+    train_params = {k: v for k, v in params.items() if k != "n_estimators"}
+    booster = lgb.train(
+        train_params,
+        lgb.Dataset(X_new, label=np.asarray(y_new, dtype=np.float64)),
+        num_boost_round=n_estimators,
+        init_model=init_model,
+    )
+
+    return LightGBMBoosterModel(booster, params)
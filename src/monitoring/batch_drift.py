@@ -0,0 +1,347 @@
+"""
+Vectorized drift computation over the preprocessed feature matrix.
+
+Scores every column of a current window against a reference matrix in a
+single NumPy pass, and many windows in a single call:
+
+- two-sample KS for all columns, from per-column sorted arrays and
+  searchsorted
+- PSI and chi-square for the discrete (one-hot and ordinal) columns, from
+  one bincount over reference codes
+
+To search all columns at once, each value is keyed by a complex number
+(column + 1j * value). NumPy orders complex values lexicographically, so
+one flat sorted key array holds every column's sorted values back to back
+and a single searchsorted call answers queries for all columns.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import json
+import numpy as np
+
+from src.monitoring.metrics import chi_square, ks_pvalue, psi
+
+
+# ============================================================
+# Paths
+# ============================================================
+
+FEATURE_METADATA_PATH = Path("artifacts/features/feature_metadata.json")
+
+DISCRETE_TYPES = ("categorical", "ordinal")
+
+
+# ============================================================
+# Helpers
+# ============================================================
+
+def _complex_keys(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+
+    # Assign parts separately: 1j * inf would produce a NaN real part
+    keys = np.empty(np.broadcast(groups, values).shape, dtype=np.complex128)
+    keys.real = groups
+    keys.imag = values
+
+    return keys
+
+
+def _check_finite(X: np.ndarray, what: str) -> None:
+    if not np.isfinite(X).all():
+        raise ValueError(f"{what} contains NaN or infinite values")
+
+
+def load_feature_layout(
+    path: Path = FEATURE_METADATA_PATH,
+) -> Tuple[List[str], List[str]]:
+
+    with open(path, "r") as f:
+        metadata = json.load(f)
+
+    names = metadata["feature_names"]
+    return names, [metadata["feature_types"][name] for name in names]
+
+
+# ============================================================
+# Reference
+# ============================================================
+
+@dataclass(frozen=True)
+class DriftReference:
+
+    feature_names: List[str]
+    feature_types: List[str]
+
+    # Reference matrix with every column sorted independently
+    sorted_values: np.ndarray
+
+    # Discrete columns: known codes, flattened column after column
+    discrete_idx: np.ndarray
+    codes: np.ndarray
+    code_offsets: np.ndarray
+    n_codes: np.ndarray
+
+    # (n_discrete, max_codes + 1) reference counts; bin n_codes[d] is unknown
+    discrete_counts: np.ndarray
+
+    _value_keys: np.ndarray = field(init=False, repr=False, compare=False)
+    _code_keys: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        n_ref, n_features = self.sorted_values.shape
+        object.__setattr__(
+            self,
+            "_value_keys",
+            _complex_keys(
+                np.repeat(np.arange(n_features), n_ref),
+                self.sorted_values.T.ravel(),
+            ),
+        )
+        object.__setattr__(
+            self,
+            "_code_keys",
+            _complex_keys(
+                np.repeat(np.arange(len(self.n_codes)), self.n_codes),
+                self.codes,
+            ),
+        )
+
+    @property
+    def n_rows(self) -> int:
+        return self.sorted_values.shape[0]
+
+    @property
+    def n_features(self) -> int:
+        return self.sorted_values.shape[1]
+
+    def discrete_histograms(
+        self,
+        X: np.ndarray,
+        window_ids: np.ndarray,
+        n_windows: int,
+    ) -> np.ndarray:
+
+        n_discrete = len(self.discrete_idx)
+        width = self.discrete_counts.shape[1]
+
+        values = X[:, self.discrete_idx]
+        columns = np.broadcast_to(np.arange(n_discrete), values.shape)
+        queries = _complex_keys(columns, values)
+
+        idx = np.searchsorted(self._code_keys, queries)
+        clipped = np.minimum(idx, len(self._code_keys) - 1)
+        known = (idx < len(self._code_keys)) & (
+            self._code_keys[clipped] == queries
+        )
+        bins = np.where(
+            known,
+            idx - self.code_offsets[columns],
+            self.n_codes[columns],
+        )
+
+        flat = (window_ids[:, None] * n_discrete + columns) * width + bins
+
+        return np.bincount(
+            flat.ravel(),
+            minlength=n_windows * n_discrete * width,
+        ).reshape(n_windows, n_discrete, width)
+
+
+def build_drift_reference(
+    X_reference: np.ndarray,
+    feature_names: Sequence[str],
+    feature_types: Sequence[str],
+) -> DriftReference:
+
+    X_reference = np.asarray(X_reference, dtype=np.float64)
+    if X_reference.ndim != 2 or X_reference.shape[1] != len(feature_names):
+        raise ValueError(
+            f"Expected a (n, {len(feature_names)}) matrix, "
+            f"got {X_reference.shape}"
+        )
+    _check_finite(X_reference, "Reference matrix")
+
+    discrete_idx = np.array(
+        [j for j, t in enumerate(feature_types) if t in DISCRETE_TYPES],
+        dtype=np.intp,
+    )
+
+    code_lists = [np.unique(X_reference[:, j]) for j in discrete_idx]
+    n_codes = np.array([len(c) for c in code_lists], dtype=np.intp)
+
+    reference = DriftReference(
+        feature_names=list(feature_names),
+        feature_types=list(feature_types),
+        sorted_values=np.sort(X_reference, axis=0),
+        discrete_idx=discrete_idx,
+        codes=np.concatenate(code_lists) if code_lists else np.empty(0),
+        code_offsets=np.concatenate([[0], np.cumsum(n_codes)[:-1]]).astype(
+            np.intp
+        ),
+        n_codes=n_codes,
+        discrete_counts=np.zeros(
+            (len(discrete_idx), int(n_codes.max(initial=0)) + 1),
+            dtype=np.int64,
+        ),
+    )
+
+    reference.discrete_counts[...] = reference.discrete_histograms(
+        X_reference,
+        np.zeros(len(X_reference), dtype=np.intp),
+        1,
+    )[0]
+
+    return reference
+
+
+def save_drift_reference(reference: DriftReference, path: Path) -> None:
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    np.savez(
+        path,
+        feature_names=np.array(reference.feature_names),
+        feature_types=np.array(reference.feature_types),
+        sorted_values=reference.sorted_values,
+        discrete_idx=reference.discrete_idx,
+        codes=reference.codes,
+        code_offsets=reference.code_offsets,
+        n_codes=reference.n_codes,
+        discrete_counts=reference.discrete_counts,
+    )
+
+
+def load_drift_reference(path: Path) -> DriftReference:
+
+    if not path.exists():
+        raise FileNotFoundError(f"Drift reference not found: {path}")
+
+    with np.load(path) as data:
+        return DriftReference(
+            feature_names=data["feature_names"].tolist(),
+            feature_types=data["feature_types"].tolist(),
+            sorted_values=data["sorted_values"],
+            discrete_idx=data["discrete_idx"],
+            codes=data["codes"],
+            code_offsets=data["code_offsets"],
+            n_codes=data["n_codes"],
+            discrete_counts=data["discrete_counts"],
+        )
+
+
+# ============================================================
+# Drift computation
+# ============================================================
+
+def _ks_windows(
+    reference: DriftReference,
+    X: np.ndarray,
+    window_ids: np.ndarray,
+    window_sizes: np.ndarray,
+) -> np.ndarray:
+
+    n_windows = len(window_sizes)
+    n_features = reference.n_features
+
+    # Sort every (window, column) group at once
+    groups = window_ids[:, None] * n_features + np.arange(n_features)
+    keys = np.sort(_complex_keys(groups, X).ravel())
+
+    group = keys.real.astype(np.intp)
+    group_start = np.searchsorted(group, np.arange(n_windows * n_features))
+    n_cur = window_sizes[group // n_features]
+
+    # Current CDF just before and at each current value (ties included)
+    cur_below = np.searchsorted(keys, keys, side="left") - group_start[group]
+    cur_at = np.searchsorted(keys, keys, side="right") - group_start[group]
+
+    # Reference CDF just before and at each current value
+    column = group % n_features
+    ref_keys = _complex_keys(column, keys.imag)
+    column_start = column * reference.n_rows
+    ref_below = np.searchsorted(reference._value_keys, ref_keys, side="left")
+    ref_at = np.searchsorted(reference._value_keys, ref_keys, side="right")
+
+    # Between consecutive current values the current CDF is flat while the
+    # reference CDF only grows, so the supremum is reached at a current
+    # value or just before one.
+    gap = np.maximum(
+        np.abs((ref_at - column_start) / reference.n_rows - cur_at / n_cur),
+        np.abs(
+            (ref_below - column_start) / reference.n_rows - cur_below / n_cur
+        ),
+    )
+
+    return np.maximum.reduceat(gap, group_start).reshape(
+        n_windows, n_features
+    )
+
+
+def compute_drift_windows(
+    reference: DriftReference,
+    windows: Sequence[np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """
+    Score many windows in one call.
+
+    Returns arrays of shape (n_windows, n_features). PSI and chi-square are
+    NaN for continuous columns.
+    """
+
+    if len(windows) == 0:
+        raise ValueError("At least one window is required")
+
+    window_sizes = np.array([len(w) for w in windows], dtype=np.intp)
+    if (window_sizes == 0).any():
+        raise ValueError("Windows must not be empty")
+
+    X = np.concatenate(
+        [np.asarray(w, dtype=np.float64) for w in windows], axis=0
+    )
+    if X.ndim != 2 or X.shape[1] != reference.n_features:
+        raise ValueError(
+            f"Expected windows with {reference.n_features} columns, "
+            f"got {X.shape}"
+        )
+    _check_finite(X, "Window matrix")
+
+    n_windows = len(windows)
+    window_ids = np.repeat(np.arange(n_windows), window_sizes)
+
+    ks = _ks_windows(reference, X, window_ids, window_sizes)
+
+    current_counts = reference.discrete_histograms(X, window_ids, n_windows)
+    reference_counts = reference.discrete_counts[None, :, :]
+    chi2_stat, chi2_p = chi_square(reference_counts, current_counts)
+
+    shape = (n_windows, reference.n_features)
+    result = {
+        "n": window_sizes,
+        "ks": ks,
+        "ks_pvalue": ks_pvalue(ks, reference.n_rows, window_sizes[:, None]),
+        "psi": np.full(shape, np.nan),
+        "chi2": np.full(shape, np.nan),
+        "chi2_pvalue": np.full(shape, np.nan),
+    }
+    result["psi"][:, reference.discrete_idx] = psi(
+        reference_counts, current_counts
+    )
+    result["chi2"][:, reference.discrete_idx] = chi2_stat
+    result["chi2_pvalue"][:, reference.discrete_idx] = chi2_p
+
+    return result
+
+
+def compute_drift(
+    reference: DriftReference,
+    X: np.ndarray,
+) -> Dict[str, np.ndarray]:
+
+    result = compute_drift_windows(reference, [X])
+
+    return {
+        name: values[0] if name != "n" else int(values[0])
+        for name, values in result.items()
+    }
@@ -0,0 +1,199 @@
+"""
+Fixed per-feature bins for drift monitoring.
+
+Bins are derived once from reference (training) data and then frozen, so
+current data can be histogrammed incrementally and compared bin for bin:
+
+- continuous features: reference quantile cut points
+- categorical / ordinal features: one bin per known code, plus a trailing
+  "unknown" bin for codes never seen in the reference
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from src.features.contracts import (
+    ALL_FEATURES,
+    CONTINUOUS_FEATURES,
+    CATEGORICAL_FEATURES,
+    ORDINAL_FEATURES,
+)
+from src.features.preprocess import ORDINAL_CATEGORIES
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+DEFAULT_N_BINS = 10
+
+CONTINUOUS = "continuous"
+DISCRETE = "discrete"
+
+
+# ============================================================
+# Binning
+# ============================================================
+
+@dataclass(frozen=True)
+class FeatureBinning:
+
+    feature_names: List[str]
+
+    # "continuous" or "discrete", per feature
+    kinds: List[str]
+
+    # continuous: interior cut points (k cut points -> k + 1 bins)
+    # discrete: sorted known codes (k codes -> k + 1 bins, last is unknown)
+    edges: List[np.ndarray]
+
+    _lookups: list = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Pure-Python lookups keep single-record updates O(1) per feature
+        lookups = []
+        for kind, edges in zip(self.kinds, self.edges):
+            if kind == CONTINUOUS:
+                lookups.append(edges.tolist())
+            else:
+                codes = edges.tolist()
+                lookups.append({code: i for i, code in enumerate(codes)})
+        object.__setattr__(self, "_lookups", lookups)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    @property
+    def n_bins(self) -> np.ndarray:
+        return np.array([len(e) + 1 for e in self.edges], dtype=np.intp)
+
+    @property
+    def max_bins(self) -> int:
+        return int(self.n_bins.max())
+
+    def assign(self, X: np.ndarray) -> np.ndarray:
+
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected a (n, {self.n_features}) matrix, got {X.shape}"
+            )
+
+        bins = np.empty(X.shape, dtype=np.intp)
+
+        for j, (kind, edges) in enumerate(zip(self.kinds, self.edges)):
+            column = X[:, j]
+            if kind == CONTINUOUS:
+                bins[:, j] = np.searchsorted(edges, column, side="right")
+            elif len(edges) == 0:
+                bins[:, j] = 0
+            else:
+                idx = np.searchsorted(edges, column)
+                clipped = np.minimum(idx, len(edges) - 1)
+                known = (idx < len(edges)) & (edges[clipped] == column)
+                bins[:, j] = np.where(known, idx, len(edges))
+
+        return bins
+
+    def assign_row(self, x: Sequence[float]) -> List[int]:
+
+        bins = []
+        for kind, lookup, value in zip(self.kinds, self._lookups, x):
+            if kind == CONTINUOUS:
+                bins.append(bisect_right(lookup, value))
+            else:
+                bins.append(lookup.get(value, len(lookup)))
+
+        return bins
+
+    def counts(self, X: np.ndarray) -> np.ndarray:
+
+        bins = self.assign(X)
+        flat = (bins + np.arange(self.n_features) * self.max_bins).ravel()
+
+        return np.bincount(
+            flat,
+            minlength=self.n_features * self.max_bins,
+        ).reshape(self.n_features, self.max_bins)
+
+
+# ============================================================
+# Builders
+# ============================================================
+
+def build_binning(
+    X_reference: np.ndarray,
+    feature_names: Sequence[str],
+    feature_kinds: Sequence[str],
+    *,
+    n_bins: int = DEFAULT_N_BINS,
+    known_codes: Optional[Mapping[str, Sequence[float]]] = None,
+) -> FeatureBinning:
+
+    X_reference = np.asarray(X_reference, dtype=np.float64)
+    known_codes = known_codes or {}
+
+    quantiles = np.linspace(0.0, 1.0, n_bins + 1)[1:-1]
+
+    edges = []
+    for j, (name, kind) in enumerate(zip(feature_names, feature_kinds)):
+        column = X_reference[:, j]
+        column = column[~np.isnan(column)]
+
+        if kind == CONTINUOUS:
+            edges.append(np.unique(np.quantile(column, quantiles)))
+        else:
+            codes = np.union1d(
+                np.unique(column),
+                np.asarray(known_codes.get(name, []), dtype=np.float64),
+            )
+            edges.append(codes)
+
+    return FeatureBinning(
+        feature_names=list(feature_names),
+        kinds=list(feature_kinds),
+        edges=edges,
+    )
+
+
+def build_contract_binning(
+    X_reference: np.ndarray,
+    *,
+    n_bins: int = DEFAULT_N_BINS,
+) -> FeatureBinning:
+    """Binning over the raw ALL_FEATURES layout, by contract feature group."""
+
+    kinds: Dict[str, str] = {}
+    for name in CONTINUOUS_FEATURES:
+        kinds[name] = CONTINUOUS
+    for name in CATEGORICAL_FEATURES + ORDINAL_FEATURES:
+        kinds[name] = DISCRETE
+
+    return build_binning(
+        X_reference,
+        ALL_FEATURES,
+        [kinds[name] for name in ALL_FEATURES],
+        n_bins=n_bins,
+        known_codes=dict(zip(ORDINAL_FEATURES, ORDINAL_CATEGORIES)),
+    )
+
+
+def build_layout_binning(
+    X_reference: np.ndarray,
+    feature_names: Sequence[str],
+    feature_types: Sequence[str],
+    *,
+    n_bins: int = DEFAULT_N_BINS,
+) -> FeatureBinning:
+    """Binning over the preprocessed layout described by feature_metadata."""
+
+    return build_binning(
+        X_reference,
+        feature_names,
+        [CONTINUOUS if t == "continuous" else DISCRETE for t in feature_types],
+        n_bins=n_bins,
+    )
@@ -0,0 +1,125 @@
+"""
+Streaming per-feature drift monitor.
+
+Keeps one fixed-bin histogram per feature (bins frozen from the reference
+data) and updates it in O(1) per record or O(batch) vectorized. Drift
+statistics are computed on demand from the two histograms, so memory use
+is independent of how many records have been observed.
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from src.monitoring.binning import (
+    DEFAULT_N_BINS,
+    FeatureBinning,
+    build_contract_binning,
+)
+from src.monitoring.metrics import DEFAULT_EPSILON, drift_statistics
+from src.monitoring.profile import ReferenceProfile
+
+
+# ============================================================
+# Monitor
+# ============================================================
+
+class StreamingDriftMonitor:
+
+    def __init__(
+        self,
+        binning: FeatureBinning,
+        reference_counts: np.ndarray,
+    ) -> None:
+
+        reference_counts = np.asarray(reference_counts, dtype=np.int64)
+        expected_shape = (binning.n_features, binning.max_bins)
+        if reference_counts.shape != expected_shape:
+            raise ValueError(
+                f"Reference counts must have shape {expected_shape}, "
+                f"got {reference_counts.shape}"
+            )
+
+        self.binning = binning
+        self.reference_counts = reference_counts
+        self.counts = np.zeros_like(reference_counts)
+        self.n_observed = 0
+
+        self._row_offsets = (
+            np.arange(binning.n_features) * binning.max_bins
+        ).tolist()
+        self._flat_counts = self.counts.reshape(-1)
+
+    @classmethod
+    def from_reference(
+        cls,
+        X_reference: np.ndarray,
+        *,
+        n_bins: int = DEFAULT_N_BINS,
+    ) -> "StreamingDriftMonitor":
+        """Build from a raw reference matrix in ALL_FEATURES order."""
+
+        binning = build_contract_binning(X_reference, n_bins=n_bins)
+
+        return cls(binning, binning.counts(X_reference))
+
+    @classmethod
+    def from_profile(
+        cls,
+        profile: ReferenceProfile,
+    ) -> "StreamingDriftMonitor":
+        return cls(profile.binning, profile.counts)
+
+    # --------------------------------------------------------
+    # Updates
+    # --------------------------------------------------------
+
+    def update(self, x: Sequence[float]) -> None:
+
+        flat = self._flat_counts
+        for offset, b in zip(self._row_offsets, self.binning.assign_row(x)):
+            flat[offset + b] += 1
+
+        self.n_observed += 1
+
+    def update_batch(self, X: np.ndarray) -> None:
+
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return
+
+        self.counts += self.binning.counts(X)
+        self.n_observed += len(X)
+
+    def reset(self) -> None:
+        self.counts[...] = 0
+        self.n_observed = 0
+
+    # --------------------------------------------------------
+    # Reporting
+    # --------------------------------------------------------
+
+    def statistics(
+        self,
+        *,
+        epsilon: float = DEFAULT_EPSILON,
+    ) -> Dict[str, np.ndarray]:
+
+        return drift_statistics(
+            self.reference_counts,
+            self.counts,
+            epsilon=epsilon,
+        )
+
+    def report(
+        self,
+        *,
+        epsilon: float = DEFAULT_EPSILON,
+    ) -> Dict[str, Dict[str, float]]:
+
+        stats = self.statistics(epsilon=epsilon)
+
+        return {
+            name: {metric: float(values[j]) for metric, values in stats.items()}
+            for j, name in enumerate(self.binning.feature_names)
+        }
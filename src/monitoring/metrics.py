@@ -0,0 +1,177 @@
+"""
+Drift statistics computed from binned counts.
+
+Every function takes reference and current counts whose last axis is the
+bin axis and reduces over it, so one call scores all features at once
+(shape (n_features, n_bins)) or all features of many windows
+(shape (n_windows, n_features, n_bins)). Features with fewer bins are
+zero-padded; empty padding bins contribute nothing to any statistic.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+from scipy import stats
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+# Floor applied to bin proportions so empty bins don't produce log(0)
+DEFAULT_EPSILON = 1e-6
+
+
+# ============================================================
+# Helpers
+# ============================================================
+
+def normalize(counts: np.ndarray) -> np.ndarray:
+
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = counts.sum(axis=-1, keepdims=True)
+
+    return np.divide(
+        counts,
+        totals,
+        out=np.zeros_like(counts),
+        where=totals > 0,
+    )
+
+
+# ============================================================
+# Statistics
+# ============================================================
+
+def psi(
+    reference_counts: np.ndarray,
+    current_counts: np.ndarray,
+    *,
+    epsilon: float = DEFAULT_EPSILON,
+) -> np.ndarray:
+
+    p = np.maximum(normalize(reference_counts), epsilon)
+    q = np.maximum(normalize(current_counts), epsilon)
+
+    return np.sum((q - p) * np.log(q / p), axis=-1)
+
+
+def kl_divergence(
+    reference_counts: np.ndarray,
+    current_counts: np.ndarray,
+    *,
+    epsilon: float = DEFAULT_EPSILON,
+) -> np.ndarray:
+    """KL(current || reference), in nats."""
+
+    p = np.maximum(normalize(reference_counts), epsilon)
+    q = np.maximum(normalize(current_counts), epsilon)
+
+    return np.sum(q * np.log(q / p), axis=-1)
+
+
+def js_divergence(
+    reference_counts: np.ndarray,
+    current_counts: np.ndarray,
+    *,
+    epsilon: float = DEFAULT_EPSILON,
+) -> np.ndarray:
+    """Jensen-Shannon divergence, in nats (bounded by log 2)."""
+
+    p = np.maximum(normalize(reference_counts), epsilon)
+    q = np.maximum(normalize(current_counts), epsilon)
+    m = 0.5 * (p + q)
+
+    return 0.5 * np.sum(p * np.log(p / m), axis=-1) + 0.5 * np.sum(
+        q * np.log(q / m), axis=-1
+    )
+
+
+def binned_ks(
+    reference_counts: np.ndarray,
+    current_counts: np.ndarray,
+) -> np.ndarray:
+    """Max CDF gap evaluated at bin boundaries (a lower bound on exact KS)."""
+
+    p = np.cumsum(normalize(reference_counts), axis=-1)
+    q = np.cumsum(normalize(current_counts), axis=-1)
+
+    return np.max(np.abs(p - q), axis=-1)
+
+
+def chi_square(
+    reference_counts: np.ndarray,
+    current_counts: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Chi-square test of homogeneity between the two histograms.
+
+    Returns (statistic, p_value). Bins empty in both samples are ignored.
+    """
+
+    reference_counts = np.asarray(reference_counts, dtype=np.float64)
+    current_counts = np.asarray(current_counts, dtype=np.float64)
+
+    n_ref = reference_counts.sum(axis=-1, keepdims=True)
+    n_cur = current_counts.sum(axis=-1, keepdims=True)
+    pooled = reference_counts + current_counts
+    total = n_ref + n_cur
+
+    expected_ref = np.divide(
+        pooled * n_ref, total, out=np.zeros_like(pooled), where=total > 0
+    )
+    expected_cur = pooled - expected_ref
+
+    statistic = np.sum(
+        np.divide(
+            (reference_counts - expected_ref) ** 2,
+            expected_ref,
+            out=np.zeros_like(pooled),
+            where=expected_ref > 0,
+        )
+        + np.divide(
+            (current_counts - expected_cur) ** 2,
+            expected_cur,
+            out=np.zeros_like(pooled),
+            where=expected_cur > 0,
+        ),
+        axis=-1,
+    )
+
+    dof = np.maximum(np.count_nonzero(pooled, axis=-1) - 1, 1)
+
+    return statistic, stats.chi2.sf(statistic, dof)
+
+
+def ks_pvalue(
+    statistic: np.ndarray,
+    n_reference: np.ndarray,
+    n_current: np.ndarray,
+) -> np.ndarray:
+    """Asymptotic two-sample KS p-value (Kolmogorov distribution)."""
+
+    n_reference = np.asarray(n_reference, dtype=np.float64)
+    n_current = np.asarray(n_current, dtype=np.float64)
+    effective_n = np.divide(
+        n_reference * n_current,
+        n_reference + n_current,
+        out=np.zeros(np.broadcast(n_reference, n_current).shape),
+        where=(n_reference + n_current) > 0,
+    )
+
+    return stats.kstwobign.sf(np.sqrt(effective_n) * statistic)
+
+
+def drift_statistics(
+    reference_counts: np.ndarray,
+    current_counts: np.ndarray,
+    *,
+    epsilon: float = DEFAULT_EPSILON,
+) -> Dict[str, np.ndarray]:
+
+    return {
+        "psi": psi(reference_counts, current_counts, epsilon=epsilon),
+        "kl": kl_divergence(reference_counts, current_counts, epsilon=epsilon),
+        "js": js_divergence(reference_counts, current_counts, epsilon=epsilon),
+        "ks": binned_ks(reference_counts, current_counts),
+    }
@@ -0,0 +1,222 @@
+"""
+Precomputed reference profiles for drift monitoring.
+
+A feature reference profile is written next to feature_metadata.json when
+the preprocessor is fitted. It holds, per raw feature, the frozen bins
+(quantile cut points or known codes), reference bin counts, category
+frequencies and moments, versioned with the feature contract hash, so drift
+jobs never need to reload the training data.
+
+A score profile is written next to each trained model and summarizes the
+distribution of its validation-set scores.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import json
+import numpy as np
+
+from src.features.contracts import ALL_FEATURES
+from src.monitoring.binning import (
+    CONTINUOUS,
+    DEFAULT_N_BINS,
+    FeatureBinning,
+    build_contract_binning,
+)
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+PROFILE_FORMAT_VERSION = 1
+
+# Frequency key of the trailing bin: missing values and codes outside
+# the known set
+UNKNOWN_CODE_KEY = "__unknown__"
+
+SCORE_QUANTILE_LEVELS = np.linspace(0.0, 1.0, 101)
+SCORE_HISTOGRAM_BINS = 20
+
+
+# ============================================================
+# Feature reference profile
+# ============================================================
+
+@dataclass(frozen=True)
+class ReferenceProfile:
+
+    feature_version: str
+    n_rows: int
+    binning: FeatureBinning
+    counts: np.ndarray
+    means: np.ndarray
+    variances: np.ndarray
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        features = {}
+        for j, name in enumerate(self.binning.feature_names):
+            kind = self.binning.kinds[j]
+            n_bins = len(self.binning.edges[j]) + 1
+            entry = {
+                "kind": kind,
+                "edges": self.binning.edges[j].tolist(),
+                "counts": self.counts[j, :n_bins].tolist(),
+                "mean": float(self.means[j]),
+                "variance": float(self.variances[j]),
+            }
+            if kind != CONTINUOUS:
+                entry["frequencies"] = {
+                    str(code): count / self.n_rows
+                    for code, count in zip(entry["edges"], entry["counts"])
+                }
+                entry["frequencies"][UNKNOWN_CODE_KEY] = (
+                    entry["counts"][-1] / self.n_rows
+                )
+            features[name] = entry
+
+        return {
+            "format_version": PROFILE_FORMAT_VERSION,
+            "feature_version": self.feature_version,
+            "n_rows": self.n_rows,
+            "features": features,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReferenceProfile":
+
+        if data.get("format_version") != PROFILE_FORMAT_VERSION:
+            raise ValueError(
+                "Unsupported reference profile format: "
+                f"{data.get('format_version')}"
+            )
+
+        names = list(data["features"])
+        entries = [data["features"][name] for name in names]
+
+        binning = FeatureBinning(
+            feature_names=names,
+            kinds=[e["kind"] for e in entries],
+            edges=[np.asarray(e["edges"], dtype=np.float64) for e in entries],
+        )
+
+        counts = np.zeros((len(names), binning.max_bins), dtype=np.int64)
+        for j, entry in enumerate(entries):
+            counts[j, : len(entry["counts"])] = entry["counts"]
+
+        return cls(
+            feature_version=data["feature_version"],
+            n_rows=data["n_rows"],
+            binning=binning,
+            counts=counts,
+            means=np.array([e["mean"] for e in entries]),
+            variances=np.array([e["variance"] for e in entries]),
+        )
+
+
+def build_reference_profile(
+    X_reference: np.ndarray,
+    *,
+    feature_version: str,
+    n_bins: int = DEFAULT_N_BINS,
+) -> ReferenceProfile:
+    """Profile a raw reference matrix in ALL_FEATURES order."""
+
+    X_reference = np.asarray(X_reference, dtype=np.float64)
+    if X_reference.ndim != 2 or X_reference.shape[1] != len(ALL_FEATURES):
+        raise ValueError(
+            f"Expected a (n, {len(ALL_FEATURES)}) matrix in ALL_FEATURES "
+            f"order, got shape {X_reference.shape}"
+        )
+
+    binning = build_contract_binning(X_reference, n_bins=n_bins)
+
+    return ReferenceProfile(
+        feature_version=feature_version,
+        n_rows=len(X_reference),
+        binning=binning,
+        counts=binning.counts(X_reference),
+        means=np.nanmean(X_reference, axis=0),
+        variances=np.nanvar(X_reference, axis=0),
+    )
+
+
+def save_reference_profile(profile: ReferenceProfile, path: Path) -> None:
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w") as f:
+        json.dump(profile.to_dict(), f, indent=2)
+
+
+def load_reference_profile(
+    path: Path,
+    *,
+    expected_feature_version: Optional[str] = None,
+) -> ReferenceProfile:
+
+    if not path.exists():
+        raise FileNotFoundError(f"Reference profile not found: {path}")
+
+    with open(path, "r") as f:
+        profile = ReferenceProfile.from_dict(json.load(f))
+
+    if (
+        expected_feature_version is not None
+        and profile.feature_version != expected_feature_version
+    ):
+        raise ValueError(
+            f"Reference profile feature version {profile.feature_version} "
+            f"does not match expected {expected_feature_version}"
+        )
+
+    return profile
+
+
+# ============================================================
+# Score profile
+# ============================================================
+
+def build_score_profile(
+    scores: np.ndarray,
+    *,
+    source: str = "validation",
+) -> Dict[str, Any]:
+
+    scores = np.asarray(scores, dtype=np.float64)
+    counts, edges = np.histogram(
+        scores,
+        bins=SCORE_HISTOGRAM_BINS,
+        range=(0.0, 1.0),
+    )
+
+    return {
+        "format_version": PROFILE_FORMAT_VERSION,
+        "source": source,
+        "n": int(len(scores)),
+        "mean": float(scores.mean()),
+        "quantile_levels": SCORE_QUANTILE_LEVELS.tolist(),
+        "quantiles": np.quantile(scores, SCORE_QUANTILE_LEVELS).tolist(),
+        "histogram_edges": edges.tolist(),
+        "histogram_counts": counts.tolist(),
+    }
+
+
+def save_score_profile(profile: Dict[str, Any], path: Path) -> None:
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2)
+
+
+def load_score_profile(path: Path) -> Dict[str, Any]:
+
+    if not path.exists():
+        raise FileNotFoundError(f"Score profile not found: {path}")
+
+    with open(path, "r") as f:
+        return json.load(f)
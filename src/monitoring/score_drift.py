@@ -0,0 +1,167 @@
+"""
+Prediction-score drift monitor.
+
+Tracks the distribution of live predict_proba[:, 1] scores with a KLL
+quantile sketch (memory bounded by the configured rank error, independent
+of request volume) plus an exact fixed-bin histogram, and compares both
+against the validation-set score profile written next to each model at
+training time (score_profile.json).
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import threading
+import numpy as np
+
+from src.monitoring.metrics import DEFAULT_EPSILON, psi
+from src.monitoring.profile import load_score_profile
+from src.monitoring.sketches import KLLSketch, kll_k_for_error
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+# Normalized rank error of the live quantile estimates
+DEFAULT_SCORE_ERROR_BOUND = 0.005
+
+
+# ============================================================
+# Monitor
+# ============================================================
+
+class ScoreDriftMonitor:
+
+    def __init__(
+        self,
+        score_profile: Dict[str, Any],
+        *,
+        error_bound: float = DEFAULT_SCORE_ERROR_BOUND,
+        seed: Optional[int] = None,
+    ) -> None:
+
+        self.profile = score_profile
+        self.error_bound = error_bound
+        self.seed = seed
+
+        self.reference_levels = np.asarray(
+            score_profile["quantile_levels"], dtype=np.float64
+        )
+        self.reference_quantiles = np.asarray(
+            score_profile["quantiles"], dtype=np.float64
+        )
+        self.histogram_edges = np.asarray(
+            score_profile["histogram_edges"], dtype=np.float64
+        )
+        self.reference_histogram = np.asarray(
+            score_profile["histogram_counts"], dtype=np.int64
+        )
+
+        self.sketch = KLLSketch(kll_k_for_error(error_bound), seed=seed)
+        self.histogram = np.zeros_like(self.reference_histogram)
+        self.total = 0.0
+
+        # Scores may arrive from several serving threads
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_path(
+        cls,
+        path: Path,
+        *,
+        error_bound: float = DEFAULT_SCORE_ERROR_BOUND,
+        seed: Optional[int] = None,
+    ) -> "ScoreDriftMonitor":
+        """Build from a model's score_profile.json."""
+
+        return cls(
+            load_score_profile(path),
+            error_bound=error_bound,
+            seed=seed,
+        )
+
+    @property
+    def n_observed(self) -> int:
+        return self.sketch.n
+
+    # --------------------------------------------------------
+    # Updates
+    # --------------------------------------------------------
+
+    def update(self, score: float) -> None:
+        self.update_batch(np.array([score], dtype=np.float64))
+
+    def update_batch(self, scores: np.ndarray) -> None:
+
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        scores = scores[~np.isnan(scores)]
+        if len(scores) == 0:
+            return
+
+        # Same bins as np.histogram: right edge of the last bin is closed
+        bins = np.clip(
+            np.searchsorted(self.histogram_edges, scores, side="right") - 1,
+            0,
+            len(self.histogram) - 1,
+        )
+        counts = np.bincount(bins, minlength=len(self.histogram))
+
+        with self._lock:
+            self.sketch.update_batch(scores)
+            self.histogram += counts
+            self.total += float(scores.sum())
+
+    def reset(self) -> None:
+        with self._lock:
+            self.sketch = KLLSketch(self.sketch.k, seed=self.seed)
+            self.histogram[...] = 0
+            self.total = 0.0
+
+    # --------------------------------------------------------
+    # Reporting
+    # --------------------------------------------------------
+
+    def quantiles(
+        self,
+        levels: Optional[Sequence[float]] = None,
+    ) -> np.ndarray:
+
+        levels = self.reference_levels if levels is None else levels
+        with self._lock:
+            return self.sketch.quantiles(levels)
+
+    def report(
+        self,
+        *,
+        epsilon: float = DEFAULT_EPSILON,
+    ) -> Dict[str, Any]:
+
+        with self._lock:
+            n = self.sketch.n
+            histogram = self.histogram.copy()
+            live_quantiles = self.sketch.quantiles(self.reference_levels)
+            # Live CDF at the reference quantiles: KS over the profile grid
+            live_cdf = self.sketch.cdf(self.reference_quantiles)
+            total = self.total
+
+        if n == 0:
+            raise ValueError("No scores observed yet")
+
+        return {
+            "n": n,
+            "error_bound": self.error_bound,
+            "mean": total / n,
+            "reference_mean": self.profile["mean"],
+            "psi": float(
+                psi(self.reference_histogram, histogram, epsilon=epsilon)
+            ),
+            "ks": float(np.abs(live_cdf - self.reference_levels).max()),
+            "max_quantile_shift": float(
+                np.abs(live_quantiles - self.reference_quantiles).max()
+            ),
+            "quantile_levels": self.reference_levels.tolist(),
+            "quantiles": live_quantiles.tolist(),
+            "reference_quantiles": self.reference_quantiles.tolist(),
+            "histogram_counts": histogram.tolist(),
+        }
@@ -0,0 +1,470 @@
+"""
+Mergeable drift summaries.
+
+A DriftSketch summarizes one partition of traffic (e.g. one hour) with
+statistics that combine exactly or with bounded error when partitions are
+merged, so hourly sketches roll up into daily and weekly reports without
+touching raw data:
+
+- per-feature histograms over the frozen reference bins (exact)
+- per-feature count / mean / M2 (exact, Chan et al. parallel update)
+- per continuous feature, a KLL quantile sketch (bounded rank error)
+
+Sketches serialize to a compressed .npz of a few tens of kilobytes.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import hashlib
+import json
+import numpy as np
+
+from src.monitoring.binning import CONTINUOUS, FeatureBinning
+from src.monitoring.metrics import DEFAULT_EPSILON, drift_statistics
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+DEFAULT_KLL_K = 200
+
+SKETCH_FORMAT_VERSION = 1
+
+# Capacity decay between consecutive KLL levels
+_KLL_C = 2.0 / 3.0
+
+
+# ============================================================
+# KLL quantile sketch
+# ============================================================
+
+def kll_k_for_error(epsilon: float) -> int:
+    """Smallest k whose expected normalized rank error is <= epsilon."""
+
+    if not 0 < epsilon < 1:
+        raise ValueError(f"epsilon must be in (0, 1), got {epsilon}")
+
+    # Empirical fit for KLL single-quantile error at 99% confidence
+    return max(8, int(np.ceil((2.296 / epsilon) ** (1 / 0.9723))))
+
+
+class KLLSketch:
+    """
+    KLL streaming quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Items at level h carry weight 2**h. When a level overflows its
+    capacity it is sorted and every other item (random offset) is promoted
+    to the next level, so memory stays O(k) regardless of stream length.
+    """
+
+    def __init__(
+        self,
+        k: int = DEFAULT_KLL_K,
+        *,
+        seed: Optional[int] = None,
+    ) -> None:
+
+        if k < 8:
+            raise ValueError(f"k must be >= 8, got {k}")
+
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return sum(len(level) for level in self.levels)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * _KLL_C ** depth)))
+
+    def _compress(self) -> None:
+
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+
+            items = np.sort(items)
+
+            # An odd item out stays behind so the promoted weight is exact
+            kept = items[:0]
+            if len(items) % 2:
+                kept, items = items[:1], items[1:]
+
+            offset = int(self._rng.integers(2))
+            self.levels[level] = kept
+            self.levels[level + 1] = np.concatenate(
+                [self.levels[level + 1], items[offset::2]]
+            )
+            level += 1
+
+    def update(self, value: float) -> None:
+        self.update_batch(np.array([value], dtype=np.float64))
+
+    def update_batch(self, values: np.ndarray) -> None:
+
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+
+        if other.k != self.k:
+            raise ValueError(
+                f"Cannot merge KLL sketches with k={self.k} and k={other.k}"
+            )
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+
+        self.n += other.n
+        self._compress()
+
+    def _weighted_items(self):
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(level), 2 ** h, dtype=np.float64)
+            for h, level in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind="stable")
+
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, q: Sequence[float]) -> np.ndarray:
+
+        q = np.asarray(q, dtype=np.float64)
+        if self.n == 0:
+            return np.full(q.shape, np.nan)
+
+        items, cumulative = self._weighted_items()
+        idx = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+
+        return items[np.minimum(idx, len(items) - 1)]
+
+    def cdf(self, x: Sequence[float]) -> np.ndarray:
+
+        x = np.asarray(x, dtype=np.float64)
+        if self.n == 0:
+            return np.full(x.shape, np.nan)
+
+        items, cumulative = self._weighted_items()
+        idx = np.searchsorted(items, x, side="right")
+        below = np.where(idx > 0, cumulative[np.maximum(idx - 1, 0)], 0.0)
+
+        return below / cumulative[-1]
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "k": np.array(self.k),
+            "n": np.array(self.n),
+            "level_sizes": np.array([len(level) for level in self.levels]),
+            "items": np.concatenate(self.levels),
+        }
+
+    @classmethod
+    def from_arrays(
+        cls,
+        arrays: Dict[str, np.ndarray],
+        *,
+        seed: Optional[int] = None,
+    ) -> "KLLSketch":
+
+        sketch = cls(int(arrays["k"]), seed=seed)
+        sketch.n = int(arrays["n"])
+        bounds = np.cumsum(arrays["level_sizes"])[:-1]
+        sketch.levels = [
+            np.asarray(level, dtype=np.float64)
+            for level in np.split(arrays["items"], bounds)
+        ]
+
+        return sketch
+
+
+# ============================================================
+# Drift sketch
+# ============================================================
+
+def binning_signature(binning: FeatureBinning) -> str:
+
+    serialized = json.dumps(
+        {
+            "features": binning.feature_names,
+            "kinds": binning.kinds,
+            "edges": [e.tolist() for e in binning.edges],
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class DriftSketch:
+
+    signature: str
+    feature_names: List[str]
+    counts: np.ndarray
+    n: np.ndarray
+    mean: np.ndarray
+    m2: np.ndarray
+    quantile_sketches: Dict[str, KLLSketch]
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+    _continuous_idx: List[int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._continuous_idx = [
+            self.feature_names.index(name) for name in self.quantile_sketches
+        ]
+
+    @classmethod
+    def empty(
+        cls,
+        binning: FeatureBinning,
+        *,
+        k: int = DEFAULT_KLL_K,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> "DriftSketch":
+
+        n_features = binning.n_features
+
+        return cls(
+            signature=binning_signature(binning),
+            feature_names=list(binning.feature_names),
+            counts=np.zeros((n_features, binning.max_bins), dtype=np.int64),
+            n=np.zeros(n_features, dtype=np.int64),
+            mean=np.zeros(n_features),
+            m2=np.zeros(n_features),
+            quantile_sketches={
+                name: KLLSketch(k)
+                for name, kind in zip(binning.feature_names, binning.kinds)
+                if kind == CONTINUOUS
+            },
+            start=start,
+            end=end,
+        )
+
+    # --------------------------------------------------------
+    # Updates
+    # --------------------------------------------------------
+
+    def _merge_moments(
+        self,
+        n_b: np.ndarray,
+        mean_b: np.ndarray,
+        m2_b: np.ndarray,
+    ) -> None:
+
+        n_a = self.n.astype(np.float64)
+        n = n_a + n_b
+        safe_n = np.where(n > 0, n, 1.0)
+        delta = mean_b - self.mean
+
+        self.mean = self.mean + delta * n_b / safe_n
+        self.m2 = self.m2 + m2_b + delta ** 2 * n_a * n_b / safe_n
+        self.n = self.n + n_b.astype(np.int64)
+
+    def update_batch(self, binning: FeatureBinning, X: np.ndarray) -> None:
+
+        if binning_signature(binning) != self.signature:
+            raise ValueError("Binning does not match the sketch signature")
+
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return
+
+        self.counts += binning.counts(X)
+
+        valid = ~np.isnan(X)
+        n_b = valid.sum(axis=0).astype(np.float64)
+        mean_b = np.divide(
+            np.where(valid, X, 0.0).sum(axis=0),
+            n_b,
+            out=np.zeros_like(n_b),
+            where=n_b > 0,
+        )
+        m2_b = np.where(valid, (X - mean_b) ** 2, 0.0).sum(axis=0)
+        self._merge_moments(n_b, mean_b, m2_b)
+
+        for j, sketch in zip(
+            self._continuous_idx, self.quantile_sketches.values()
+        ):
+            sketch.update_batch(X[:, j])
+
+    def merge(self, other: "DriftSketch") -> None:
+
+        if other.signature != self.signature:
+            raise ValueError(
+                f"Cannot merge sketches with different binnings "
+                f"({self.signature} vs {other.signature})"
+            )
+
+        self.counts += other.counts
+        self._merge_moments(other.n.astype(np.float64), other.mean, other.m2)
+
+        for name, sketch in self.quantile_sketches.items():
+            sketch.merge(other.quantile_sketches[name])
+
+        self.start = min(filter(None, [self.start, other.start]), default=None)
+        self.end = max(filter(None, [self.end, other.end]), default=None)
+
+    # --------------------------------------------------------
+    # Reporting
+    # --------------------------------------------------------
+
+    @property
+    def variance(self) -> np.ndarray:
+        return np.divide(
+            self.m2,
+            self.n,
+            out=np.zeros_like(self.m2),
+            where=self.n > 0,
+        )
+
+    def report(
+        self,
+        reference_counts: np.ndarray,
+        reference_means: np.ndarray,
+        reference_variances: np.ndarray,
+        *,
+        quantile_levels: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95),
+        epsilon: float = DEFAULT_EPSILON,
+    ) -> Dict[str, Dict[str, Any]]:
+
+        stats = drift_statistics(reference_counts, self.counts, epsilon=epsilon)
+        reference_std = np.sqrt(reference_variances)
+        mean_shift = np.divide(
+            self.mean - reference_means,
+            reference_std,
+            out=np.zeros_like(self.mean),
+            where=reference_std > 0,
+        )
+
+        report = {}
+        for j, name in enumerate(self.feature_names):
+            entry = {metric: float(values[j]) for metric, values in stats.items()}
+            entry["n"] = int(self.n[j])
+            entry["mean"] = float(self.mean[j])
+            entry["std"] = float(np.sqrt(self.variance[j]))
+            entry["mean_shift_std"] = float(mean_shift[j])
+            if name in self.quantile_sketches:
+                entry["quantiles"] = dict(zip(
+                    map(str, quantile_levels),
+                    self.quantile_sketches[name]
+                    .quantiles(quantile_levels)
+                    .tolist(),
+                ))
+            report[name] = entry
+
+        return report
+
+    # --------------------------------------------------------
+    # Persistence
+    # --------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        header = {
+            "format_version": SKETCH_FORMAT_VERSION,
+            "signature": self.signature,
+            "feature_names": self.feature_names,
+            "quantile_features": list(self.quantile_sketches),
+            "start": self.start,
+            "end": self.end,
+        }
+        arrays = {
+            "header": np.array(json.dumps(header)),
+            "counts": self.counts,
+            "n": self.n,
+            "mean": self.mean,
+            "m2": self.m2,
+        }
+        for i, sketch in enumerate(self.quantile_sketches.values()):
+            for key, value in sketch.to_arrays().items():
+                arrays[f"kll_{i}_{key}"] = value
+
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "DriftSketch":
+
+        if not path.exists():
+            raise FileNotFoundError(f"Drift sketch not found: {path}")
+
+        with np.load(path) as data:
+            header = json.loads(str(data["header"]))
+            if header["format_version"] != SKETCH_FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported sketch format: {header['format_version']}"
+                )
+
+            quantile_sketches = {
+                name: KLLSketch.from_arrays({
+                    key: data[f"kll_{i}_{key}"]
+                    for key in ("k", "n", "level_sizes", "items")
+                })
+                for i, name in enumerate(header["quantile_features"])
+            }
+
+            return cls(
+                signature=header["signature"],
+                feature_names=header["feature_names"],
+                counts=data["counts"],
+                n=data["n"],
+                mean=data["mean"],
+                m2=data["m2"],
+                quantile_sketches=quantile_sketches,
+                start=header["start"],
+                end=header["end"],
+            )
+
+
+def merge_sketches(sketches: Iterable[DriftSketch]) -> DriftSketch:
+
+    sketches = iter(sketches)
+    try:
+        merged = next(sketches)
+    except StopIteration:
+        raise ValueError("At least one sketch is required") from None
+
+    # Merge into a private copy so inputs are never mutated
+    merged = DriftSketch(
+        signature=merged.signature,
+        feature_names=list(merged.feature_names),
+        counts=merged.counts.copy(),
+        n=merged.n.copy(),
+        mean=merged.mean.copy(),
+        m2=merged.m2.copy(),
+        quantile_sketches={
+            name: KLLSketch.from_arrays(sketch.to_arrays())
+            for name, sketch in merged.quantile_sketches.items()
+        },
+        start=merged.start,
+        end=merged.end,
+    )
+    for sketch in sketches:
+        merged.merge(sketch)
+
+    return merged
@@ -0,0 +1,428 @@
+"""
+Rolling drift windows over the preprocessed feature layout.
+
+Each window keeps live per-feature histograms that are updated
+incrementally: records entering the window are added, records leaving it
+are subtracted, so no window is ever re-aggregated from scratch.
+
+- SlidingCountWindow: the last N records
+- SlidingTimeWindow: records from the last T seconds
+- DecayedWindow: all records, exponentially down-weighted by age
+
+Count and time windows keep the binned rows in a preallocated ring buffer
+(one byte per feature for the default layout), which is all that is needed
+to subtract a row when it leaves the window.
+
+Time and decayed windows run on event time once an update passes
+timestamps: statistics() then measures age against the latest event seen,
+so replaying past data does not expire or decay it against the wall clock.
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Union
+
+import time
+import numpy as np
+
+from src.monitoring.batch_drift import (
+    FEATURE_METADATA_PATH,
+    load_feature_layout,
+)
+from src.monitoring.binning import (
+    DEFAULT_N_BINS,
+    FeatureBinning,
+    build_layout_binning,
+)
+from src.monitoring.drift import StreamingDriftMonitor
+from src.monitoring.metrics import DEFAULT_EPSILON
+
+
+Timestamps = Union[None, float, Sequence[float], np.ndarray]
+
+
+# ============================================================
+# Ring buffer
+# ============================================================
+
+class RingBuffer:
+
+    def __init__(
+        self,
+        capacity: int,
+        row_shape: tuple = (),
+        dtype=np.float64,
+    ) -> None:
+
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+
+        self.data = np.empty((capacity, *row_shape), dtype=dtype)
+        self.capacity = capacity
+        self.start = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _positions(self, offset: int, n: int) -> np.ndarray:
+        return (self.start + offset + np.arange(n)) % self.capacity
+
+    def push(self, rows: np.ndarray) -> np.ndarray:
+        """Append rows, returning the oldest rows evicted to make room."""
+
+        n = len(rows)
+        if n > self.capacity:
+            raise ValueError(
+                f"Cannot push {n} rows into a ring of capacity {self.capacity}"
+            )
+
+        evicted = self.pop(self.size + n - self.capacity)
+        self.data[self._positions(self.size, n)] = rows
+        self.size += n
+
+        return evicted
+
+    def pop(self, n: int) -> np.ndarray:
+        """Remove and return the oldest n rows."""
+
+        n = max(0, min(n, self.size))
+        evicted = self.data[self._positions(0, n)]
+
+        self.start = (self.start + n) % self.capacity
+        self.size -= n
+
+        return evicted
+
+    def count_below(self, cutoff: float) -> int:
+        """Number of leading entries < cutoff, for non-decreasing contents."""
+
+        end = self.start + self.size
+        head = self.data[self.start:min(end, self.capacity)]
+        count = int(np.searchsorted(head, cutoff))
+
+        if count == len(head) and end > self.capacity:
+            tail = self.data[:end - self.capacity]
+            count += int(np.searchsorted(tail, cutoff))
+
+        return count
+
+    def clear(self) -> None:
+        self.start = 0
+        self.size = 0
+
+
+# ============================================================
+# Helpers
+# ============================================================
+
+def _bin_dtype(binning: FeatureBinning):
+    return np.uint8 if binning.max_bins <= 256 else np.uint16
+
+
+def _layout_reference(
+    X_reference: np.ndarray,
+    n_bins: int,
+    metadata_path: Path,
+):
+    names, types = load_feature_layout(metadata_path)
+    binning = build_layout_binning(X_reference, names, types, n_bins=n_bins)
+
+    return binning, binning.counts(X_reference)
+
+
+class _RingWindow(StreamingDriftMonitor):
+
+    def __init__(
+        self,
+        binning: FeatureBinning,
+        reference_counts: np.ndarray,
+        *,
+        capacity: int,
+    ) -> None:
+
+        super().__init__(binning, reference_counts)
+
+        self._ring = RingBuffer(
+            capacity,
+            (binning.n_features,),
+            dtype=_bin_dtype(binning),
+        )
+        self._offsets = np.arange(binning.n_features) * binning.max_bins
+
+    @property
+    def n_in_window(self) -> int:
+        return len(self._ring)
+
+    def _histogram(self, bins: np.ndarray) -> np.ndarray:
+
+        flat = (bins.astype(np.intp) + self._offsets).ravel()
+
+        return np.bincount(flat, minlength=self.counts.size).reshape(
+            self.counts.shape
+        )
+
+    def _add(self, bins: np.ndarray) -> np.ndarray:
+
+        evicted = self._ring.push(bins)
+        self.counts += self._histogram(bins)
+        self._subtract(evicted)
+
+        return evicted
+
+    def _subtract(self, bins: np.ndarray) -> None:
+        if len(bins):
+            self.counts -= self._histogram(bins)
+
+    def update(self, x: Sequence[float], **kwargs) -> None:
+        self.update_batch(np.asarray(x, dtype=np.float64)[None, :], **kwargs)
+
+    def reset(self) -> None:
+        super().reset()
+        self._ring.clear()
+
+
+# ============================================================
+# Windows
+# ============================================================
+
+class SlidingCountWindow(_RingWindow):
+
+    def __init__(
+        self,
+        binning: FeatureBinning,
+        reference_counts: np.ndarray,
+        *,
+        size: int,
+    ) -> None:
+        super().__init__(binning, reference_counts, capacity=size)
+
+    @classmethod
+    def from_reference(
+        cls,
+        X_reference: np.ndarray,
+        *,
+        size: int,
+        n_bins: int = DEFAULT_N_BINS,
+        metadata_path: Path = FEATURE_METADATA_PATH,
+    ) -> "SlidingCountWindow":
+        """Build from a preprocessed reference matrix (e.g. X_train)."""
+
+        binning, counts = _layout_reference(X_reference, n_bins, metadata_path)
+        return cls(binning, counts, size=size)
+
+    def update_batch(self, X: np.ndarray) -> None:
+
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return
+
+        # Rows older than the window size would be evicted immediately
+        self._add(self.binning.assign(X[-self._ring.capacity:]))
+        self.n_observed += len(X)
+
+
+class SlidingTimeWindow(_RingWindow):
+
+    def __init__(
+        self,
+        binning: FeatureBinning,
+        reference_counts: np.ndarray,
+        *,
+        horizon_seconds: float,
+        capacity: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+
+        super().__init__(binning, reference_counts, capacity=capacity)
+
+        self.horizon_seconds = horizon_seconds
+        self.clock = clock
+        self.n_overflow_evicted = 0
+
+        self._timestamps = RingBuffer(capacity, dtype=np.float64)
+        self._last_timestamp = -np.inf
+        self._event_time: Optional[float] = None
+
+    @classmethod
+    def from_reference(
+        cls,
+        X_reference: np.ndarray,
+        *,
+        horizon_seconds: float,
+        capacity: int,
+        n_bins: int = DEFAULT_N_BINS,
+        metadata_path: Path = FEATURE_METADATA_PATH,
+        clock: Callable[[], float] = time.time,
+    ) -> "SlidingTimeWindow":
+        """Build from a preprocessed reference matrix (e.g. X_train)."""
+
+        binning, counts = _layout_reference(X_reference, n_bins, metadata_path)
+        return cls(
+            binning,
+            counts,
+            horizon_seconds=horizon_seconds,
+            capacity=capacity,
+            clock=clock,
+        )
+
+    def _now(self) -> float:
+        return self.clock() if self._event_time is None else self._event_time
+
+    def expire(self, now: Optional[float] = None) -> int:
+
+        now = self._now() if now is None else now
+        n_expired = self._timestamps.count_below(now - self.horizon_seconds)
+
+        self._timestamps.pop(n_expired)
+        self._subtract(self._ring.pop(n_expired))
+
+        return n_expired
+
+    def update_batch(
+        self,
+        X: np.ndarray,
+        timestamps: Timestamps = None,
+    ) -> None:
+
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return
+
+        event_time = timestamps is not None
+        if timestamps is None:
+            timestamps = self.clock()
+        timestamps = np.broadcast_to(
+            np.asarray(timestamps, dtype=np.float64), (len(X),)
+        )
+
+        # Keep the ring sorted so expiry is a binary search
+        timestamps = np.maximum.accumulate(
+            np.maximum(timestamps, self._last_timestamp)
+        )
+        self._last_timestamp = timestamps[-1]
+        if event_time:
+            self._event_time = self._last_timestamp
+
+        n = len(X)
+        capacity = self._ring.capacity
+        X, timestamps = X[-capacity:], timestamps[-capacity:]
+
+        self.expire(self._last_timestamp)
+
+        self._timestamps.push(timestamps)
+        evicted = self._add(self.binning.assign(X))
+
+        self.n_overflow_evicted += len(evicted) + (n - len(X))
+        self.n_observed += n
+
+    def statistics(
+        self,
+        *,
+        epsilon: float = DEFAULT_EPSILON,
+        now: Optional[float] = None,
+    ) -> Dict[str, np.ndarray]:
+        self.expire(now)
+        return super().statistics(epsilon=epsilon)
+
+    def reset(self) -> None:
+        super().reset()
+        self._timestamps.clear()
+        self._last_timestamp = -np.inf
+        self._event_time = None
+
+
+class DecayedWindow(StreamingDriftMonitor):
+
+    def __init__(
+        self,
+        binning: FeatureBinning,
+        reference_counts: np.ndarray,
+        *,
+        half_life_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+
+        super().__init__(binning, reference_counts)
+
+        if half_life_seconds <= 0:
+            raise ValueError("half_life_seconds must be positive")
+
+        self.half_life_seconds = half_life_seconds
+        self.clock = clock
+        self.counts = np.zeros(self.reference_counts.shape, dtype=np.float64)
+        self._flat_counts = self.counts.reshape(-1)
+        self._timestamp: Optional[float] = None
+        self._event_time: Optional[float] = None
+
+    @classmethod
+    def from_reference(
+        cls,
+        X_reference: np.ndarray,
+        *,
+        half_life_seconds: float,
+        n_bins: int = DEFAULT_N_BINS,
+        metadata_path: Path = FEATURE_METADATA_PATH,
+        clock: Callable[[], float] = time.time,
+    ) -> "DecayedWindow":
+        """Build from a preprocessed reference matrix (e.g. X_train)."""
+
+        binning, counts = _layout_reference(X_reference, n_bins, metadata_path)
+        return cls(
+            binning,
+            counts,
+            half_life_seconds=half_life_seconds,
+            clock=clock,
+        )
+
+    @property
+    def effective_n(self) -> float:
+        return float(self.counts[0].sum())
+
+    def _now(self) -> float:
+        return self.clock() if self._event_time is None else self._event_time
+
+    def decay_to(self, now: Optional[float] = None) -> None:
+
+        now = self._now() if now is None else now
+        if self._timestamp is not None and now > self._timestamp:
+            elapsed = now - self._timestamp
+            self.counts *= 0.5 ** (elapsed / self.half_life_seconds)
+
+        if self._timestamp is None or now > self._timestamp:
+            self._timestamp = now
+
+    def update(self, x: Sequence[float], **kwargs) -> None:
+        self.update_batch(np.asarray(x, dtype=np.float64)[None, :], **kwargs)
+
+    def update_batch(
+        self,
+        X: np.ndarray,
+        timestamp: Optional[float] = None,
+    ) -> None:
+
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return
+
+        if timestamp is not None and (
+            self._event_time is None or timestamp > self._event_time
+        ):
+            self._event_time = timestamp
+
+        self.decay_to(timestamp)
+        self.counts += self.binning.counts(X)
+        self.n_observed += len(X)
+
+    def statistics(
+        self,
+        *,
+        epsilon: float = DEFAULT_EPSILON,
+        now: Optional[float] = None,
+    ) -> Dict[str, np.ndarray]:
+        self.decay_to(now)
+        return super().statistics(epsilon=epsilon)
+
+    def reset(self) -> None:
+        super().reset()
+        self._timestamp = None
+        self._event_time = None
@@ -0,0 +1,260 @@
+"""
+Self-contained training jobs.
+
+A TrainingSpec is a small picklable description of one training run, so
+it can be shipped to a worker process. The worker returns the fitted model
+and its validation results; writing or registering them happens in the
+caller. The training scripts, the retraining scheduler and
+train_candidates() all go through these same steps, so every path writes
+the same artifacts.
+
+train_candidates() trains several specs side by side on one shared copy of
+the feature matrices, with the host's threads split between them.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import multiprocessing
+
+import numpy as np
+
+from src.models.baseline import train_logistic_regression
+from src.models.artifacts import save_metrics, save_model
+from src.models.predictions import dataset_hash, evaluate_scores, store_scores
+from src.models.registry import register_model
+from src.models.tree_models import train_lightgbm, train_xgboost
+from src.monitoring.profile import build_score_profile, save_score_profile
+from src.utils.shared_arrays import (
+    attach_arrays,
+    shared_array_dir,
+    worker_arrays,
+)
+
+
+# ============================================================
+# Paths
+# ============================================================
+
+FEATURES_DIR = Path("artifacts/features")
+LABELS_DIR = Path("artifacts/labels")
+
+MODEL_TYPES = ("baseline", "lightgbm", "xgboost")
+
+
+# ============================================================
+# Job description
+# ============================================================
+
+@dataclass(frozen=True)
+class TrainingSpec:
+
+    model_type: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    n_jobs: int = 1
+    features_dir: Path = FEATURES_DIR
+    labels_dir: Path = LABELS_DIR
+
+    def __post_init__(self) -> None:
+        if self.model_type not in MODEL_TYPES:
+            raise ValueError(
+                f"Unsupported model type: {self.model_type} "
+                f"(expected one of {MODEL_TYPES})"
+            )
+
+
+@dataclass(frozen=True)
+class TrainingResult:
+
+    model: Any
+    metrics: Dict[str, float]
+    calibration: Dict[str, np.ndarray]
+    score_profile: Dict[str, Any]
+    n_train: int
+
+    # Validation scores, kept to seed the prediction cache
+    val_scores: np.ndarray
+    val_hash: str
+
+
+# ============================================================
+# Execution
+# ============================================================
+
+def load_training_data(spec: TrainingSpec):
+
+    X_train = np.load(spec.features_dir / "X_train.npy")
+    X_val = np.load(spec.features_dir / "X_val.npy")
+
+    y_train = np.load(spec.labels_dir / "y_train.npy", allow_pickle=True)
+    y_val = np.load(spec.labels_dir / "y_val.npy", allow_pickle=True)
+
+    return X_train, y_train.astype(int), X_val, y_val.astype(int)
+
+
+def fit_model(spec: TrainingSpec, X_train: np.ndarray, y_train: np.ndarray):
+
+    if spec.model_type == "baseline":
+        return train_logistic_regression(X_train, y_train, **spec.params)
+    if spec.model_type == "lightgbm":
+        return train_lightgbm(
+            X_train, y_train, n_jobs=spec.n_jobs, **spec.params
+        )
+
+    return train_xgboost(X_train, y_train, n_jobs=spec.n_jobs, **spec.params)
+
+
+def evaluate_model(
+    model,
+    X_val: np.ndarray,
+    y_val: np.ndarray,
+    *,
+    n_train: int,
+) -> TrainingResult:
+
+    scores = model.predict_proba(X_val)[:, 1]
+    evaluation = evaluate_scores(y_val, scores)
+
+    return TrainingResult(
+        model=model,
+        metrics=evaluation.metrics,
+        calibration=evaluation.calibration,
+        score_profile=build_score_profile(scores),
+        n_train=n_train,
+        val_scores=scores,
+        val_hash=dataset_hash(X_val),
+    )
+
+
+def run_training_job(spec: TrainingSpec) -> TrainingResult:
+
+    X_train, y_train, X_val, y_val = load_training_data(spec)
+
+    model = fit_model(spec, X_train, y_train)
+
+    return evaluate_model(model, X_val, y_val, n_train=len(X_train))
+
+
+def run_shared_training_job(spec: TrainingSpec) -> TrainingResult:
+    """Like run_training_job, on arrays shared by the parent process."""
+
+    arrays = worker_arrays()
+    model = fit_model(spec, arrays["X_train"], arrays["y_train"])
+
+    return evaluate_model(
+        model,
+        arrays["X_val"],
+        arrays["y_val"],
+        n_train=len(arrays["X_train"]),
+    )
+
+
+# ============================================================
+# Artifacts
+# ============================================================
+
+def _save_score_artifacts(result: TrainingResult, model_dir: Path) -> None:
+
+    save_score_profile(result.score_profile, model_dir / "score_profile.json")
+    store_scores(
+        model_dir / "model.joblib",
+        result.val_scores,
+        data_hash=result.val_hash,
+    )
+
+
+def save_training_artifacts(result: TrainingResult, model_dir: Path) -> None:
+    """Write model, metrics, calibration and score profile to model_dir."""
+
+    model_dir.mkdir(parents=True, exist_ok=True)
+
+    save_model(result.model, model_dir / "model.joblib")
+    save_metrics(result.metrics, model_dir / "metrics.json")
+    np.savez(model_dir / "calibration.npz", **result.calibration)
+    _save_score_artifacts(result, model_dir)
+
+
+def register_training_result(
+    result: TrainingResult,
+    *,
+    model_name: str,
+    version: str,
+    preprocessor: Any,
+    metadata: Dict[str, Any],
+    path: Optional[Path] = None,
+) -> Path:
+    """
+    Register result as model_name/version, with its score profile. A path
+    writes it there instead, to be moved into place by publish_version.
+    """
+
+    path = register_model(
+        model_name=model_name,
+        version=version,
+        model=result.model,
+        preprocessor=preprocessor,
+        metrics=result.metrics,
+        calibration=result.calibration,
+        metadata=metadata,
+        path=path,
+    )
+    _save_score_artifacts(result, path)
+
+    return path
+
+
+# ============================================================
+# Concurrent candidates
+# ============================================================
+
+def split_threads(model_types: Sequence[str], n_cpus: int) -> Dict[str, int]:
+    """
+    Divide n_cpus between concurrently trained models. The baseline
+    (liblinear) is single-threaded; tree models share the rest evenly.
+    """
+
+    threads = {model_type: 1 for model_type in model_types}
+
+    trees = [t for t in model_types if t != "baseline"]
+    n_free = max(len(trees), n_cpus - (len(model_types) - len(trees)))
+    for i, model_type in enumerate(trees):
+        threads[model_type] = n_free // len(trees) + (i < n_free % len(trees))
+
+    return threads
+
+
+def train_candidates(
+    specs: Sequence[TrainingSpec],
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_val: np.ndarray,
+    y_val: np.ndarray,
+) -> Dict[str, TrainingResult]:
+    """Train every spec at once, one spawned worker process per model."""
+
+    arrays = {
+        "X_train": np.asarray(X_train, dtype=np.float64),
+        "y_train": np.asarray(y_train).astype(np.int64),
+        "X_val": np.asarray(X_val, dtype=np.float64),
+        "y_val": np.asarray(y_val).astype(np.int64),
+    }
+
+    with shared_array_dir(arrays, prefix="candidates-") as scratch_dir:
+        with ProcessPoolExecutor(
+            max_workers=len(specs),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=attach_arrays,
+            initargs=(str(scratch_dir),),
+        ) as executor:
+            futures = {
+                spec.model_type: executor.submit(
+                    run_shared_training_job, spec
+                )
+                for spec in specs
+            }
+            return {
+                model_type: future.result()
+                for model_type, future in futures.items()
+            }
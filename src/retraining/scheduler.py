@@ -0,0 +1,400 @@
+"""
+Drift-triggered retraining scheduler.
+
+Watches drift scores (e.g. from StreamingDriftMonitor.report() or
+ScoreDriftMonitor.report()) and starts retraining when drift stays above a
+threshold for a debounce period, at most once per cooldown. Training runs
+in a separate process pool whose workers are pinned to a share of the
+host's CPUs at lowered priority, so serving in the parent process is never
+blocked or starved; observe() itself only compares timestamps.
+
+At most max_queued jobs are running. A trigger arriving while the queue is
+full is dropped and leaves the running jobs alone; an accepted one
+supersedes older jobs: queued ones are cancelled, running ones finish but
+their result is discarded, as is that of a finished job still writing
+its artifacts. Completed jobs are written to a staging directory and
+published under a reserved version with one rename; the scheduler lock is
+held only to reserve the version and to publish.
+"""
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+
+import joblib
+
+from src.models.registry import (
+    next_patch_version,
+    publish_version,
+    staging_dir,
+)
+from src.retraining.jobs import (
+    TrainingResult,
+    TrainingSpec,
+    register_training_result,
+    run_training_job,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Policy
+# ============================================================
+
+@dataclass(frozen=True)
+class RetrainPolicy:
+
+    # Drift score (max PSI over features by default) that counts as drift
+    threshold: float = 0.2
+
+    # Drift must persist this long before a job is started
+    debounce_seconds: float = 15 * 60
+
+    # Minimum time between two submitted jobs
+    cooldown_seconds: float = 6 * 3600
+
+    # Outstanding (queued or running) jobs, superseded ones included
+    max_queued: int = 2
+
+    max_workers: int = 1
+
+    # Fraction of the host CPUs training workers may use
+    cpu_share: float = 0.25
+
+    niceness: int = 10
+
+
+# ============================================================
+# Jobs
+# ============================================================
+
+PENDING = "pending"
+RUNNING = "running"
+REGISTERED = "registered"
+FAILED = "failed"
+CANCELLED = "cancelled"
+SUPERSEDED = "superseded"
+
+
+@dataclass
+class RetrainJob:
+
+    job_id: int
+    model_name: str
+    reason: Dict[str, Any]
+    submitted_at: float
+    future: Future = field(repr=False)
+    superseded: bool = False
+    version: Optional[str] = None
+    path: Optional[Path] = None
+    error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+
+        if self.future.cancelled():
+            return CANCELLED
+        if not self.future.done():
+            if self.superseded:
+                return SUPERSEDED
+            return RUNNING if self.future.running() else PENDING
+        if self.superseded:
+            return SUPERSEDED
+        if self.error is not None:
+            return FAILED
+
+        return REGISTERED if self.path is not None else RUNNING
+
+
+# ============================================================
+# Helpers
+# ============================================================
+
+def drift_score(
+    report: Mapping[str, Any],
+    *,
+    metric: str = "psi",
+) -> float:
+    """Max of a metric over a per-feature report, or a flat report's value."""
+
+    if metric in report:
+        return float(report[metric])
+
+    return max(float(stats[metric]) for stats in report.values())
+
+
+def worker_cpus(cpu_share: float) -> List[int]:
+    """The last cpu_share of this process's CPUs (at least one)."""
+
+    if not 0 < cpu_share <= 1:
+        raise ValueError(f"cpu_share must be in (0, 1], got {cpu_share}")
+
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = list(range(os.cpu_count() or 1))
+
+    n = max(1, int(len(cpus) * cpu_share))
+
+    return cpus[-n:]
+
+
+def _limit_worker(cpus: List[int], niceness: int) -> None:
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    if niceness:
+        os.nice(niceness)
+
+
+# ============================================================
+# Scheduler
+# ============================================================
+
+class RetrainingScheduler:
+
+    def __init__(
+        self,
+        *,
+        model_name: str,
+        spec: TrainingSpec,
+        policy: RetrainPolicy = RetrainPolicy(),
+        clock: Callable[[], float] = time.time,
+        executor: Optional[Executor] = None,
+        on_registered: Optional[Callable[[RetrainJob], None]] = None,
+    ) -> None:
+
+        self.model_name = model_name
+        self.policy = policy
+        self.clock = clock
+        self.on_registered = on_registered
+
+        cpus = worker_cpus(policy.cpu_share)
+        self.spec = replace(
+            spec,
+            n_jobs=max(1, len(cpus) // policy.max_workers),
+        )
+
+        if executor is None:
+            # Spawn, not fork: the serving parent may hold threads and locks
+            executor = ProcessPoolExecutor(
+                max_workers=policy.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_limit_worker,
+                initargs=(cpus, policy.niceness),
+            )
+        self.executor = executor
+
+        self.jobs: List[RetrainJob] = []
+        self._breach_started: Optional[float] = None
+        self._last_submitted: Optional[float] = None
+
+        # Versions reserved by jobs whose artifacts are being written
+        self._registering: Dict[str, RetrainJob] = {}
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # Signals
+    # --------------------------------------------------------
+
+    def observe(
+        self,
+        score: float,
+        *,
+        now: Optional[float] = None,
+    ) -> Optional[RetrainJob]:
+
+        now = self.clock() if now is None else now
+        policy = self.policy
+
+        if score < policy.threshold:
+            self._breach_started = None
+            return None
+
+        if self._breach_started is None:
+            self._breach_started = now
+        if now - self._breach_started < policy.debounce_seconds:
+            return None
+        if (
+            self._last_submitted is not None
+            and now - self._last_submitted < policy.cooldown_seconds
+        ):
+            return None
+
+        return self.submit(
+            reason={
+                "drift_score": score,
+                "threshold": policy.threshold,
+                "breach_started": self._breach_started,
+            },
+            now=now,
+        )
+
+    def observe_report(
+        self,
+        report: Mapping[str, Any],
+        *,
+        metric: str = "psi",
+        now: Optional[float] = None,
+    ) -> Optional[RetrainJob]:
+        return self.observe(drift_score(report, metric=metric), now=now)
+
+    # --------------------------------------------------------
+    # Jobs
+    # --------------------------------------------------------
+
+    @property
+    def active_jobs(self) -> List[RetrainJob]:
+        with self._lock:
+            return [job for job in self.jobs if not job.future.done()]
+
+    def submit(
+        self,
+        *,
+        reason: Dict[str, Any],
+        now: Optional[float] = None,
+    ) -> Optional[RetrainJob]:
+
+        now = self.clock() if now is None else now
+
+        with self._lock:
+            active = [job for job in self.jobs if not job.future.done()]
+
+            # Admit first: running jobs cannot be cancelled, and a dropped
+            # trigger must not throw away their results
+            running = sum(job.future.running() for job in active)
+            if running >= self.policy.max_queued:
+                logger.warning(
+                    "Retraining queue full (%d running); trigger dropped",
+                    running,
+                )
+                return None
+
+            # Newer data supersedes every outstanding job, including
+            # finished ones still writing their artifacts
+            for job in active:
+                job.superseded = True
+                job.future.cancel()
+            for job in self._registering.values():
+                job.superseded = True
+
+            job = RetrainJob(
+                job_id=len(self.jobs) + 1,
+                model_name=self.model_name,
+                reason=reason,
+                submitted_at=now,
+                future=self.executor.submit(run_training_job, self.spec),
+            )
+            self.jobs.append(job)
+            self._last_submitted = now
+
+        job.future.add_done_callback(lambda _: self._on_done(job))
+        logger.info("Submitted retraining job %d: %s", job.job_id, reason)
+
+        return job
+
+    def _on_done(self, job: RetrainJob) -> None:
+
+        if job.future.cancelled():
+            return
+
+        error = job.future.exception()
+        if error is not None:
+            job.error = repr(error)
+            logger.error("Retraining job %d failed: %s", job.job_id, error)
+            return
+
+        try:
+            registered = self._register(job, job.future.result())
+        except Exception as e:
+            job.error = repr(e)
+            logger.error("Registering job %d failed: %s", job.job_id, e)
+            return
+
+        if not registered:
+            logger.info("Discarded superseded job %d", job.job_id)
+        elif self.on_registered is not None:
+            self.on_registered(job)
+
+    def _register(self, job: RetrainJob, result: TrainingResult) -> bool:
+
+        features_dir = self.spec.features_dir
+        preprocessor = joblib.load(features_dir / "preprocessor.joblib")
+        with open(features_dir / "feature_metadata.json", "r") as f:
+            feature_metadata = json.load(f)
+
+        metadata = {
+            "training_data": {
+                "source": "openml_credit_default",
+                "end_index": result.n_train,
+            },
+            "feature_contract": {
+                "version": feature_metadata["version"],
+                "n_features": feature_metadata["n_features"],
+            },
+            "hyperparameters": result.model.get_params(),
+            "retraining": {
+                "job_id": job.job_id,
+                "submitted_at": job.submitted_at,
+                "reason": job.reason,
+            },
+        }
+
+        # The lock only reserves the version: artifacts are written
+        # outside it, so submit() and observe() never wait on the disk
+        with self._lock:
+            if job.superseded:
+                return False
+            version = next_patch_version(
+                self.model_name,
+                reserved=self._registering,
+            )
+            self._registering[version] = job
+
+        staged = staging_dir(self.model_name, version)
+        try:
+            register_training_result(
+                result,
+                model_name=self.model_name,
+                version=version,
+                preprocessor=preprocessor,
+                metadata=metadata,
+                path=staged,
+            )
+
+            with self._lock:
+                if job.superseded:
+                    return False
+                job.path = publish_version(
+                    staged,
+                    model_name=self.model_name,
+                    version=version,
+                )
+                job.version = version
+        finally:
+            shutil.rmtree(staged, ignore_errors=True)
+            with self._lock:
+                del self._registering[version]
+
+        logger.info("Registered %s %s", self.model_name, job.version)
+
+        return True
+
+    def shutdown(
+        self,
+        *,
+        wait: bool = True,
+        cancel_pending: bool = False,
+    ) -> None:
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_pending)
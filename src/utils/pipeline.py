@@ -0,0 +1,391 @@
+"""
+Content-addressed stage cache and pipeline runner.
+
+A stage is a command with declared inputs, outputs, parameters and code
+files. Its fingerprint hashes the content of all of them, so it changes
+exactly when something that can affect the outputs changes. After a stage
+runs, its outputs are copied into the cache under that fingerprint; when
+the same fingerprint comes up again the stage is skipped, and its outputs
+are restored from the cache if the working tree holds other versions.
+
+Stages whose dependencies are done run concurrently, each as its own
+process with the host's threads split between them.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Defaults
+# ============================================================
+
+STAGE_CACHE_DIR = Path("artifacts/cache/stages")
+
+HASH_MEMO_NAME = "hashes.json"
+ENTRY_MANIFEST = "stage.json"
+
+CACHED = "cached"
+RESTORED = "restored"
+RAN = "ran"
+
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+# ============================================================
+# Stages
+# ============================================================
+
+@dataclass(frozen=True)
+class Stage:
+
+    name: str
+    command: List[str]
+
+    # Files or directories read (inputs) and written (outputs)
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+
+    # Glob patterns of the code the stage runs
+    code: List[str] = field(default_factory=list)
+
+    params: Dict[str, Any] = field(default_factory=dict)
+    deps: List[str] = field(default_factory=list)
+
+
+def _expand(patterns: Iterable[str]) -> List[Path]:
+
+    paths = set()
+    for pattern in patterns:
+        matches = list(Path().glob(pattern))
+        if not matches:
+            raise FileNotFoundError(f"No files match: {pattern}")
+        paths.update(matches)
+
+    return sorted(paths)
+
+
+def _files(path: Path) -> List[Path]:
+
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if p.is_file())
+    return [path]
+
+
+# ============================================================
+# Cache
+# ============================================================
+
+class StageCache:
+
+    def __init__(self, root: Path = STAGE_CACHE_DIR) -> None:
+
+        self.root = root
+        self._memo_path = root / HASH_MEMO_NAME
+        self._memo: Dict[str, Tuple[int, int, str]] = {}
+        if self._memo_path.exists():
+            with open(self._memo_path, "r") as f:
+                self._memo = {k: tuple(v) for k, v in json.load(f).items()}
+
+    # --------------------------------------------------------
+    # Hashing
+    # --------------------------------------------------------
+
+    def file_hash(self, path: Path) -> str:
+        """sha256 of a file, memoized on (size, mtime)."""
+
+        stat = path.stat()
+        key = str(path.resolve())
+        memo = self._memo.get(key)
+        if memo is not None and memo[:2] == (stat.st_size, stat.st_mtime_ns):
+            return memo[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+
+        self._memo[key] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+        return digest.hexdigest()
+
+    def tree_hashes(self, paths: Sequence[str]) -> Dict[str, str]:
+        """{file: sha256} for every file under the given paths."""
+
+        return {
+            str(file): self.file_hash(file)
+            for path in paths
+            for file in _files(Path(path))
+        }
+
+    def fingerprint(self, stage: Stage) -> str:
+
+        missing = [p for p in stage.inputs if not Path(p).exists()]
+        if missing:
+            raise FileNotFoundError(
+                f"Stage {stage.name} is missing inputs: {missing}"
+            )
+
+        payload = {
+            "stage": stage.name,
+            "command": stage.command,
+            "params": stage.params,
+            "inputs": self.tree_hashes(stage.inputs),
+            "code": {
+                str(path): self.file_hash(path)
+                for path in _expand(stage.code)
+            },
+        }
+        serialized = json.dumps(payload, sort_keys=True, default=str)
+
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:20]
+
+    def save_memo(self) -> None:
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._memo_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._memo, f)
+        os.replace(tmp_path, self._memo_path)
+
+    # --------------------------------------------------------
+    # Entries
+    # --------------------------------------------------------
+
+    def entry_dir(self, stage: Stage, fingerprint: str) -> Path:
+        return self.root / stage.name / fingerprint
+
+    def load_entry(
+        self,
+        stage: Stage,
+        fingerprint: str,
+    ) -> Optional[Dict[str, Any]]:
+
+        manifest_path = self.entry_dir(stage, fingerprint) / ENTRY_MANIFEST
+        if not manifest_path.exists():
+            return None
+
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+
+    def outputs_match(self, entry: Dict[str, Any]) -> bool:
+
+        for file, digest in entry["outputs"].items():
+            path = Path(file)
+            if not path.is_file() or self.file_hash(path) != digest:
+                return False
+        return True
+
+    def store(self, stage: Stage, fingerprint: str) -> Path:
+        """Copy a stage's fresh outputs into the cache."""
+
+        missing = [p for p in stage.outputs if not Path(p).exists()]
+        if missing:
+            raise FileNotFoundError(
+                f"Stage {stage.name} did not write outputs: {missing}"
+            )
+
+        entry_dir = self.entry_dir(stage, fingerprint)
+        tmp_dir = entry_dir.with_name(f"{fingerprint}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        outputs = self.tree_hashes(stage.outputs)
+        for file in outputs:
+            target = tmp_dir / "files" / file
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(file, target)
+
+        with open(tmp_dir / ENTRY_MANIFEST, "w") as f:
+            json.dump(
+                {
+                    "stage": stage.name,
+                    "fingerprint": fingerprint,
+                    "command": stage.command,
+                    "params": stage.params,
+                    "outputs": outputs,
+                    "created_at": datetime.utcnow().isoformat() + "Z",
+                },
+                f,
+                indent=2,
+            )
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+
+        return entry_dir
+
+    def restore(self, stage: Stage, entry: Dict[str, Any]) -> None:
+
+        # Stale files from another version must not linger in output dirs
+        for output in stage.outputs:
+            path = Path(output)
+            if path.is_dir():
+                shutil.rmtree(path)
+
+        files_dir = self.entry_dir(stage, entry["fingerprint"]) / "files"
+        for file in entry["outputs"]:
+            target = Path(file)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(files_dir / file, target)
+
+
+# ============================================================
+# Runner
+# ============================================================
+
+def stage_order(stages: Sequence[Stage]) -> List[Stage]:
+    """Topological order; raises on unknown or cyclic dependencies."""
+
+    by_name = {stage.name: stage for stage in stages}
+    ordered: List[Stage] = []
+    state: Dict[str, str] = {}
+
+    def visit(name: str) -> None:
+        if name not in by_name:
+            raise ValueError(f"Unknown stage dependency: {name}")
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Dependency cycle through stage: {name}")
+
+        state[name] = "visiting"
+        for dep in by_name[name].deps:
+            visit(dep)
+        state[name] = "done"
+        ordered.append(by_name[name])
+
+    for stage in stages:
+        visit(stage.name)
+
+    return ordered
+
+
+def _run_command(stage: Stage, n_threads: int) -> None:
+
+    env = {
+        **os.environ,
+        "OMP_NUM_THREADS": str(n_threads),
+        "OPENBLAS_NUM_THREADS": str(n_threads),
+        "MKL_NUM_THREADS": str(n_threads),
+    }
+    command = [
+        sys.executable if part == "{python}" else part
+        for part in stage.command
+    ]
+
+    result = subprocess.run(
+        command,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"Stage {stage.name} failed (exit {result.returncode}):\n"
+            f"{result.stdout[-2000:]}"
+        )
+
+
+def run_pipeline(
+    stages: Sequence[Stage],
+    *,
+    cache: Optional[StageCache] = None,
+    max_parallel: Optional[int] = None,
+    n_cpus: Optional[int] = None,
+    force: Sequence[str] = (),
+) -> Dict[str, str]:
+    """
+    Run stages in dependency order, skipping or restoring cached ones.
+    Returns {stage name: "cached" | "restored" | "ran"}.
+
+    Fingerprints, cache lookups and stores happen on the calling thread;
+    worker threads only wait on stage processes.
+    """
+
+    cache = cache or StageCache()
+    ordered = stage_order(stages)
+    n_cpus = n_cpus or os.cpu_count() or 1
+    max_parallel = max_parallel or n_cpus
+
+    status: Dict[str, str] = {}
+    fingerprints: Dict[str, str] = {}
+    running: Dict[Future, Stage] = {}
+
+    def ready() -> List[Stage]:
+        busy = {stage.name for stage in running.values()}
+        return [
+            stage for stage in ordered
+            if stage.name not in status
+            and stage.name not in busy
+            and all(dep in status for dep in stage.deps)
+        ]
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        try:
+            while len(status) < len(ordered):
+                to_run = []
+                for stage in ready():
+                    fingerprint = cache.fingerprint(stage)
+                    fingerprints[stage.name] = fingerprint
+                    entry = cache.load_entry(stage, fingerprint)
+
+                    if entry is not None and stage.name not in force:
+                        if cache.outputs_match(entry):
+                            status[stage.name] = CACHED
+                        else:
+                            cache.restore(stage, entry)
+                            status[stage.name] = RESTORED
+                        logger.info(
+                            "%s: %s (%s)",
+                            stage.name,
+                            status[stage.name],
+                            fingerprint,
+                        )
+                    else:
+                        to_run.append(stage)
+
+                if to_run:
+                    # Split threads across everything running at once
+                    n_threads = max(
+                        1, n_cpus // min(max_parallel, len(to_run))
+                    )
+                    for stage in to_run:
+                        logger.info("%s: running", stage.name)
+                        running[
+                            executor.submit(_run_command, stage, n_threads)
+                        ] = stage
+
+                if not running:
+                    # Only cached stages were ready; look again
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    future.result()
+                    cache.store(stage, fingerprints[stage.name])
+                    status[stage.name] = RAN
+                    logger.info(
+                        "%s: ran (%s)",
+                        stage.name,
+                        fingerprints[stage.name],
+                    )
+        finally:
+            cache.save_memo()
+
+    return status
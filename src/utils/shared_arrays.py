@@ -0,0 +1,51 @@
+"""
+Read-only arrays shared with worker processes through memory mapping.
+
+The parent writes each array once as .npy into a RAM-backed scratch
+directory; workers memory-map them when they start. All workers then read
+the same physical pages instead of receiving pickled copies.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Mapping
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+# tmpfs keeps the shared arrays in RAM; fall back to the default tempdir
+_SCRATCH_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+_worker_arrays: Dict[str, np.ndarray] = {}
+
+
+@contextmanager
+def shared_array_dir(
+    arrays: Mapping[str, np.ndarray],
+    *,
+    prefix: str = "shared-",
+) -> Iterator[Path]:
+
+    scratch_dir = Path(tempfile.mkdtemp(prefix=prefix, dir=_SCRATCH_ROOT))
+
+    try:
+        for name, array in arrays.items():
+            np.save(scratch_dir / f"{name}.npy", array)
+        yield scratch_dir
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def attach_arrays(scratch_dir: str) -> None:
+    """Worker initializer: memory-map every array in scratch_dir."""
+
+    for path in Path(scratch_dir).glob("*.npy"):
+        _worker_arrays[path.stem] = np.load(path, mmap_mode="r")
+
+
+def worker_arrays() -> Dict[str, np.ndarray]:
+    return _worker_arrays
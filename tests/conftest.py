@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import pytest
+
+import src.data.split as split
+from src.data.load import load_openml_credit_default
+from src.models.registry import load_model
+
+
+RAW_ARFF = Path("data/raw/openml_credit_default/credit_default.arff")
+
+
+@pytest.fixture(scope="session")
+def splits_dir(tmp_path_factory):
+    """Split snapshot of the raw data, as scripts/ingest_data.py writes it."""
+
+    root = tmp_path_factory.mktemp("ingest")
+    df = load_openml_credit_default(RAW_ARFF, cache_dir=root / "cache")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(split, "LABELS_OUTPUT_DIR", root / "labels")
+        split.temporal_split(df, root / "splits")
+
+    return root / "splits"
+
+
+@pytest.fixture(scope="module")
+def registered():
+    """The registered LightGBM reference version and its preprocessor."""
+
+    return load_model(model_name="lightgbm", version="v1.1.0")
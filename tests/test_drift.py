@@ -0,0 +1,325 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from src.data.split import load_split_matrix
+from src.features.contracts import ALL_FEATURES
+from src.monitoring.batch_drift import (
+    build_drift_reference,
+    compute_drift,
+    compute_drift_windows,
+    load_drift_reference,
+    load_feature_layout,
+    save_drift_reference,
+)
+from src.monitoring.drift import StreamingDriftMonitor
+from src.monitoring.metrics import binned_ks, js_divergence, psi
+from src.monitoring.profile import (
+    build_reference_profile,
+    load_reference_profile,
+    save_reference_profile,
+)
+
+
+FEATURES_DIR = "artifacts/features"
+
+
+@pytest.fixture(scope="module")
+def train_matrix(splits_dir):
+    return load_split_matrix(splits_dir, "train", ALL_FEATURES)
+
+
+@pytest.fixture(scope="module")
+def test_matrix(splits_dir):
+    return load_split_matrix(splits_dir, "test", ALL_FEATURES)
+
+
+def test_metrics_are_zero_for_identical_histograms():
+    counts = np.array([[10, 20, 30, 0], [5, 5, 0, 0]])
+
+    np.testing.assert_allclose(psi(counts, counts), 0.0)
+    np.testing.assert_allclose(js_divergence(counts, counts), 0.0)
+    np.testing.assert_allclose(binned_ks(counts, counts), 0.0)
+
+
+def test_metrics_detect_shift():
+    reference = np.array([[50, 50, 0]])
+    current = np.array([[0, 50, 50]])
+
+    assert psi(reference, current)[0] > 1.0
+    assert binned_ks(reference, current)[0] == pytest.approx(0.5)
+    assert js_divergence(reference, current)[0] <= np.log(2)
+
+
+def test_row_and_batch_updates_agree(train_matrix, test_matrix):
+    batched = StreamingDriftMonitor.from_reference(train_matrix)
+    per_row = StreamingDriftMonitor.from_reference(train_matrix)
+
+    batched.update_batch(test_matrix[:500])
+    for row in test_matrix[:500].tolist():
+        per_row.update(row)
+
+    np.testing.assert_array_equal(batched.counts, per_row.counts)
+    assert batched.n_observed == per_row.n_observed == 500
+
+
+def test_reference_against_itself_has_no_drift(train_matrix):
+    monitor = StreamingDriftMonitor.from_reference(train_matrix)
+    monitor.update_batch(train_matrix)
+
+    report = monitor.report()
+    assert set(report) == set(ALL_FEATURES)
+    assert max(stats["psi"] for stats in report.values()) < 1e-9
+
+
+def test_unknown_codes_fall_into_overflow_bin(train_matrix):
+    monitor = StreamingDriftMonitor.from_reference(train_matrix)
+    row = train_matrix[0].copy()
+    row[ALL_FEATURES.index("EDUCATION")] = 42.0
+
+    monitor.update(row.tolist())
+
+    j = ALL_FEATURES.index("EDUCATION")
+    n_bins = monitor.binning.n_bins[j]
+    assert monitor.counts[j, n_bins - 1] == 1
+
+
+def test_reference_profile_roundtrip(tmp_path, train_matrix, test_matrix):
+    profile = build_reference_profile(train_matrix, feature_version="abc")
+    path = tmp_path / "reference_profile.json"
+    save_reference_profile(profile, path)
+
+    loaded = load_reference_profile(path, expected_feature_version="abc")
+    from_profile = StreamingDriftMonitor.from_profile(loaded)
+    from_data = StreamingDriftMonitor.from_reference(train_matrix)
+
+    from_profile.update_batch(test_matrix)
+    from_data.update_batch(test_matrix)
+
+    assert from_profile.report() == from_data.report()
+    np.testing.assert_allclose(loaded.means, train_matrix.mean(axis=0))
+
+    with pytest.raises(ValueError):
+        load_reference_profile(path, expected_feature_version="other")
+
+
+def test_reference_profile_frequencies_include_unknown_codes(train_matrix):
+    X = train_matrix.copy()
+    X[:10, ALL_FEATURES.index("PAY_0")] = np.nan
+
+    entry = build_reference_profile(X, feature_version="abc").to_dict()
+    frequencies = entry["features"]["PAY_0"]["frequencies"]
+
+    assert frequencies["__unknown__"] == pytest.approx(10 / len(X))
+    assert sum(frequencies.values()) == pytest.approx(1.0)
+
+
+@pytest.fixture(scope="module")
+def drift_reference():
+    names, types = load_feature_layout()
+    return build_drift_reference(
+        np.load(f"{FEATURES_DIR}/X_val.npy"), names, types
+    )
+
+
+def test_vectorized_ks_matches_scipy(drift_reference):
+    X_ref = np.load(f"{FEATURES_DIR}/X_val.npy")
+    X_cur = np.load(f"{FEATURES_DIR}/X_test.npy")
+    windows = [X_cur[:250], X_cur[250:1000], X_cur[1000:1007]]
+
+    result = compute_drift_windows(drift_reference, windows)
+
+    expected = np.array([
+        [stats.ks_2samp(X_ref[:, j], w[:, j]).statistic for j in range(33)]
+        for w in windows
+    ])
+    assert result["ks"].shape == (3, 33)
+    np.testing.assert_allclose(result["ks"], expected, atol=1e-12)
+
+
+def test_discrete_chi_square_matches_scipy(drift_reference, tmp_path):
+    X_ref = np.load(f"{FEATURES_DIR}/X_val.npy")
+    X_cur = np.load(f"{FEATURES_DIR}/X_test.npy")
+
+    path = tmp_path / "drift_reference.npz"
+    save_drift_reference(drift_reference, path)
+    result = compute_drift(load_drift_reference(path), X_cur)
+
+    j = drift_reference.discrete_idx[-1]
+    codes = np.union1d(X_ref[:, j], X_cur[:, j])
+    table = [[np.sum(X[:, j] == c) for c in codes] for X in (X_ref, X_cur)]
+    chi2, p_value = stats.chi2_contingency(table, correction=False)[:2]
+
+    assert result["chi2"][j] == pytest.approx(chi2)
+    assert result["chi2_pvalue"][j] == pytest.approx(p_value)
+    assert np.isnan(result["psi"][0])
+    assert (result["psi"][drift_reference.discrete_idx] >= 0).all()
+
+
+def test_ring_buffer_wraps_and_evicts_oldest():
+    from src.monitoring.windows import RingBuffer
+
+    ring = RingBuffer(4)
+    assert len(ring.push(np.arange(3.0))) == 0
+    np.testing.assert_array_equal(ring.push(np.array([3.0, 4.0])), [0.0])
+    assert ring.count_below(3.5) == 3
+    np.testing.assert_array_equal(ring.pop(2), [1.0, 2.0])
+    assert len(ring) == 2
+
+
+def test_sliding_windows_match_recomputed_histograms():
+    from src.monitoring.windows import SlidingCountWindow, SlidingTimeWindow
+
+    X_ref = np.load(f"{FEATURES_DIR}/X_val.npy")
+    X_cur = np.load(f"{FEATURES_DIR}/X_test.npy")
+
+    count_window = SlidingCountWindow.from_reference(X_ref, size=1000)
+    for start in range(0, len(X_cur), 333):
+        count_window.update_batch(X_cur[start:start + 333])
+
+    np.testing.assert_array_equal(
+        count_window.counts, count_window.binning.counts(X_cur[-1000:])
+    )
+
+    now = [0.0]
+    time_window = SlidingTimeWindow.from_reference(
+        X_ref, horizon_seconds=10, capacity=5000, clock=lambda: now[0]
+    )
+    for second in range(45):
+        now[0] = float(second)
+        time_window.update_batch(X_cur[second * 100:(second + 1) * 100])
+
+    time_window.statistics()
+    np.testing.assert_array_equal(
+        time_window.counts, time_window.binning.counts(X_cur[3400:4500])
+    )
+
+
+def test_decayed_window_halves_weight_per_half_life():
+    from src.monitoring.windows import DecayedWindow
+
+    X_ref = np.load(f"{FEATURES_DIR}/X_val.npy")
+    now = [0.0]
+    window = DecayedWindow.from_reference(
+        X_ref, half_life_seconds=60, clock=lambda: now[0]
+    )
+
+    window.update_batch(X_ref[:100])
+    now[0] = 60.0
+    window.update_batch(X_ref[100:200])
+
+    assert window.effective_n == pytest.approx(150.0)
+
+
+def test_windows_replaying_past_events_use_event_time():
+    from src.monitoring.windows import DecayedWindow, SlidingTimeWindow
+
+    X_ref = np.load(f"{FEATURES_DIR}/X_val.npy")
+    X_cur = np.load(f"{FEATURES_DIR}/X_test.npy")
+
+    # Events from long ago, read against the real wall clock
+    time_window = SlidingTimeWindow.from_reference(
+        X_ref, horizon_seconds=10, capacity=5000
+    )
+    for second in range(45):
+        time_window.update_batch(
+            X_cur[second * 100:(second + 1) * 100],
+            timestamps=1000.0 + second,
+        )
+
+    time_window.statistics()
+    np.testing.assert_array_equal(
+        time_window.counts, time_window.binning.counts(X_cur[3400:4500])
+    )
+
+    decayed = DecayedWindow.from_reference(X_ref, half_life_seconds=60)
+    decayed.update_batch(X_ref[:100], timestamp=1000.0)
+    decayed.update_batch(X_ref[100:200], timestamp=1060.0)
+
+    decayed.statistics()
+    assert decayed.effective_n == pytest.approx(150.0)
+
+    decayed.statistics(now=1120.0)
+    assert decayed.effective_n == pytest.approx(75.0)
+
+
+def test_kll_sketch_rank_error_is_bounded():
+    from src.monitoring.sketches import KLLSketch
+
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=200_000)
+
+    parts = [KLLSketch(200, seed=i) for i in range(4)]
+    for i, part in enumerate(parts):
+        part.update_batch(values[i::4])
+    for part in parts[1:]:
+        parts[0].merge(part)
+
+    levels = np.linspace(0.01, 0.99, 99)
+    estimates = parts[0].quantiles(levels)
+    ranks = np.searchsorted(np.sort(values), estimates) / len(values)
+
+    assert parts[0].n == len(values)
+    assert np.abs(ranks - levels).max() < 0.02
+
+
+def test_merged_drift_sketches_match_single_pass(train_matrix, tmp_path):
+    from src.monitoring.sketches import DriftSketch, merge_sketches
+
+    profile = build_reference_profile(train_matrix, feature_version="test")
+    binning = profile.binning
+    X = train_matrix[:6000]
+
+    for hour, start in enumerate(range(0, len(X), 1000)):
+        sketch = DriftSketch.empty(binning, start=f"h{hour:02d}")
+        sketch.update_batch(binning, X[start:start + 1000])
+        sketch.save(tmp_path / f"{hour:02d}.npz")
+
+    merged = merge_sketches(
+        DriftSketch.load(path) for path in sorted(tmp_path.glob("*.npz"))
+    )
+
+    np.testing.assert_array_equal(merged.counts, binning.counts(X))
+    np.testing.assert_allclose(merged.mean, np.nanmean(X, axis=0))
+    np.testing.assert_allclose(merged.variance, np.nanvar(X, axis=0))
+    assert merged.start == "h00"
+
+    report = merged.report(profile.counts, profile.means, profile.variances)
+    assert set(report) == set(ALL_FEATURES)
+
+    other = build_reference_profile(
+        train_matrix, feature_version="test", n_bins=5
+    )
+    with pytest.raises(ValueError):
+        merged.merge(DriftSketch.empty(other.binning))
+
+
+def test_score_drift_monitor_tracks_reference_and_shift():
+    from src.monitoring.profile import build_score_profile
+    from src.monitoring.score_drift import ScoreDriftMonitor
+
+    rng = np.random.default_rng(0)
+    profile = build_score_profile(rng.beta(2, 5, size=20_000))
+
+    stable = ScoreDriftMonitor(profile, error_bound=0.01, seed=0)
+    shifted = ScoreDriftMonitor(profile, error_bound=0.01, seed=0)
+    for _ in range(20):
+        stable.update_batch(rng.beta(2, 5, size=5_000))
+        shifted.update_batch(rng.beta(3, 4, size=5_000))
+
+    assert stable.n_observed == 100_000
+    assert len(stable.sketch) < 10_000
+    assert stable.histogram.sum() == stable.n_observed
+
+    report = stable.report()
+    assert report["ks"] < 0.03
+    assert report["psi"] < 0.01
+    assert shifted.report()["ks"] > 0.15
+
+    # A reset monitor replays exactly like a fresh one with the same seed
+    scores = rng.beta(2, 5, size=50_000)
+    fresh = ScoreDriftMonitor(profile, error_bound=0.01, seed=0)
+    fresh.update_batch(scores)
+    stable.reset()
+    stable.update_batch(scores)
+    assert stable.report() == fresh.report()
@@ -0,0 +1,63 @@
+import json
+
+import joblib
+import numpy as np
+import pytest
+
+from src.data.split import load_split
+from src.features.compiled import compile_preprocessor
+from src.features.contracts import ALL_FEATURES
+
+
+FEATURES_DIR = "artifacts/features"
+
+
+@pytest.fixture(scope="module")
+def preprocessor():
+    return joblib.load(f"{FEATURES_DIR}/preprocessor.joblib")
+
+
+@pytest.fixture(scope="module")
+def feature_metadata():
+    with open(f"{FEATURES_DIR}/feature_metadata.json") as f:
+        return json.load(f)
+
+
+def test_compiled_feature_layout_matches_metadata(
+    preprocessor, feature_metadata
+):
+    compiled = compile_preprocessor(preprocessor)
+
+    assert compiled.feature_names == feature_metadata["feature_names"]
+    assert compiled.n_features == feature_metadata["n_features"]
+
+
+@pytest.mark.parametrize("split", ["train", "validation", "test"])
+def test_compiled_preprocessor_bitwise_parity(
+    preprocessor, splits_dir, split
+):
+    df = load_split(splits_dir, split)
+    compiled = compile_preprocessor(preprocessor)
+
+    expected = preprocessor.transform(df)
+    actual = compiled.transform(df[ALL_FEATURES].to_numpy())
+
+    assert actual.dtype == expected.dtype
+    assert actual.tobytes() == expected.tobytes()
+
+
+def test_compiled_preprocessor_unknown_values(preprocessor, splits_dir):
+    df = load_split(splits_dir, "validation").head(5).astype(float)
+    df.loc[0, "PAY_0"] = np.nan
+    df.loc[1, "SEX"] = np.nan
+    df.loc[2, "PAY_2"] = 2.5
+    df.loc[2, "EDUCATION"] = 7
+    df.loc[3, "MARRIAGE"] = -3
+    df.loc[4, "AGE"] = np.nan
+
+    compiled = compile_preprocessor(preprocessor)
+
+    np.testing.assert_array_equal(
+        compiled.transform(df[ALL_FEATURES].to_numpy()),
+        preprocessor.transform(df),
+    )
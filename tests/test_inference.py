@@ -0,0 +1,362 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.split import load_split
+from src.inference.engine import InferenceEngine, iter_batches
+from src.inference.streaming import iter_jsonl_chunks, NpyPredictionWriter
+
+
+@pytest.fixture(scope="module")
+def records(splits_dir):
+    df = load_split(splits_dir, "validation").head(1000)
+    return df.to_dict(orient="records")
+
+
+def test_iter_batches_sizes():
+    batches = list(iter_batches(range(10), 4))
+    assert [len(b) for b in batches] == [4, 4, 2]
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_batched_scores_match_direct_predict(registered, records, compiled):
+    model, preprocessor = registered
+    engine = InferenceEngine(
+        model,
+        preprocessor,
+        batch_size=64,
+        use_compiled_preprocessor=compiled,
+    )
+
+    scores = np.array([s for _, s in engine.score_records(records)])
+
+    expected = model.predict_proba(
+        preprocessor.transform(pd.DataFrame(records))
+    )[:, 1]
+    np.testing.assert_allclose(scores, expected)
+
+
+def test_engine_validates_batches_without_failing(registered, records):
+    from src.data.validate import CompiledValidator
+    from src.features.contracts import ALL_FEATURES
+
+    engine = InferenceEngine(
+        *registered,
+        batch_size=64,
+        validator=CompiledValidator(ALL_FEATURES),
+    )
+    bad = [dict(record) for record in records[:200]]
+    bad[130]["SEX"] = 7
+
+    scores = [s for _, s in engine.score_records(bad)]
+
+    assert len(scores) == 200
+    report = engine.validation_report
+    assert report.n_rows == 200
+    assert list(report.violations) == ["SEX:codes"]
+    assert report.violations["SEX:codes"].sample_rows == [130]
+
+
+def test_missing_feature_raises(registered, records):
+    engine = InferenceEngine(*registered)
+    record = dict(records[0])
+    del record["AGE"]
+
+    with pytest.raises(ValueError):
+        engine.score_batch([record])
+
+
+def test_jsonl_chunks_and_npy_writer_roundtrip(tmp_path):
+    lines = "\n".join(json.dumps({"id": i}) for i in range(7)) + "\n\n"
+    chunks = list(iter_jsonl_chunks(io.StringIO(lines), 3))
+    assert [len(c) for c in chunks] == [3, 3, 1]
+
+    path = tmp_path / "scores.npy"
+    with NpyPredictionWriter(path) as writer:
+        for chunk in chunks:
+            writer.write(chunk, np.array([r["id"] / 10 for r in chunk]))
+
+    np.testing.assert_array_equal(
+        np.load(path, mmap_mode="r"), np.arange(7) / 10
+    )
+
+
+def test_limit_threads_caps_booster_and_sklearn_models(tmp_path):
+    from src.inference.engine import limit_threads
+    from src.models.lgb_dataset import train_lightgbm_cached
+    from src.models.tree_models import train_lightgbm
+
+    X = np.load("artifacts/features/X_val.npy")[:2000]
+    y = np.load("artifacts/labels/y_val.npy", allow_pickle=True)[:2000]
+    y = y.astype(int)
+
+    booster_model = train_lightgbm_cached(
+        X,
+        y,
+        feature_version="test",
+        cache_dir=tmp_path,
+        n_estimators=10,
+        n_jobs=-1,
+    )
+    expected = booster_model.predict_proba(X)
+
+    calls = []
+    predict = booster_model.booster_.predict
+
+    def spy(*args, **kwargs):
+        calls.append(kwargs)
+        return predict(*args, **kwargs)
+
+    booster_model.booster_.predict = spy
+
+    limit_threads(booster_model)
+    assert booster_model.get_params()["num_threads"] == 1
+    np.testing.assert_array_equal(booster_model.predict_proba(X), expected)
+    assert calls[-1]["num_threads"] == 1
+
+    classifier = train_lightgbm(X, y, n_estimators=10, n_jobs=-1)
+    limit_threads(classifier)
+    assert classifier.get_params()["n_jobs"] == 1
+
+
+def test_service_micro_batches_concurrent_requests(registered, records):
+    import asyncio
+
+    from src.inference.service import ScoringService, ServiceConfig
+
+    engine = InferenceEngine(*registered)
+    config = ServiceConfig(
+        model_name="lightgbm",
+        version="v1.1.0",
+        host="127.0.0.1",
+        port=0,
+        max_batch_size=32,
+        max_wait_us=5000,
+    )
+
+    async def run():
+        service = ScoringService(engine, config)
+        host, port = await service.start()
+
+        async def post(record):
+            reader, writer = await asyncio.open_connection(host, port)
+            body = json.dumps(record).encode()
+            writer.write(
+                b"POST /score HTTP/1.1\r\nConnection: close\r\n"
+                b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+            )
+            response = await reader.read()
+            writer.close()
+            head, payload = response.split(b"\r\n\r\n", 1)
+            return int(head.split()[1]), json.loads(payload)
+
+        try:
+            results = await asyncio.gather(
+                *(post(record) for record in records[:100])
+            )
+            bad = await post({"AGE": 30})
+            nested = await post({**records[0], "AGE": {"a": 1}})
+            _, stats = await service.handle("GET", "/stats", b"")
+        finally:
+            await service.close()
+
+        return results, bad, nested, stats
+
+    results, bad, nested, stats = asyncio.run(run())
+
+    assert {status for status, _ in results} == {200}
+    np.testing.assert_allclose(
+        [payload["score"] for _, payload in results],
+        engine.score_batch(records[:100]),
+    )
+    assert bad[0] == 400
+    assert nested[0] == 400 and "AGE" in nested[1]["error"]
+    assert stats["requests"] == 100
+    assert stats["batches"] < 100
+    assert stats["batch_size"]["p99"] <= 32
+    assert stats["latency_ms"]["p99"] >= stats["latency_ms"]["p50"] > 0
+
+
+def test_prefork_workers_respawn_and_roll(registered, records):
+    import http.client
+    import os
+    import signal
+    import time
+
+    from src.inference.prefork import PreforkServer
+    from src.inference.service import ServiceConfig
+
+    server = PreforkServer(
+        ServiceConfig(
+            model_name="lightgbm",
+            version="v1.1.0",
+            host="127.0.0.1",
+            port=0,
+            processes=2,
+        )
+    )
+
+    def request(method, path, payload=None):
+        connection = http.client.HTTPConnection(*server.address, timeout=10)
+        connection.request(method, path, body=json.dumps(payload))
+        response = json.loads(connection.getresponse().read())
+        connection.close()
+        return response
+
+    try:
+        server.start()
+        first = set(server.workers)
+        assert len(first) == 2
+
+        expected = InferenceEngine(*registered).score_batch(records[:5])
+        scores = request("POST", "/score", records[:5])["scores"]
+        np.testing.assert_allclose(scores, expected)
+
+        # A crashed worker is replaced from the loaded version
+        os.kill(min(first), signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        while min(first) in server.workers and time.monotonic() < deadline:
+            server.supervise_once()
+            time.sleep(0.05)
+        assert min(first) not in server.workers
+        assert len(server.workers) == 2
+
+        before = set(server.workers)
+        server.rolling_swap("v1.1.0")
+        assert len(server.workers) == 2
+        assert not before & set(server.workers)
+        assert request("GET", "/health")["pid"] in server.workers
+    finally:
+        server.shutdown()
+
+    assert not server.workers
+
+
+def test_shadow_scoring_shares_features_and_logs(
+    registered, records, tmp_path
+):
+    from src.inference.shadow import (
+        ShadowLog,
+        ShadowModel,
+        ShadowScorer,
+        feature_key,
+    )
+
+    champion = InferenceEngine(*registered)
+    key = feature_key(model_name="lightgbm", version="v1.1.0")
+    shared = ShadowModel.from_registry(model_name="lightgbm", version="v1.1.0")
+    separate = ShadowModel(
+        model_name="lightgbm",
+        version="refit",
+        engine=InferenceEngine(*registered, use_compiled_preprocessor=False),
+        feature_key="other",
+    )
+
+    scorer = ShadowScorer(
+        champion,
+        [shared, separate],
+        champion_feature_key=key,
+        log=ShadowLog(tmp_path / "shadow.jsonl"),
+        latency_budget_ms=10_000,
+    )
+    assert scorer.shared_features == ["lightgbm:v1.1.0"]
+
+    scores = np.concatenate(
+        [scorer.score_batch(batch) for batch in iter_batches(records, 250)]
+    )
+    scorer.close()
+    np.testing.assert_allclose(scores, champion.score_batch(records))
+
+    lines = (tmp_path / "shadow.jsonl").read_text().splitlines()
+    entries = [json.loads(line) for line in lines]
+    assert len(entries) == 8
+    for entry in entries:
+        np.testing.assert_allclose(entry["scores"], entry["champion_scores"])
+    assert scorer.counts["lightgbm:refit"]["scored"] == 4
+
+    # Batches that cannot start within the budget are skipped
+    expired = ShadowScorer(
+        champion, [shared], champion_feature_key=key, latency_budget_ms=0
+    )
+    expired.score_batch(records[:10])
+    expired.close()
+    assert expired.counts["lightgbm:v1.1.0"]["expired"] == 1
+
+
+def test_service_shadow_log_carries_record_ids(registered, records, tmp_path):
+    import asyncio
+
+    from src.inference.service import ScoringService, ServiceConfig
+    from src.inference.shadow import (
+        ShadowLog,
+        ShadowModel,
+        ShadowScorer,
+        feature_key,
+    )
+
+    scorer = ShadowScorer(
+        InferenceEngine(*registered),
+        [ShadowModel.from_registry(model_name="lightgbm", version="v1.1.0")],
+        champion_feature_key=feature_key(
+            model_name="lightgbm", version="v1.1.0"
+        ),
+        log=ShadowLog(tmp_path / "shadow.jsonl"),
+        latency_budget_ms=10_000,
+    )
+    config = ServiceConfig(
+        model_name="lightgbm",
+        version="v1.1.0",
+        max_batch_size=64,
+        max_wait_us=5000,
+    )
+
+    async def run():
+        service = ScoringService(scorer, config)
+        await service.batcher.start()
+        try:
+            return await asyncio.gather(
+                service.handle(
+                    "POST", "/score", json.dumps(records[:5]).encode()
+                ),
+                service.handle(
+                    "POST", "/score", json.dumps(records[5]).encode()
+                ),
+            )
+        finally:
+            await service.close()
+
+    results = asyncio.run(run())
+    assert [status for status, _ in results] == [200, 200]
+
+    lines = (tmp_path / "shadow.jsonl").read_text().splitlines()
+    logged = [i for line in lines for i in json.loads(line)["ids"]]
+    assert sorted(logged) == sorted(record["id"] for record in records[:6])
+
+
+def test_shadow_feature_key_without_feature_contract(tmp_path, monkeypatch):
+    import shutil
+
+    from src.inference import shadow
+    from src.models import registry
+
+    full = shadow.feature_key(model_name="lightgbm", version="v1.1.0")
+
+    version_dir = tmp_path / "lightgbm" / "online"
+    shutil.copytree(
+        registry.REGISTRY_BASE_DIR / "lightgbm" / "v1.1.0", version_dir
+    )
+    metadata = json.loads((version_dir / "metadata.json").read_text())
+    metadata["feature_contract"] = None
+    (version_dir / "metadata.json").write_text(json.dumps(metadata))
+    monkeypatch.setattr(registry, "REGISTRY_BASE_DIR", tmp_path)
+    monkeypatch.setattr(shadow, "REGISTRY_BASE_DIR", tmp_path)
+
+    key = shadow.feature_key(model_name="lightgbm", version="online")
+    assert full.endswith(f"-{key}")
+
+    (version_dir / "preprocessor.joblib").unlink()
+    with pytest.raises(ValueError, match="no feature contract"):
+        shadow.feature_key(model_name="lightgbm", version="online")
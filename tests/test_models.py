@@ -0,0 +1,199 @@
+import shutil
+
+import numpy as np
+import pytest
+from sklearn.metrics import average_precision_score, roc_auc_score
+
+import src.models.predictions as predictions
+from src.models import registry
+from src.models.bootstrap import paired_bootstrap
+from src.models.evaluation import evaluate_binary_classifier
+from src.models.lgb_dataset import train_lightgbm_cached
+from src.models.predictions import cached_scores, evaluate_artifact
+from src.models.registry import load_model
+from src.models.search import run_search, sample_configurations
+from src.models.tree_models import (
+    continue_training,
+    n_trees,
+    train_lightgbm,
+)
+
+
+def test_model_cache_lru_and_hot_reload(tmp_path, monkeypatch):
+    source = registry.REGISTRY_BASE_DIR / "lightgbm" / "v1.1.0"
+    for version in ("v1", "v2"):
+        shutil.copytree(source, tmp_path / "lightgbm" / version)
+    monkeypatch.setattr(registry, "REGISTRY_BASE_DIR", tmp_path)
+
+    cache = registry.ModelCache()
+    first = cache.get(model_name="lightgbm", version="v1")
+    assert cache.get(model_name="lightgbm", version="v1") is first
+
+    # A budget of one entry evicts the least recently used version
+    cache.max_bytes = first.nbytes
+    cache.get(model_name="lightgbm", version="v2")
+    assert ("lightgbm", "v1") not in cache
+    assert len(cache) == 1
+
+    # A failed load leaves no per-key lock behind
+    with pytest.raises(FileNotFoundError):
+        cache.get(model_name="lightgbm", version="missing")
+    assert not cache._key_locks
+
+    registry.promote_version(model_name="lightgbm", version="v1")
+    reloader = registry.HotReloader(model_name="lightgbm", cache=cache)
+    in_flight = reloader.current()
+    assert in_flight.version == "v1"
+    assert not reloader.check()
+
+    registry.promote_version(model_name="lightgbm", version="v2")
+    assert reloader.check()
+    assert reloader.current().version == "v2"
+    assert in_flight.version == "v1"
+    assert registry.list_versions("lightgbm") == ["v1", "v2"]
+
+
+def test_continue_training_appends_trees(registered):
+    base_model, _ = registered
+    X_val = np.load("artifacts/features/X_val.npy")
+    y_val = np.load("artifacts/labels/y_val.npy", allow_pickle=True)
+    before = base_model.predict_proba(X_val[:100])
+
+    model = continue_training(
+        base_model, X_val, y_val.astype(int), n_estimators=5
+    )
+
+    assert n_trees(model) == n_trees(base_model) + 5
+    np.testing.assert_array_equal(
+        base_model.predict_proba(X_val[:100]), before
+    )
+
+
+def test_parallel_search_leaderboard_is_ranked():
+    X_val = np.load("artifacts/features/X_val.npy")
+    y_val = np.load("artifacts/labels/y_val.npy", allow_pickle=True)
+
+    configurations = [
+        {"n_estimators": 10, **params}
+        for params in sample_configurations(
+            {"num_leaves": [7, 15], "min_child_samples": [20, 50]}, 3
+        )
+    ]
+    assert len({tuple(c.items()) for c in configurations}) == 3
+
+    leaderboard = run_search(
+        X_val[:3000],
+        y_val[:3000],
+        X_val[3000:],
+        y_val[3000:],
+        model_type="lightgbm",
+        configurations=configurations,
+        n_workers=2,
+    )
+
+    assert sorted(entry["trial"] for entry in leaderboard) == [0, 1, 2]
+    aucs = [entry["roc_auc"] for entry in leaderboard]
+    assert aucs == sorted(aucs, reverse=True)
+
+    with pytest.raises(ValueError, match="n_trials"):
+        sample_configurations({"num_leaves": [7]}, 0)
+    assert run_search(
+        X_val[:100],
+        y_val[:100],
+        X_val[100:200],
+        y_val[100:200],
+        model_type="lightgbm",
+        configurations=[],
+    ) == []
+
+
+def test_cached_lightgbm_dataset_matches_and_stops_early(tmp_path):
+    X = np.load("artifacts/features/X_val.npy")
+    y = np.load("artifacts/labels/y_val.npy", allow_pickle=True).astype(int)
+    X_train, y_train, X_val, y_val = X[:3000], y[:3000], X[3000:], y[3000:]
+
+    direct = train_lightgbm(X_train, y_train, n_estimators=30, n_jobs=1)
+    cached = train_lightgbm_cached(
+        X_train,
+        y_train,
+        feature_version="test",
+        cache_dir=tmp_path,
+        n_estimators=30,
+        n_jobs=1,
+    )
+    np.testing.assert_array_equal(
+        cached.predict_proba(X_val), direct.predict_proba(X_val)
+    )
+
+    stopped = train_lightgbm_cached(
+        X_train,
+        y_train,
+        feature_version="test",
+        cache_dir=tmp_path,
+        X_val=X_val,
+        y_val=y_val,
+        early_stopping_rounds=5,
+        learning_rate=0.3,
+        n_estimators=500,
+        n_jobs=1,
+    )
+    assert stopped.best_iteration_ < 500
+    assert len(list(tmp_path.glob("*.bin"))) == 1
+
+
+def test_prediction_cache_single_pass_evaluation(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        predictions, "PREDICTION_CACHE_DIR", tmp_path / "cache"
+    )
+    model_path = tmp_path / "model.joblib"
+    shutil.copy("artifacts/models/lightgbm/v1.1.0/model.joblib", model_path)
+
+    X = np.load("artifacts/features/X_val.npy")[:2000]
+    y = np.load("artifacts/labels/y_val.npy", allow_pickle=True)[:2000]
+    y = y.astype(int)
+
+    evaluation = evaluate_artifact(model_path, X, y)
+    cached = list((tmp_path / "cache").glob("*.npy"))
+    assert len(cached) == 1
+
+    # A hit never calls the model
+    class Unusable:
+        def predict_proba(self, X):
+            raise AssertionError("cache miss")
+
+    hit = cached_scores(model_path, X, model=Unusable())
+    np.testing.assert_array_equal(hit, evaluation.scores)
+
+    model = load_model(model_name="lightgbm", version="v1.1.0")[0]
+    assert evaluation.metrics == pytest.approx(
+        evaluate_binary_classifier(model, X, y)
+    )
+
+    cached_scores(model_path, X[:100])
+    assert len(list((tmp_path / "cache").glob("*.npy"))) == 2
+    assert not (tmp_path / "predictions").exists()
+
+
+def test_paired_bootstrap_deltas_match_sklearn():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 3000)
+    baseline = np.round(rng.random(3000) + 0.3 * y, 2)  # heavy ties
+    candidate = rng.random(3000) + 0.6 * y
+
+    kwargs = {"n_bootstrap": 300, "max_chunk_bytes": 1 << 20}
+    intervals = paired_bootstrap(y, baseline, candidate, n_jobs=2, **kwargs)
+
+    expected = {
+        "roc_auc": roc_auc_score(y, candidate) - roc_auc_score(y, baseline),
+        "pr_auc": average_precision_score(y, candidate)
+        - average_precision_score(y, baseline),
+    }
+    for metric, delta in expected.items():
+        assert intervals[metric]["delta"] == pytest.approx(delta)
+        assert intervals[metric]["lower"] < delta < intervals[metric]["upper"]
+
+    single = paired_bootstrap(y, baseline, candidate, n_jobs=1, **kwargs)
+    assert single == intervals
+
+    with pytest.raises(ValueError, match="n_bootstrap"):
+        paired_bootstrap(y, baseline, candidate, n_bootstrap=0)
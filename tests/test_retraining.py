@@ -0,0 +1,220 @@
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.data.split import load_split
+from src.inference.engine import iter_batches
+from src.models import predictions, registry
+from src.retraining import scheduler as scheduler_module
+from src.retraining.jobs import TrainingSpec, split_threads, train_candidates
+from src.retraining.online import OnlineLearner
+from src.retraining.scheduler import (
+    CANCELLED,
+    REGISTERED,
+    RUNNING,
+    SUPERSEDED,
+    RetrainingScheduler,
+    RetrainPolicy,
+)
+
+
+def test_online_learner_checkpoints_and_resumes(
+    tmp_path, monkeypatch, splits_dir
+):
+    shutil.copytree(
+        registry.REGISTRY_BASE_DIR / "lightgbm" / "v1.1.0",
+        tmp_path / "lightgbm" / "v1.1.0",
+    )
+    monkeypatch.setattr(registry, "REGISTRY_BASE_DIR", tmp_path)
+
+    df = load_split(splits_dir, "validation").head(3000)
+    y_val = np.load("artifacts/labels/y_val.npy", allow_pickle=True)
+    df["y"] = y_val[:3000]
+    labeled = df.to_dict(orient="records")
+
+    learner = OnlineLearner.from_registry(
+        model_name="online_sgd",
+        base_model_name="lightgbm",
+        base_version="v1.1.0",
+        checkpoint_every=2000,
+    )
+    paths = [
+        learner.learn_records(batch) for batch in iter_batches(labeled, 500)
+    ]
+
+    assert [p.name for p in paths if p is not None] == ["online.00001"]
+    assert learner.n_pending == 1000
+    assert np.isfinite(learner.metrics()["prequential_log_loss"])
+
+    resumed = OnlineLearner.from_registry(
+        model_name="online_sgd",
+        base_model_name="online_sgd",
+        base_version="online.00001",
+    )
+    assert resumed.n_samples == 2000
+    np.testing.assert_array_equal(
+        resumed.predict(learner.transform(labeled[:10])).shape, (10,)
+    )
+    assert resumed.checkpoint().name == "online.00002"
+
+
+def _retraining_fixture(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "REGISTRY_BASE_DIR", tmp_path / "models")
+    monkeypatch.setattr(
+        predictions, "PREDICTION_CACHE_DIR", tmp_path / "cache"
+    )
+
+    features_dir = tmp_path / "features"
+    features_dir.mkdir()
+    for name in ("preprocessor.joblib", "feature_metadata.json"):
+        shutil.copy(f"artifacts/features/{name}", features_dir / name)
+
+    X = np.load("artifacts/features/X_val.npy")
+    y = np.load("artifacts/labels/y_val.npy", allow_pickle=True)
+    np.save(features_dir / "X_train.npy", X[:3000])
+    np.save(features_dir / "X_val.npy", X[3000:])
+    np.save(features_dir / "y_train.npy", y[:3000])
+    np.save(features_dir / "y_val.npy", y[3000:])
+
+    return TrainingSpec(
+        model_type="baseline",
+        features_dir=features_dir,
+        labels_dir=features_dir,
+    )
+
+
+def test_retraining_scheduler_debounce_cooldown_supersede(
+    tmp_path, monkeypatch
+):
+    spec = _retraining_fixture(tmp_path, monkeypatch)
+    scheduler = RetrainingScheduler(
+        model_name="baseline",
+        spec=spec,
+        policy=RetrainPolicy(
+            threshold=0.2, debounce_seconds=60, cooldown_seconds=3600
+        ),
+        executor=ThreadPoolExecutor(max_workers=1),
+    )
+
+    assert scheduler.observe(0.5, now=0) is None
+    assert scheduler.observe(0.1, now=30) is None
+    assert scheduler.observe(0.5, now=40) is None
+    first = scheduler.observe_report({"AGE": {"psi": 0.5}}, now=100)
+    assert first is not None
+    assert scheduler.observe(0.5, now=200) is None
+
+    second = scheduler.submit(reason={"manual": True})
+    scheduler.shutdown()
+
+    assert first.state in (CANCELLED, SUPERSEDED)
+    assert second.state == REGISTERED
+    assert registry.list_versions("baseline") == ["v1.0.0"]
+    metadata = registry.load_metadata(model_name="baseline", version="v1.0.0")
+    assert metadata["retraining"]["reason"] == {"manual": True}
+
+
+def test_retraining_scheduler_writes_artifacts_outside_its_lock(
+    tmp_path, monkeypatch
+):
+    spec = _retraining_fixture(tmp_path, monkeypatch)
+    scheduler = RetrainingScheduler(
+        model_name="baseline",
+        spec=spec,
+        policy=RetrainPolicy(threshold=0.2),
+        executor=ThreadPoolExecutor(max_workers=1),
+    )
+
+    register = scheduler_module.register_training_result
+    later, triggered = [], threading.Event()
+
+    def register_then_trigger(result, **kwargs):
+        path = register(result, **kwargs)
+        # Would deadlock if the scheduler lock were held while writing
+        if not later:
+            later.append(scheduler.submit(reason={"manual": 2}))
+            triggered.set()
+        return path
+
+    monkeypatch.setattr(
+        scheduler_module, "register_training_result", register_then_trigger
+    )
+
+    first = scheduler.submit(reason={"manual": 1})
+    assert triggered.wait(60)
+    later[0].future.result()
+    scheduler.shutdown()
+
+    # Superseded while its files were written: never published
+    assert first.state == SUPERSEDED and first.path is None
+    assert later[0].state == REGISTERED
+    assert registry.list_versions("baseline") == ["v1.0.0"]
+    assert sorted(
+        p.name for p in (registry.REGISTRY_BASE_DIR / "baseline").iterdir()
+    ) == ["v1.0.0"]
+
+
+def test_retraining_scheduler_dropped_trigger_keeps_running_job(
+    tmp_path, monkeypatch
+):
+    started, release = threading.Event(), threading.Event()
+
+    def blocked_training(spec):
+        started.set()
+        release.wait(10)
+        raise RuntimeError("not trained")
+
+    monkeypatch.setattr(scheduler_module, "run_training_job", blocked_training)
+
+    scheduler = RetrainingScheduler(
+        model_name="baseline",
+        spec=TrainingSpec(
+            model_type="baseline",
+            features_dir=tmp_path,
+            labels_dir=tmp_path,
+        ),
+        policy=RetrainPolicy(threshold=0.2, max_queued=1),
+        executor=ThreadPoolExecutor(max_workers=1),
+    )
+
+    first = scheduler.submit(reason={"manual": 1})
+    assert started.wait(10)
+
+    assert scheduler.submit(reason={"manual": 2}) is None
+    assert not first.superseded
+    assert first.state == RUNNING
+
+    release.set()
+    scheduler.shutdown()
+
+
+def test_train_candidates_concurrently():
+    assert split_threads(["baseline", "lightgbm", "xgboost"], 8) == {
+        "baseline": 1,
+        "lightgbm": 4,
+        "xgboost": 3,
+    }
+    assert split_threads(["baseline", "lightgbm"], 1) == {
+        "baseline": 1,
+        "lightgbm": 1,
+    }
+
+    X = np.load("artifacts/features/X_val.npy")
+    y = np.load("artifacts/labels/y_val.npy", allow_pickle=True)
+
+    results = train_candidates(
+        [
+            TrainingSpec(model_type="baseline"),
+            TrainingSpec(model_type="lightgbm", params={"n_estimators": 10}),
+        ],
+        X[:3000],
+        y[:3000],
+        X[3000:],
+        y[3000:],
+    )
+
+    assert set(results) == {"baseline", "lightgbm"}
+    for result in results.values():
+        assert result.n_train == 3000
+        assert 0.5 < result.metrics["roc_auc"] <= 1.0
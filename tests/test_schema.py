@@ -0,0 +1,199 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.io import arff
+
+from src.data.columnar import build_column_cache, open_columns
+from src.data.load import load_openml_credit_default
+from src.data.schema import validate_schema
+
+
+RAW_ARFF = Path("data/raw/openml_credit_default/credit_default.arff")
+
+
+def test_columnar_cache_matches_arff_and_projects(tmp_path):
+    raw, _ = arff.loadarff(RAW_ARFF)
+    expected = pd.DataFrame(raw)
+
+    df = load_openml_credit_default(
+        RAW_ARFF,
+        cache_dir=tmp_path / "cache",
+        chunk_rows=4096,
+    )
+    assert len(df) == len(expected)
+    np.testing.assert_array_equal(df["LIMIT_BAL"], expected["x1"])
+    np.testing.assert_array_equal(
+        df["y"], expected["y"].str.decode("utf-8").astype(int)
+    )
+    assert df["y"].dtype == np.int64
+
+    projected = load_openml_credit_default(
+        RAW_ARFF,
+        cache_dir=tmp_path / "cache",
+        columns=["AGE", "y"],
+    )
+    assert list(projected.columns) == ["AGE", "y"]
+
+    columns = open_columns(tmp_path / "cache", ["x5"])
+    assert isinstance(columns["x5"], np.memmap)
+
+
+def test_schema_is_checked_on_header_before_rows(tmp_path):
+    source = tmp_path / "broken.csv"
+    source.write_text("id,x1\n1,2\n")
+
+    with pytest.raises(ValueError, match="Missing feature column: x2"):
+        build_column_cache(
+            source,
+            tmp_path / "cache",
+            validate_header=validate_schema,
+        )
+    assert not (tmp_path / "cache").exists()
+
+
+def test_csv_int_column_widens_on_later_chunk(tmp_path):
+    source = tmp_path / "raw.csv"
+    source.write_text("id,x1,x2\n1,2,a\n2,3,b\n3,,a\n4,4.5,c\n5,6,b\n")
+
+    build_column_cache(source, tmp_path / "cache", chunk_rows=2)
+
+    columns = open_columns(tmp_path / "cache")
+    assert columns["id"].dtype == np.int64
+    assert columns["x1"].dtype == np.float64
+    np.testing.assert_array_equal(columns["x1"], [2, 3, np.nan, 4.5, 6])
+    np.testing.assert_array_equal(columns["x2"], [0, 1, 0, 2, 1])
+
+    source.write_text("id,x1\n1,2\n2,3\n3,4\n4,n/a?\n")
+    with pytest.raises(ValueError, match=r"x1: .* rows 2-3 .*'n/a\?'"):
+        build_column_cache(source, tmp_path / "bad", chunk_rows=2)
+
+
+def test_temporal_split_snapshot_matches_sorted_rows(tmp_path, monkeypatch):
+    import src.data.split as split
+
+    monkeypatch.setattr(split, "LABELS_OUTPUT_DIR", tmp_path / "labels")
+
+    df = load_openml_credit_default(RAW_ARFF, cache_dir=tmp_path / "cache")
+    split.temporal_split(df, tmp_path / "splits")
+    assert not list((tmp_path / "splits").glob("*.csv"))
+
+    n = len(df)
+    train_end = int(n * split.TRAIN_FRACTION)
+    val_end = train_end + int(n * split.VALIDATION_FRACTION)
+    expected = df.sort_values("id").iloc[train_end:val_end]
+    np.testing.assert_array_equal(
+        np.load(tmp_path / "labels" / "y_val.npy", allow_pickle=True),
+        expected["y"],
+    )
+
+    projected = split.load_split(
+        tmp_path / "splits", "validation", ["AGE", "PAY_0"]
+    )
+    assert list(projected.columns) == ["AGE", "PAY_0"]
+    np.testing.assert_array_equal(projected, expected[["AGE", "PAY_0"]])
+
+    opened = []
+    monkeypatch.setattr(
+        split,
+        "open_columns",
+        lambda *args: opened.append(args) or open_columns(*args),
+    )
+    chunks = list(
+        split.iter_split_chunks(
+            tmp_path / "splits", "validation", ["AGE"], chunk_rows=1000
+        )
+    )
+    assert len(chunks) > 1 and len(opened) == 1
+    assert sum(len(chunk) for chunk in chunks) == len(expected)
+    np.testing.assert_array_equal(np.concatenate(chunks)[:, 0], expected.AGE)
+
+
+def test_compiled_validator_counts_and_samples_in_chunks():
+    from src.data.validate import CompiledValidator, validate_data
+
+    df = pd.DataFrame(
+        {
+            "LIMIT_BAL": [1000.0, -5.0, 2000.0, 3000.0, 10.0],
+            "AGE": [30.0, 40.0, 12.0, 200.0, np.nan],
+            "SEX": [1.0, 2.0, 3.0, 1.5, 2.0],
+            "PAY_0": [0.0, -2.0, 9.0, 10.0, -3.0],
+        }
+    )
+    validator = CompiledValidator(list(df.columns))
+
+    report = validator.validate_columns(
+        {name: df[name].to_numpy() for name in df.columns},
+        chunk_rows=2,
+    )
+    counts = {key: v.count for key, v in report.violations.items()}
+    assert report.n_rows == 5
+    assert counts == {
+        "LIMIT_BAL:min": 1,
+        "AGE:min": 1,
+        "AGE:max": 1,
+        "AGE:missing": 1,
+        "SEX:codes": 2,
+        "PAY_0:ordinal": 2,
+    }
+    assert report.violations["SEX:codes"].sample_rows == [2, 3]
+    assert report.violations["PAY_0:ordinal"].sample_values == [10.0, -3.0]
+
+    with pytest.raises(ValueError, match="SEX: invalid codes detected"):
+        validate_data(df)
+    assert validate_data(df.iloc[:1]).ok
+
+    # Constrained columns are checked even when they arrive as strings
+    as_text = df.iloc[:2].astype({"SEX": object})
+    as_text.loc[0, "SEX"] = "x"
+    with pytest.raises(ValueError, match=r"SEX: non-numeric values .*'x'"):
+        validate_data(as_text)
+    assert validate_data(df.iloc[:1].astype({"SEX": str})).ok
+
+
+def test_pipeline_skips_and_restores_cached_stages(tmp_path, monkeypatch):
+    from src.utils.pipeline import Stage, StageCache, run_pipeline
+
+    monkeypatch.chdir(tmp_path)
+    Path("raw.txt").write_text("a")
+    Path("stage.py").write_text(
+        "import sys\n"
+        "src, dst = sys.argv[1:]\n"
+        "open('runs.log', 'a').write(dst + '\\n')\n"
+        "open(dst, 'w').write(open(src).read() * 2)\n"
+    )
+
+    def stage(name, src, dst, deps=()):
+        return Stage(
+            name=name,
+            command=["{python}", "stage.py", src, dst],
+            inputs=[src],
+            outputs=[dst],
+            code=["stage.py"],
+            deps=list(deps),
+        )
+
+    stages = [
+        stage("first", "raw.txt", "mid.txt"),
+        stage("left", "mid.txt", "left.txt", deps=["first"]),
+        stage("right", "mid.txt", "right.txt", deps=["first"]),
+    ]
+    cache = StageCache(Path("cache"))
+
+    status = run_pipeline(stages, cache=cache, max_parallel=2)
+    assert set(status.values()) == {"ran"}
+    assert Path("left.txt").read_text() == "aaaa"
+
+    status = run_pipeline(stages, cache=StageCache(Path("cache")))
+    assert set(status.values()) == {"cached"}
+    assert len(Path("runs.log").read_text().split()) == 3
+
+    # A new raw file reruns everything; switching back restores
+    Path("raw.txt").write_text("bb")
+    run_pipeline(stages, cache=cache)
+    Path("raw.txt").write_text("a")
+    status = run_pipeline(stages, cache=cache)
+    assert set(status.values()) == {"restored"}
+    assert Path("right.txt").read_text() == "aaaa"
+    assert len(Path("runs.log").read_text().split()) == 6